@@ -1,8 +1,49 @@
-from typing import List, Optional, Callable, Dict
+from typing import Iterator, List, Optional, Callable, Dict, Union
+import gzip
+import json
+import logging
+import os
+import time
 import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
 from virtuals_sdk.game.worker import Worker
-from virtuals_sdk.game.custom_types import Function, FunctionResult, FunctionResultStatus, ActionResponse, ActionType
-from virtuals_sdk.game.utils import create_agent, create_workers, post
+from virtuals_sdk.game.custom_types import Function, FunctionResult, FunctionResultStatus, ActionResponse, ActionType, ActionSpace, RawJSON, StepEvent
+from virtuals_sdk.game.utils import GAME_BASE_URL, atomic_write, create_agent, create_workers, encode_json, get_access_token, post
+from virtuals_sdk.game.state_budget import StateBudget
+from virtuals_sdk.game.state_fn import StateFn, call_state_fn
+from virtuals_sdk.game.spill import SpillStore
+from virtuals_sdk.game import instrumentation as spans
+from virtuals_sdk.game.instrumentation import Instrumentation, NOOP_INSTRUMENTATION
+from virtuals_sdk.game.registry import AgentRegistry
+from virtuals_sdk.game.events import EventQueue
+from virtuals_sdk.game.trace import TraceRecorder
+from virtuals_sdk.game.worker_pool import WorkerPool
+from virtuals_sdk.transport import HTTPTransport
+
+
+logger = logging.getLogger(__name__)
+
+# format version of the files written by Agent.checkpoint
+CHECKPOINT_VERSION = 1
+
+# maximum number of initial worker state functions compile runs at the same time
+COMPILE_CONCURRENCY = 8
+
+
+def _check_checkpoint_value(value, path: str):
+    """Raise a TypeError naming the first value of a checkpoint that JSON can't restore as is"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"Cannot checkpoint {path}: key {key!r} is not a string")
+            _check_checkpoint_value(item, f"{path}[{key!r}]")
+    elif isinstance(value, (list, tuple)):
+        for i, item in enumerate(value):
+            _check_checkpoint_value(item, f"{path}[{i}]")
+    else:
+        raise TypeError(f"Cannot checkpoint {path}: {type(value).__name__} is not JSON serializable")
 
 
 class Session:
@@ -37,13 +78,26 @@ class WorkerConfig:
             # places the rest of the output of the get_state_fn in the state
             **get_state_fn(function_result, current_state),
         }
-
-        self.action_space: Dict[str, Function] = {
-            f.get_function_def()["fn_name"]: f for f in action_space
-        }
+        if isinstance(get_state_fn, StateFn):
+            # keep the declared dependencies of the state function
+            self.get_state_fn = get_state_fn.wrap(self.get_state_fn)
+
+    @property
+    def action_space(self) -> ActionSpace:
+        return self._action_space
+
+    @action_space.setter
+    def action_space(self, action_space: Union[List[Function], Dict[str, Function]]):
+        # function definitions are serialized once per action space (see ActionSpace)
+        self._action_space = (
+            action_space if isinstance(action_space, ActionSpace) else ActionSpace(action_space)
+        )
 
 
 class Agent:
+    # class of the standalone workers returned by get_worker
+    _worker_class = Worker
+
     def __init__(self,
                  api_key: str,
                  name: str,
@@ -51,14 +105,51 @@ class Agent:
                  agent_description: str,
                  get_agent_state_fn: Callable,
                  workers: Optional[List[WorkerConfig]] = None,
+                 # HTTP transport for GAME API calls (defaults to the shared pooled transport)
+                 transport: Optional[HTTPTransport] = None,
+                 # registry of remote ids - reuses the agent/map created by a previous run if nothing changed
+                 registry: Optional[AgentRegistry] = None,
+                 # GAME API base url (defaults to GAME_BASE_URL)
+                 base_url: Optional[str] = None,
+                 # timing spans and counters of each step (no-op by default)
+                 instrumentation: Optional[Instrumentation] = None,
+                 # checkpoint file - the agent resumes from it if it exists
+                 checkpoint_path: Optional[str] = None,
+                 # automatically checkpoint to checkpoint_path every N steps
+                 checkpoint_every: Optional[int] = None,
+                 # queue of external events sent with the next step (defaults to a new EventQueue)
+                 events: Optional[EventQueue] = None,
+                 # records every step to a trace file (see virtuals_sdk.game.trace)
+                 recorder: Optional[TraceRecorder] = None,
+                 # size budget applied to the agent state and the worker states
+                 state_budget: Optional[StateBudget] = None,
+                 # moves large function result info values to disk for the lifetime of the session
+                 spill_store: Optional[SpillStore] = None,
                  ):
 
-        self._base_url: str = "https://game.virtuals.io"
+        self._base_url: str = base_url or GAME_BASE_URL
         self._api_key: str = api_key
+        self._transport: Optional[HTTPTransport] = transport
+        self._registry: Optional[AgentRegistry] = registry
+        self._instrumentation: Instrumentation = instrumentation or NOOP_INSTRUMENTATION
+        self._checkpoint_path: Optional[str] = checkpoint_path
+        self.checkpoint_every: Optional[int] = checkpoint_every
+        self.events: EventQueue = events if events is not None else EventQueue()
+        self._recorder: Optional[TraceRecorder] = recorder
+        self._state_budget: Optional[StateBudget] = state_budget
+        self._spill_store: Optional[SpillStore] = spill_store
+        # encoded size of the last action request payload (bytes)
+        self.last_payload_size: Optional[int] = None
+        # pool of ready standalone workers handed out by get_worker (see enable_worker_pool)
+        self._worker_pool: Optional[WorkerPool] = None
+        # encoded states of StateFn state functions, reused while the states are (None: agent state)
+        self._encoded_states: Dict[Optional[str], RawJSON] = {}
 
         # checks
         if not self._api_key:
             raise ValueError("API key not set")
+        if checkpoint_every is not None and checkpoint_path is None:
+            raise ValueError("checkpoint_every requires a checkpoint_path")
 
         # initialize session
         self._session = Session()
@@ -77,48 +168,262 @@ class Agent:
         # get agent/task generator state function
         self.get_agent_state_fn = get_agent_state_fn
 
+        self.agent_id: Optional[str] = None
+        self._map_id: Optional[str] = None
+        # number of steps taken (kept across checkpoints)
+        self._steps = 0
+        # map key of the checkpoint the agent resumed from, until the first step
+        self._resumed_map_key: Optional[str] = None
+        # map key of the workers the map and worker states were last compiled for
+        self._compiled_map_key: Optional[str] = None
+        # workers whose config was replaced since their initial state was computed
+        self._stale_worker_ids: frozenset = frozenset()
+
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            # warm restart - skips the initial state functions and the remote agent creation
+            try:
+                self.restore(checkpoint_path)
+                return
+            except ValueError as e:
+                logger.warning("Ignoring checkpoint %s: %s", checkpoint_path, e)
+
         # initialize and set up agent states
-        self.agent_state = self.get_agent_state_fn(None, None)
+        self.agent_state = self._bounded(self.get_agent_state_fn(None, None))
 
         # create agent
-        self.agent_id = create_agent(
-            self._base_url, self._api_key, self.name, self.agent_description, self.agent_goal
-        )
+        self._init_agent()
+
+    def _init_agent(self):
+        """Create the remote agent instance (or reuse the registered one)"""
+        def create():
+            return create_agent(
+                self._base_url, self._api_key, self.name, self.agent_description, self.agent_goal,
+                transport=self._transport,
+            )
+
+        if self._registry is None:
+            self.agent_id = create()
+        else:
+            self.agent_id = self._registry.get_or_create(self._agent_key(), create)
+
+    def _agent_key(self) -> str:
+        return AgentRegistry.agent_key(
+            self._base_url, self._api_key, self.name, self.agent_description, self.agent_goal)
+
+    def _map_key(self) -> str:
+        return AgentRegistry.map_key(
+            self._base_url, self._api_key, list(self.workers.values()))
 
     def compile(self):
-        """ Compile the workers for the agent - i.e. set up task generator"""
+        """
+        Compile the workers for the agent - i.e. set up task generator.
+
+        The worker map is uploaded while the initial worker states are computed, concurrently.
+        Compiling again after add_worker/remove_worker only updates what changed: the map is uploaded
+        again if the worker descriptions changed, and only added or replaced workers get an initial state.
+        """
         if not self.workers:
             raise ValueError("No workers added to the agent")
 
+        if self._can_resume():
+            # keep the map and worker states restored from the checkpoint
+            return self._map_id
+
+        map_key = self._map_key()
+        pending = self._pending_worker_ids()
+        if map_key == self._compiled_map_key and not pending:
+            # nothing changed since the last compile
+            return self._map_id
+
         workers_list = list(self.workers.values())
 
-        self._map_id = create_workers(
-            self._base_url, self._api_key, workers_list)
-        self.current_worker_id = next(iter(self.workers.values())).id
+        def create():
+            return create_workers(
+                self._base_url, self._api_key, workers_list, transport=self._transport)
+
+        with ThreadPoolExecutor(max_workers=min(len(pending), COMPILE_CONCURRENCY) + 1,
+                                thread_name_prefix="game-compile") as executor:
+            map_future = None
+            if map_key != self._compiled_map_key:
+                map_future = executor.submit(
+                    create if self._registry is None else lambda: self._registry.get_or_create(map_key, create))
+            states = dict(zip(pending, executor.map(self._initial_worker_state, pending)))
+            if map_future is not None:
+                self._map_id = map_future.result()
+
+        self._compiled_map_key = map_key
+        self._set_worker_states(states)
+        return self._map_id
 
-        # initialize and set up worker states
-        worker_states = {}
-        for worker in workers_list:
-            dummy_function_result = FunctionResult(
-                action_id="",
-                action_status=FunctionResultStatus.DONE,
-                feedback_message="",
-                info={},
-            )
-            worker_states[worker.id] = worker.get_state_fn(
-                dummy_function_result, self.agent_state)
+    def _can_resume(self) -> bool:
+        """Whether the map and worker states restored from a checkpoint are still valid"""
+        return self._resumed_map_key is not None and self._resumed_map_key == self._map_key()
 
+    def _init_worker_states(self, executor: Optional[Executor] = None):
+        """Set the starting worker and initialize all worker states (on the executor, if given)"""
+        self.current_worker_id = next(iter(self.workers.values())).id
+
+        worker_ids = list(self.workers)
+        states = executor.map(self._initial_worker_state, worker_ids) if executor is not None else (
+            self._initial_worker_state(worker_id) for worker_id in worker_ids)
+        self.worker_states = {}
+        self._set_worker_states(dict(zip(worker_ids, states)))
+
+    def _initial_worker_state(self, worker_id: str) -> dict:
+        dummy_function_result = FunctionResult(
+            action_id="",
+            action_status=FunctionResultStatus.DONE,
+            feedback_message="",
+            info={},
+        )
+        return self._bounded(self.workers[worker_id].get_state_fn(dummy_function_result, self.agent_state))
+
+    def _pending_worker_ids(self) -> List[str]:
+        """Workers without an (up to date) initial state"""
+        worker_states = getattr(self, "worker_states", None) or {}
+        return [
+            worker_id for worker_id in self.workers
+            if worker_id not in worker_states or worker_id in self._stale_worker_ids
+        ]
+
+    def _set_worker_states(self, states: Dict[str, dict]):
+        """Merge newly computed worker states and drop the states of removed workers"""
+        worker_states = {
+            worker_id: state for worker_id, state in (getattr(self, "worker_states", None) or {}).items()
+            if worker_id in self.workers
+        }
+        worker_states.update(states)
         self.worker_states = worker_states
+        # reassigned, not mutated - session views share it with their agent
+        self._stale_worker_ids = self._stale_worker_ids.difference(states)
+        if self.current_worker_id not in self.workers:
+            self.current_worker_id = next(iter(self.workers))
+
+    def checkpoint(self, path: Optional[str] = None):
+        """
+        Save the live state of the agent (remote ids, agent/worker states, session) to a file, atomically.
+        Paths ending in .gz are gzip compressed. The states and the function result info must be JSON
+        data (dicts with string keys, lists, strings, numbers, booleans, None - tuples are restored as
+        lists), otherwise a TypeError names the value that can't be saved.
+        """
+        path = path or self._checkpoint_path
+        if path is None:
+            raise ValueError("No checkpoint path given")
+
+        function_result = self._session.function_result
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "agent_key": self._agent_key(),
+            "map_key": self._map_key(),
+            "agent_id": self.agent_id,
+            "map_id": self._map_id,
+            "steps": self._steps,
+            "current_worker_id": self.current_worker_id,
+            "agent_state": self.agent_state,
+            "worker_states": getattr(self, "worker_states", None),
+            "session": {
+                "id": self._session.id,
+                "function_result": function_result.model_dump() if function_result else None,
+            },
+        }
+        # fail before writing - the previous checkpoint (if any) is kept
+        _check_checkpoint_value(data, "checkpoint")
+        encoded = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        if path.endswith(".gz"):
+            encoded = gzip.compress(encoded, compresslevel=6)
+        atomic_write(path, encoded)
+
+    def restore(self, path: Optional[str] = None):
+        """
+        Restore the state saved by checkpoint - the agent can step again right away (compile keeps the
+        restored state). If the workers changed since the checkpoint, only the agent state is restored
+        and compile has to set up a new map.
+        """
+        path = path or self._checkpoint_path
+        if path is None:
+            raise ValueError("No checkpoint path given")
+
+        with open(path, "rb") as f:
+            encoded = f.read()
+        if path.endswith(".gz"):
+            encoded = gzip.decompress(encoded)
+        data = json.loads(encoded)
+
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+        if data["agent_key"] != self._agent_key():
+            raise ValueError("Checkpoint was saved by a different agent (name, description or goal changed)")
+
+        self.agent_id = data["agent_id"]
+        self.agent_state = data["agent_state"]
+        self._steps = data["steps"]
 
-        return self._map_id
+        self._session = Session()
+        self._session.id = data["session"]["id"]
+        if data["session"]["function_result"] is not None:
+            self._session.function_result = FunctionResult.model_validate(
+                data["session"]["function_result"])
+        if self._spill_store is not None:
+            # spilled values come back as plain dicts - make them loadable handles again
+            self.agent_state = self._spill_store.rehydrate(self.agent_state)
+            if self._session.function_result is not None:
+                self._spill_store.rehydrate(self._session.function_result.info)
+
+        if data["map_id"] is not None and data["map_key"] == self._map_key():
+            self._map_id = data["map_id"]
+            self.current_worker_id = data["current_worker_id"]
+            self.worker_states = data["worker_states"]
+            self._resumed_map_key = data["map_key"]
+            self._compiled_map_key = data["map_key"]
+            if self._spill_store is not None:
+                self._spill_store.rehydrate(self.worker_states)
+        else:
+            logger.warning("Workers changed since the checkpoint - compile sets up a new map")
+            self._map_id = None
+            self._resumed_map_key = None
+            self._compiled_map_key = None
+            self._stale_worker_ids = frozenset(self.workers)
+
+    def _after_step(self):
+        """Count the step and checkpoint if due"""
+        self._resumed_map_key = None
+        self._steps += 1
+        if self.checkpoint_every and self._steps % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def push_event(self, key: str, value, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Queue an external event for the next step - events with the same key are coalesced.
+        Returns False if the event queue stayed full (see EventQueue.put)
+        """
+        return self.events.put(key, value, block=block, timeout=timeout)
 
     def reset(self):
         """ Reset the agent session"""
+        self._release_spilled()
         self._session.reset()
 
+    def _release_spilled(self, session_id: Optional[str] = None):
+        """Delete the spilled info values of a session (default: the current one) once it ended"""
+        if self._spill_store is not None:
+            self._spill_store.release(session_id or self._session.id)
+
     def add_worker(self, worker_config: WorkerConfig):
-        """Add worker to worker dict for the agent"""
+        """Add worker to worker dict for the agent (compile again to use it)"""
+        if worker_config.id in self.workers:
+            # the initial state of a replaced worker is computed again by compile
+            self._stale_worker_ids = self._stale_worker_ids | {worker_config.id}
         self.workers[worker_config.id] = worker_config
+        if self._worker_pool is not None:
+            # pooled workers were built from the previous config
+            self._worker_pool.clear(worker_config.id)
+        return self.workers
+
+    def remove_worker(self, worker_id: str):
+        """Remove a worker from the worker dict for the agent (compile again to update the map)"""
+        del self.workers[worker_id]
+        if self._worker_pool is not None:
+            self._worker_pool.clear(worker_id)
         return self.workers
 
     def get_worker_config(self, worker_id: str):
@@ -126,21 +431,54 @@ class Agent:
         return self.workers[worker_id]
 
     def get_worker(self, worker_id: str):
-        """Initialize a working interactable standalone worker"""
+        """Initialize a working interactable standalone worker (taken from the worker pool, if enabled)"""
+        if self._worker_pool is not None:
+            return self._worker_pool.acquire(worker_id)
+        return self._build_worker(worker_id)
+
+    def release_worker(self, worker_id: str, worker: Worker):
+        """Return a worker from get_worker to the worker pool (no-op without a pool)"""
+        if self._worker_pool is not None:
+            self._worker_pool.release(worker_id, worker)
+
+    def enable_worker_pool(
+        self,
+        # maximum number of ready workers kept per worker id
+        max_idle: int = 4,
+        idle_timeout: Optional[float] = 300.0,
+        # build max_idle workers for every worker id right away
+        prewarm: bool = False,
+    ) -> WorkerPool:
+        """Hand out pooled workers from get_worker - workers given back with release_worker are reused"""
+        self._worker_pool = WorkerPool(self._build_worker, max_idle=max_idle, idle_timeout=idle_timeout)
+        if prewarm:
+            for worker_id in self.workers:
+                self._worker_pool.prewarm(worker_id)
+        return self._worker_pool
+
+    def _build_worker(self, worker_id: str):
         worker_config = self.get_worker_config(worker_id)
-        return Worker(
+        return self._worker_class(
             api_key=self._api_key,
             # THIS DESCRIPTION IS THE AGENT DESCRIPTION/CHARACTER CARD - WORKER DESCRIPTION IS ONLY USED FOR THE TASK GENERATOR
             description=self.agent_description,
             instruction=worker_config.instruction,
             get_state_fn=worker_config.get_state_fn,
             action_space=worker_config.action_space,
+            transport=self._transport,
+            registry=self._registry,
+            base_url=self._base_url,
+            instrumentation=self._instrumentation,
+            recorder=self._recorder,
+            state_budget=self._state_budget,
+            spill_store=self._spill_store,
         )
 
-    def _get_action(
+    def _get_action_payload(
         self,
         function_result: Optional[FunctionResult] = None
-    ) -> ActionResponse:
+    ) -> dict:
+        """Build the data payload for the next action request"""
 
         # dummy function result if None is provided - for get_state_fn to take the same input all the time
         if function_result is None:
@@ -152,16 +490,15 @@ class Agent:
             )
 
         # set up payload
-        data = {
+        return {
             "location": self.current_worker_id,
             "map_id": self._map_id,
-            "environment": self.worker_states[self.current_worker_id],
-            "functions": [
-                f.get_function_def()
-                for f in self.workers[self.current_worker_id].action_space.values()
-            ],
-            "events": {},
-            "agent_state": self.agent_state,
+            "environment": self._state_payload(
+                self.current_worker_id, self.workers[self.current_worker_id].get_state_fn,
+                self.worker_states[self.current_worker_id]),
+            "functions": self.workers[self.current_worker_id].action_space.function_defs(),
+            "events": self.events.drain(),
+            "agent_state": self._state_payload(None, self.get_agent_state_fn, self.agent_state),
             "current_action": (
                 function_result.model_dump(
                     exclude={'info'}) if function_result else None
@@ -169,80 +506,225 @@ class Agent:
             "version": "v2",
         }
 
-        # make API call
-        response = post(
-            base_url=self._base_url,
-            api_key=self._api_key,
-            endpoint=f"/v2/agents/{self.agent_id}/actions",
-            data=data,
-        )
+    def _state_payload(self, key: Optional[str], state_fn: Callable, state: dict):
+        """A state for the payload - states of StateFn state functions are encoded once while reused"""
+        if not isinstance(state_fn, StateFn):
+            return state
+        encoded = self._encoded_states.get(key)
+        if encoded is None or encoded.value is not state:
+            encoded = self._encoded_states[key] = RawJSON(state, encode_json(state))
+        return encoded
+
+    def _encode_payload(self, data: dict) -> RawJSON:
+        """Encode the payload once - its size is reported and post sends it verbatim"""
+        encoded = encode_json(data)
+        self.last_payload_size = len(encoded.encode("utf-8"))
+        self._instrumentation.count(spans.PAYLOAD_BYTES, self.last_payload_size)
+        return RawJSON(data, encoded)
+
+    def _get_action(
+        self,
+        function_result: Optional[FunctionResult] = None
+    ) -> ActionResponse:
+        instrumentation = self._instrumentation
 
-        return ActionResponse.model_validate(response)
+        with instrumentation.span(spans.PAYLOAD_BUILD):
+            data = self._get_action_payload(function_result)
+            body = self._encode_payload(data)
+        # kept for the trace recorder
+        self._last_payload = data
 
-    def step(self):
+        # make sure the access token is cached, so that the API call span only measures the call itself
+        with instrumentation.span(spans.TOKEN_FETCH):
+            get_access_token(self._api_key, self._transport)
 
-        # get next task/action from GAME API
-        action_response = self._get_action(self._session.function_result)
+        # make API call
+        with instrumentation.span(spans.API_CALL):
+            try:
+                response = post(
+                    base_url=self._base_url,
+                    api_key=self._api_key,
+                    endpoint=f"/v2/agents/{self.agent_id}/actions",
+                    data=body,
+                    transport=self._transport,
+                )
+            except Exception:
+                # the events were not delivered - send them with the next step
+                self.events.requeue(data["events"])
+                raise
+
+        with instrumentation.span(spans.RESPONSE_VALIDATION):
+            return ActionResponse.model_validate(response)
+
+    def _process_action(self, action_response: ActionResponse) -> Optional[Function]:
+        """
+        Apply the action returned by GAME - returns the function to execute (if any)
+        """
         action_type = action_response.action_type
+        self._instrumentation.count(spans.ACTIONS, action_type=action_type.value)
 
-        print("#" * 50)
-        print("STEP")
-        print(f"Current Task: {action_response.agent_state.current_task}")
-        print(f"Action response: {action_response}")
-        print(f"Action type: {action_type}")
+        logger.info("Step - action type: %s", action_type)
+        if logger.isEnabledFor(logging.DEBUG):
+            # the agent state is decoded lazily - only touch it when it gets logged
+            logger.debug("Current Task: %s", action_response.agent_state.current_task)
+            logger.debug("Action response: %s", action_response)
 
         # if new task is updated/generated
         if (
             action_response.agent_state.hlp
             and action_response.agent_state.hlp.change_indicator
         ):
-            print("New task generated")
-            print(f"Task: {action_response.agent_state.current_task}")
+            logger.info("New task generated - task: %s",
+                        action_response.agent_state.current_task)
 
-        # execute action
+        # select action
         if action_type in [
             ActionType.CALL_FUNCTION,
             ActionType.CONTINUE_FUNCTION,
         ]:
-            print(f"Action Selected: {action_response.action_args['fn_name']}")
-            print(f"Action Args: {action_response.action_args['args']}")
-
             if not action_response.action_args:
                 raise ValueError("No function information provided by GAME")
 
-            self._session.function_result = (
+            logger.info("Action selected: %s", action_response.action_args['fn_name'])
+            logger.debug("Action args: %s", action_response.action_args['args'])
+
+            return (
                 self.workers[self.current_worker_id]
                 .action_space[action_response.action_args["fn_name"]]
-                .execute(**action_response.action_args)
             )
 
-            print(f"Function result: {self._session.function_result}")
-
-            # update worker states
-            updated_worker_state = self.workers[self.current_worker_id].get_state_fn(
-                self._session.function_result, self.worker_states[self.current_worker_id])
-            self.worker_states[self.current_worker_id] = updated_worker_state
-
         elif action_response.action_type == ActionType.WAIT:
-            print("Task ended completed or ended (not possible wiht current actions)")
+            logger.info("Task ended completed or ended (not possible wiht current actions)")
 
         elif action_response.action_type == ActionType.GO_TO:
             if not action_response.action_args:
                 raise ValueError("No location information provided by GAME")
 
             next_worker = action_response.action_args["location_id"]
-            print(f"Next worker selected: {next_worker}")
+            logger.info("Next worker selected: %s", next_worker)
             self.current_worker_id = next_worker
 
         else:
             raise ValueError(
                 f"Unknown action type: {action_response.action_type}")
 
-        # update agent state
-        self.agent_state = self.get_agent_state_fn(
-            self._session.function_result, self.agent_state)
+        return None
+
+    def _record_function_result(self, function: Function):
+        """Log and count the result of the executed function, and invalidate cached results it made stale"""
+        function_result = self._session.function_result
+        self.workers[self.current_worker_id].action_space.function_executed(function)
+        self._instrumentation.count(
+            spans.FUNCTION_CALLS, fn_name=function.fn_name, status=function_result.action_status.value)
+        logger.debug("Function result: %s", function_result)
+
+    def _spill_function_result(self):
+        """Move the large info values of the last function result to the spill store (if any)"""
+        if self._spill_store is not None:
+            spilled = self._spill_store.spill(self._session.function_result.info, self._session.id)
+            if spilled:
+                self._instrumentation.count(spans.SPILLED_BYTES, spilled)
+
+    def _record_trace(self, action_response: ActionResponse, function: Optional[Function], duration: float):
+        """Write the step to the trace recorder (if any)"""
+        if self._recorder is not None:
+            self._recorder.record(
+                "agent",
+                self._last_payload,
+                action_response,
+                self._session.function_result if function is not None else None,
+                duration,
+                session_id=self._session.id,
+            )
+
+    def _bounded(self, state: dict) -> dict:
+        """Apply the state budget (if any)"""
+        return self._state_budget.apply(state) if self._state_budget is not None else state
+
+    def _update_worker_state(self, function: Function):
+        """Update the state of the current worker with the last function result"""
+
+        updated_worker_state, reused = call_state_fn(
+            self.workers[self.current_worker_id].get_state_fn,
+            self._session.function_result, self.worker_states[self.current_worker_id], function.fn_name)
+        if not reused:
+            self._encoded_states.pop(self.current_worker_id, None)
+            self.worker_states[self.current_worker_id] = self._bounded(updated_worker_state)
+
+    def _update_agent_state(self, function: Optional[Function]):
+        """Update the agent/task generator state with the last function result (if a function ran this step)"""
+        updated_agent_state, reused = call_state_fn(
+            self.get_agent_state_fn, self._session.function_result, self.agent_state,
+            function.fn_name if function is not None else None)
+        if not reused:
+            self._encoded_states.pop(None, None)
+            self.agent_state = self._bounded(updated_agent_state)
+
+    def step(self):
+        instrumentation = self._instrumentation
+        started = time.perf_counter()
+
+        with instrumentation.span(spans.STEP):
+            # get next task/action from GAME API
+            action_response = self._get_action(self._session.function_result)
+
+            # execute action
+            function = self._process_action(action_response)
+            function_duration = None
+            if function is not None:
+                with instrumentation.span(spans.FUNCTION_EXECUTION):
+                    function_started = time.perf_counter()
+                    self._session.function_result = function.execute(
+                        **action_response.action_args)
+                    function_duration = time.perf_counter() - function_started
+                self._record_function_result(function)
+                self._spill_function_result()
+
+            with instrumentation.span(spans.STATE_UPDATE):
+                if function is not None:
+                    self._update_worker_state(function)
+                self._update_agent_state(function)
+
+        duration = time.perf_counter() - started
+        self._record_trace(action_response, function, duration)
+        self._after_step()
+        return self._step_event(action_response, function, duration, function_duration)
+
+    def _step_event(
+        self,
+        action_response: ActionResponse,
+        function: Optional[Function],
+        duration: float,
+        function_duration: Optional[float],
+    ) -> StepEvent:
+        """Describe the step that just ended"""
+        return StepEvent(
+            step=self._steps,
+            action_type=action_response.action_type,
+            worker_id=self.current_worker_id,
+            fn_name=function.fn_name if function is not None else None,
+            args=Function._process_args(action_response.action_args.get("args") or {}) if function is not None else None,
+            result=self._session.function_result if function is not None else None,
+            duration=duration,
+            function_duration=function_duration,
+            action_response=action_response,
+        )
 
     def run(self):
-        self._session = Session()
-        while True:
-            self.step()
+        for _ in self.stream():
+            pass
+
+    def stream(self, max_steps: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[StepEvent]:
+        """
+        Run the agent, yielding a StepEvent after each step - stops after max_steps steps or once
+        `timeout` seconds passed (checked between steps), or when the consumer stops iterating
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        # a resumed agent continues the session of its checkpoint
+        if not self._can_resume():
+            self._release_spilled()
+            self._session = Session()
+        steps = 0
+        while (max_steps is None or steps < max_steps) and (deadline is None or time.monotonic() < deadline):
+            yield self.step()
+            steps += 1
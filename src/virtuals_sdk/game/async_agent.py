@@ -0,0 +1,194 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterator, Optional
+from virtuals_sdk.game.agent import Agent, Session
+from virtuals_sdk.game.async_worker import AsyncWorker
+from virtuals_sdk.game.custom_types import FunctionResult, ActionResponse, StepEvent
+from virtuals_sdk.game.utils import (
+    own_io_executor, async_create_agent, async_create_workers, async_get_access_token, async_post)
+from virtuals_sdk.game import instrumentation as spans
+
+
+class AsyncAgent(Agent):
+    """
+    Asyncio version of Agent - compile, step and run are coroutines, so many agents can share one event
+    loop. Functions may use `async def` executables; state functions keep the same (synchronous) contract.
+
+    GAME API calls are still blocking HTTP requests, run on a thread pool: the shared pool has
+    DEFAULT_POOL_MAXSIZE (32) threads, so at most 32 requests of all agents using it are in flight at
+    once (retry backoff holds a thread too) and further steps queue behind them. Pass
+    max_concurrent_requests (a dedicated pool), or io_executor (a pool shared by several agents), to
+    raise that ceiling - together with a transport whose pool_maxsize matches, so every request keeps
+    a connection. The workers of the agent use the same executor.
+
+    The remote agent instance is created in compile (together with the workers) instead of in the constructor.
+    """
+
+    _worker_class = AsyncWorker
+
+    def __init__(
+        self,
+        *args,
+        # executor running the blocking GAME API calls (defaults to the shared I/O pool)
+        io_executor: Optional[Executor] = None,
+        # size of a dedicated I/O pool for this agent and its workers, instead of io_executor
+        max_concurrent_requests: Optional[int] = None,
+        **kwargs,
+    ):
+        self._io_executor = own_io_executor(self, io_executor, max_concurrent_requests)
+        super().__init__(*args, **kwargs)
+
+    def _init_agent(self):
+        # created asynchronously in compile
+        self.agent_id = None
+
+    def _build_worker(self, worker_id: str):
+        worker = super()._build_worker(worker_id)
+        worker._io_executor = self._io_executor
+        return worker
+
+    async def compile(self):
+        """
+        Compile the workers for the agent - i.e. set up task generator. The remote agent, the worker map
+        and the initial worker states are set up concurrently; compiling again only updates what changed
+        (see Agent.compile).
+        """
+        if not self.workers:
+            raise ValueError("No workers added to the agent")
+
+        if self._can_resume():
+            # keep the map and worker states restored from the checkpoint
+            return self._map_id
+
+        map_key = self._map_key()
+        pending_ids = self._pending_worker_ids()
+        if self.agent_id is not None and map_key == self._compiled_map_key and not pending_ids:
+            # nothing changed since the last compile
+            return self._map_id
+
+        workers_list = list(self.workers.values())
+
+        if self._registry is not None:
+            # reuse the remote objects of a previous run if nothing changed
+            if self.agent_id is None:
+                self.agent_id = self._registry.get(self._agent_key())
+            if map_key != self._compiled_map_key:
+                self._map_id = self._registry.get(map_key)
+        elif map_key != self._compiled_map_key:
+            self._map_id = None
+
+        # create the missing remote objects while the state functions run on the default executor
+        loop = asyncio.get_running_loop()
+        pending = {}
+        if self.agent_id is None:
+            pending["agent"] = async_create_agent(
+                self._base_url, self._api_key, self.name, self.agent_description, self.agent_goal,
+                transport=self._transport,
+                executor=self._io_executor,
+            )
+        if self._map_id is None:
+            pending["map"] = async_create_workers(
+                self._base_url, self._api_key, workers_list, transport=self._transport,
+                executor=self._io_executor)
+        for worker_id in pending_ids:
+            pending[("state", worker_id)] = loop.run_in_executor(None, self._initial_worker_state, worker_id)
+
+        created = dict(zip(pending, await asyncio.gather(*pending.values())))
+        if "agent" in created:
+            self.agent_id = created["agent"]
+            if self._registry is not None:
+                self._registry.put(self._agent_key(), self.agent_id)
+        if "map" in created:
+            self._map_id = created["map"]
+            if self._registry is not None:
+                self._registry.put(map_key, self._map_id)
+
+        self._compiled_map_key = map_key
+        self._set_worker_states({worker_id: created[("state", worker_id)] for worker_id in pending_ids})
+
+        return self._map_id
+
+    async def _get_action(
+        self,
+        function_result: Optional[FunctionResult] = None
+    ) -> ActionResponse:
+        instrumentation = self._instrumentation
+
+        with instrumentation.span(spans.PAYLOAD_BUILD):
+            data = self._get_action_payload(function_result)
+            body = self._encode_payload(data)
+        # kept for the trace recorder
+        self._last_payload = data
+
+        # make sure the access token is cached, so that the API call span only measures the call itself
+        with instrumentation.span(spans.TOKEN_FETCH):
+            await async_get_access_token(self._api_key, self._transport, self._io_executor)
+
+        # make API call
+        with instrumentation.span(spans.API_CALL):
+            try:
+                response = await async_post(
+                    base_url=self._base_url,
+                    api_key=self._api_key,
+                    endpoint=f"/v2/agents/{self.agent_id}/actions",
+                    data=body,
+                    transport=self._transport,
+                    executor=self._io_executor,
+                )
+            except Exception:
+                # the events were not delivered - send them with the next step
+                self.events.requeue(data["events"])
+                raise
+
+        with instrumentation.span(spans.RESPONSE_VALIDATION):
+            return ActionResponse.model_validate(response)
+
+    async def step(self):
+        instrumentation = self._instrumentation
+        started = time.perf_counter()
+
+        with instrumentation.span(spans.STEP):
+            # get next task/action from GAME API
+            action_response = await self._get_action(self._session.function_result)
+
+            # execute action
+            function = self._process_action(action_response)
+            function_duration = None
+            if function is not None:
+                with instrumentation.span(spans.FUNCTION_EXECUTION):
+                    function_started = time.perf_counter()
+                    self._session.function_result = await function.aexecute(
+                        **action_response.action_args)
+                    function_duration = time.perf_counter() - function_started
+                self._record_function_result(function)
+                self._spill_function_result()
+
+            with instrumentation.span(spans.STATE_UPDATE):
+                if function is not None:
+                    self._update_worker_state(function)
+                self._update_agent_state(function)
+
+        duration = time.perf_counter() - started
+        self._record_trace(action_response, function, duration)
+        self._after_step()
+        return self._step_event(action_response, function, duration, function_duration)
+
+    async def run(self):
+        async for _ in self.stream():
+            pass
+
+    async def stream(self, max_steps: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator[StepEvent]:
+        """
+        Run the agent, yielding a StepEvent after each step - stops after max_steps steps or once
+        `timeout` seconds passed (checked between steps), or when the consumer stops iterating
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        # a resumed agent continues the session of its checkpoint
+        if not self._can_resume():
+            self._release_spilled()
+            self._session = Session()
+        steps = 0
+        while (max_steps is None or steps < max_steps) and (deadline is None or time.monotonic() < deadline):
+            yield await self.step()
+            steps += 1
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, List, Optional
+from virtuals_sdk.game.worker import Worker
+from virtuals_sdk.game.custom_types import FunctionResult, ActionResponse, StepEvent
+from virtuals_sdk.game.utils import own_io_executor, async_create_agent, async_get_access_token, async_post
+from virtuals_sdk.game import instrumentation as spans
+
+
+class AsyncWorker(Worker):
+    """
+    Asyncio version of Worker - set_task, step and run are coroutines, so many workers can share one event loop.
+    Functions may use `async def` executables; state functions keep the same (synchronous) contract.
+
+    GAME API calls run on a thread pool - see AsyncAgent for the ceiling this puts on concurrent
+    requests, and io_executor / max_concurrent_requests to raise it.
+
+    The remote agent instance is created on the first set_task instead of in the constructor.
+    """
+
+    def __init__(
+        self,
+        *args,
+        # executor running the blocking GAME API calls (defaults to the shared I/O pool)
+        io_executor: Optional[Executor] = None,
+        # size of a dedicated I/O pool for this worker, instead of io_executor
+        max_concurrent_requests: Optional[int] = None,
+        **kwargs,
+    ):
+        self._io_executor = own_io_executor(self, io_executor, max_concurrent_requests)
+        super().__init__(*args, **kwargs)
+
+    def _init_agent(self):
+        # created asynchronously on the first set_task
+        self._agent_id = None
+        # limits the tasks run concurrently by submit (created on first use, in the event loop)
+        self._task_semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _ensure_agent(self):
+        """
+        Creates the remote agent instance (or reuses the registered one) if not done yet
+        """
+        if self._agent_id is None and self._registry is not None:
+            self._agent_id = self._registry.get(self._agent_key())
+        if self._agent_id is None:
+            self._agent_id = await async_create_agent(
+                self._base_url, self._api_key, "StandaloneWorker", self.description, "N/A",
+                transport=self._transport,
+                executor=self._io_executor,
+            )
+            if self._registry is not None:
+                self._registry.put(self._agent_key(), self._agent_id)
+
+    async def set_task(self, task: str):
+        """
+        Sets the task for the agent
+        """
+        await self._ensure_agent()
+
+        set_task_response = await async_post(
+            base_url=self._base_url,
+            api_key=self._api_key,
+            endpoint=f"/v2/agents/{self._agent_id}/tasks",
+            data={"task": task},
+            transport=self._transport,
+            executor=self._io_executor,
+        )
+
+        # task ID
+        self._submission_id = set_task_response["submission_id"]
+        self._task_steps = 0
+
+        return self._submission_id
+
+    async def _get_action(
+        self,
+        # results of the previous action (if any)
+        function_result: Optional[FunctionResult] = None
+    ) -> ActionResponse:
+        """
+        Gets the agent action from the GAME API
+        """
+        instrumentation = self._instrumentation
+
+        with instrumentation.span(spans.PAYLOAD_BUILD):
+            data = self._get_action_payload(function_result)
+            body = self._encode_payload(data)
+        # kept for the trace recorder
+        self._last_payload = data
+
+        # make sure the access token is cached, so that the API call span only measures the call itself
+        with instrumentation.span(spans.TOKEN_FETCH):
+            await async_get_access_token(self._api_key, self._transport, self._io_executor)
+
+        # make API call
+        with instrumentation.span(spans.API_CALL):
+            response = await async_post(
+                base_url=self._base_url,
+                api_key=self._api_key,
+                endpoint=f"/v2/agents/{self._agent_id}/tasks/{self._submission_id}/next",
+                data=body,
+                transport=self._transport,
+                executor=self._io_executor,
+            )
+
+        with instrumentation.span(spans.RESPONSE_VALIDATION):
+            return ActionResponse.model_validate(response)
+
+    async def step(self):
+        """
+        Execute the next step in the task - requires a task ID (i.e. task ID)
+        """
+        if not self._submission_id:
+            raise ValueError("No task set")
+
+        instrumentation = self._instrumentation
+        started = time.perf_counter()
+
+        with instrumentation.span(spans.STEP):
+            # get action from GAME API (Agent)
+            action_response = await self._get_action(self._function_result)
+
+            # execute action
+            function = self._process_action(action_response)
+            function_duration = None
+            if function is not None:
+                with instrumentation.span(spans.FUNCTION_EXECUTION):
+                    function_started = time.perf_counter()
+                    self._function_result = await function.aexecute(**action_response.action_args)
+                    function_duration = time.perf_counter() - function_started
+                self._record_function_result(function)
+                self._spill_function_result()
+
+                with instrumentation.span(spans.STATE_UPDATE):
+                    self._update_state(function)
+
+        duration = time.perf_counter() - started
+        self._record_trace(action_response, function, duration)
+        self._task_steps += 1
+        self._last_step_event = self._step_event(action_response, function, duration, function_duration)
+        # later steps replace the function result rather than modifying it, so it is not copied
+        # (None when the first action of the task is WAIT)
+        return action_response, self._function_result
+
+    async def run(self, task: str):
+        """
+        Gets the agent to complete the task on its own autonomously
+        """
+
+        async for _ in self.stream(task):
+            pass
+
+    async def stream(self, task: str, max_steps: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator[StepEvent]:
+        """
+        Works on the task, yielding a StepEvent after each step - stops when the task is done, after
+        max_steps steps or once `timeout` seconds passed (checked between steps), or when the consumer
+        stops iterating
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        await self.set_task(task)
+        while self._submission_id and (max_steps is None or self._task_steps < max_steps) and (
+                deadline is None or time.monotonic() < deadline):
+            await self.step()
+            yield self._last_step_event
+
+    async def _run_task(self, task: str) -> Optional[FunctionResult]:
+        async with self._task_semaphore:
+            view = self._task_view()
+            try:
+                await view.run(task)
+                return view._task_result()
+            finally:
+                view._release_spilled()
+
+    async def submit(
+        self,
+        task: str,
+        # called with the asyncio task once it is done
+        callback: Optional[Callable[[asyncio.Task], Any]] = None,
+    ) -> asyncio.Task:
+        """
+        Runs a task in the background, concurrently with other submitted tasks (up to max_concurrent_tasks)
+        on the same remote agent - the asyncio task resolves to the last function result of the task
+        """
+        # created once, before the tasks share it
+        await self._ensure_agent()
+        if self._task_semaphore is None:
+            self._task_semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+        task_future = asyncio.ensure_future(self._run_task(task))
+        if callback is not None:
+            task_future.add_done_callback(callback)
+        return task_future
+
+    async def run_many(self, tasks: List[str]) -> List[Optional[FunctionResult]]:
+        """
+        Runs the tasks concurrently and returns their last function results (in order)
+        """
+        futures = [await self.submit(task) for task in tasks]
+        return list(await asyncio.gather(*futures))
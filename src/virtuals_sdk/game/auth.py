@@ -0,0 +1,133 @@
+import base64
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# fallback lifetime for tokens that carry no expiry information
+DEFAULT_TOKEN_TTL = 300.0
+
+
+def get_token_expiry(token: str, default_ttl: float = DEFAULT_TOKEN_TTL) -> float:
+    """
+    Best-effort expiry (unix time) of an access token - reads the `exp` claim of a JWT,
+    falls back to now + default_ttl for opaque tokens
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode()))
+        return float(claims["exp"])
+    except Exception:
+        return time.time() + default_ttl
+
+
+class _TokenEntry:
+    def __init__(self, token: str, expires_at: float):
+        self.token = token
+        self.expires_at = expires_at
+        self.refreshing = False
+
+
+class TokenCache:
+    """
+    Process-wide, thread-safe cache of GAME access tokens keyed by API key.
+
+    - a valid token is served from memory without any network call
+    - a token within `refresh_margin` seconds of expiry is still served, while a single
+      background thread fetches its replacement (refresh-ahead)
+    - a missing/expired token is fetched synchronously; concurrent callers for the
+      same API key wait on one fetch instead of each minting their own token
+
+    `fetch_token(api_key, transport)` mints a new token and returns it with its expiry.
+    """
+
+    def __init__(
+        self,
+        fetch_token: Callable[[str, Any], Tuple[str, float]],
+        refresh_margin: float = 60.0,
+        # tokens closer than this to expiry are never served
+        expiry_skew: float = 5.0,
+    ):
+        self._fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.expiry_skew = expiry_skew
+
+        self._entries: Dict[str, _TokenEntry] = {}
+        self._lock = threading.Lock()
+        # one lock per API key so that different keys don't block each other
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _key_lock(self, api_key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(api_key)
+            if lock is None:
+                lock = self._key_locks[api_key] = threading.Lock()
+            return lock
+
+    def get(self, api_key: str, transport: Optional[Any] = None) -> str:
+        """
+        Get a valid access token for the API key - `transport` is used if a fetch is needed
+        """
+        now = time.time()
+        entry = self._entries.get(api_key)
+
+        if entry is not None and entry.expires_at - self.expiry_skew > now:
+            if entry.expires_at - self.refresh_margin <= now:
+                self._refresh_in_background(api_key, entry, transport)
+            return entry.token
+
+        with self._key_lock(api_key):
+            # another thread may have fetched the token while we were waiting
+            entry = self._entries.get(api_key)
+            if entry is not None and entry.expires_at - self.expiry_skew > time.time():
+                return entry.token
+            return self._refresh(api_key, transport).token
+
+    def peek(self, api_key: str) -> Optional[str]:
+        """
+        Get the cached token for the API key if it is still valid - never fetches
+        """
+        entry = self._entries.get(api_key)
+        if entry is not None and entry.expires_at - self.expiry_skew > time.time():
+            return entry.token
+        return None
+
+    def invalidate(self, api_key: str):
+        """
+        Drop the cached token for the API key (e.g. after the backend rejected it)
+        """
+        with self._lock:
+            self._entries.pop(api_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _refresh(self, api_key: str, transport: Optional[Any] = None) -> _TokenEntry:
+        token, expires_at = self._fetch_token(api_key, transport)
+        entry = _TokenEntry(token, expires_at)
+        with self._lock:
+            self._entries[api_key] = entry
+        return entry
+
+    def _refresh_in_background(self, api_key: str, entry: _TokenEntry, transport: Optional[Any] = None):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def refresh():
+            try:
+                with self._key_lock(api_key):
+                    current = self._entries.get(api_key)
+                    # skip if the token was already replaced in the meantime
+                    if current is entry or current is None:
+                        self._refresh(api_key, transport)
+            except Exception:
+                # keep serving the current token - the next caller will retry once it expires
+                entry.refreshing = False
+
+        threading.Thread(
+            target=refresh, name="game-token-refresh", daemon=True).start()
@@ -1,8 +1,24 @@
-from typing import Any, Dict, Optional, List, Union, Sequence, Callable, Tuple
-from pydantic import BaseModel, Field
+import asyncio
+import collections.abc
+import dataclasses
+import functools
+import inspect
+import json
+import itertools
+import logging
+import sys
+import threading
+import typing
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, ClassVar, Dict, Optional, List, Union, Sequence, Callable, Tuple
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_serializer, field_validator
 from enum import Enum
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from virtuals_sdk.game.function_cache import FUNCTION_CACHE, normalize_args
+
+
+logger = logging.getLogger(__name__)
 
 
 class Argument(BaseModel):
@@ -21,7 +37,250 @@ class FunctionResult(BaseModel):
     feedback_message: Optional[str] = None
     info: Optional[Dict[str, Any]] = None
 
+
+class ArgumentError(ValueError):
+    """Arguments given by GAME that do not match the function's argument schema"""
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError
+
+
+def _to_integer(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError
+
+
+def _to_number(value: Any) -> Union[int, float]:
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    raise ValueError
+
+
+_TRUE = frozenset({"true", "yes", "1"})
+_FALSE = frozenset({"false", "no", "0"})
+
+
+def _to_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+    raise ValueError
+
+
+def _to_array(value: Any) -> list:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, str):
+        decoded = json.loads(value)
+        if isinstance(decoded, list):
+            return decoded
+    raise ValueError
+
+
+def _to_object(value: Any) -> dict:
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        decoded = json.loads(value)
+        if isinstance(decoded, dict):
+            return decoded
+    raise ValueError
+
+
+# coercion of the primitive argument types - other (descriptive) types are passed through as is
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "string": _to_string, "str": _to_string,
+    "integer": _to_integer, "int": _to_integer,
+    "number": _to_number, "float": _to_number,
+    "boolean": _to_boolean, "bool": _to_boolean,
+    "array": _to_array, "list": _to_array,
+    "object": _to_object, "dict": _to_object,
+}
+
+
+class ArgumentBinder:
+    """
+    Binds the arguments of a GAME action to an executable, compiled once from the function's
+    argument schema: unwraps {'value': ...}, coerces primitive types, checks required arguments and
+    rejects arguments the executable does not accept (ArgumentError) before the executable runs.
+    """
+
+    __slots__ = ("args", "executable", "_specs", "_required", "_accepts_extra")
+
+    def __init__(self, args: List[Argument], executable: Callable):
+        self.args = args
+        self.executable = executable
+
+        try:
+            parameters = inspect.signature(executable).parameters
+        except (TypeError, ValueError):
+            parameters = None
+        self._accepts_extra = parameters is None or any(
+            p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+        # name -> (type description, coercers (None: any type), optional)
+        self._specs: Dict[str, Tuple[str, Optional[Tuple[Callable[[Any], Any], ...]], bool]] = {}
+        self._required: List[str] = []
+        for arg in args:
+            types = arg.type if isinstance(arg.type, list) else [arg.type] if arg.type else []
+            coercers = tuple(_COERCERS.get(t.lower()) for t in types)
+            # any unknown type accepts every value
+            if not coercers or None in coercers:
+                coercers = None
+            # an argument the executable has a default for can be left out
+            has_default = parameters is not None and arg.name in parameters and (
+                parameters[arg.name].default is not inspect.Parameter.empty)
+            optional = bool(arg.optional) or has_default
+            self._specs[arg.name] = (" or ".join(types), coercers, optional)
+            if not optional:
+                self._required.append(arg.name)
+
+    def bind(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Executable keyword arguments from the GAME action arguments"""
+        bound = {}
+        for name, value in args.items():
+            if isinstance(value, dict) and "value" in value:
+                value = value["value"]
+            spec = self._specs.get(name)
+            if spec is None:
+                if not self._accepts_extra:
+                    raise ArgumentError(f"Unexpected argument '{name}'")
+                bound[name] = value
+                continue
+
+            type_name, coercers, optional = spec
+            # GAME sends "" for optional arguments it leaves out
+            if value is None or (optional and value == ""):
+                if optional:
+                    continue
+                raise ArgumentError(f"Missing required argument '{name}'")
+            if coercers is not None:
+                for coerce in coercers:
+                    try:
+                        value = coerce(value)
+                        break
+                    except ValueError:
+                        pass
+                else:
+                    raise ArgumentError(f"Argument '{name}' must be of type {type_name}, got {value!r}")
+            bound[name] = value
+
+        for name in self._required:
+            if name not in bound:
+                raise ArgumentError(f"Missing required argument '{name}'")
+        return bound
+
+
+# threads of the shared pool running executables that have a timeout but no executor of their own
+DEFAULT_FUNCTION_POOL_SIZE = 32
+
+
+class _FunctionPool:
+    """
+    Thread pool of executables with a timeout. Timed-out executables can't be interrupted and keep
+    their thread until they return, so the pool counts busy threads and logs when calls start queueing.
+    """
+
+    def __init__(self, max_workers: int):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="game-function")
+        self._lock = threading.Lock()
+        # submitted calls that have not returned yet (running, queued or timed out and still running)
+        self._pending = 0
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            self._pending += 1
+            pending = self._pending
+        if pending == self.max_workers + 1:
+            logger.warning(
+                "Function pool saturated (%d threads busy) - calls queue, and their timeout includes the wait. "
+                "Timed-out executables keep their thread until they return; see set_function_pool_size",
+                self.max_workers)
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_function_pool: Optional[_FunctionPool] = None
+_function_pool_lock = threading.Lock()
+
+
+def _get_function_pool() -> _FunctionPool:
+    global _function_pool
+    if _function_pool is None:
+        with _function_pool_lock:
+            if _function_pool is None:
+                _function_pool = _FunctionPool(DEFAULT_FUNCTION_POOL_SIZE)
+    return _function_pool
+
+
+def set_function_pool_size(max_workers: int):
+    """
+    Resize the shared pool of executables that have a timeout but no executor - calls already
+    submitted finish on the previous pool
+    """
+    global _function_pool
+    with _function_pool_lock:
+        previous, _function_pool = _function_pool, _FunctionPool(max_workers)
+    if previous is not None:
+        previous.shutdown()
+
+
+def _call_executable(executable: Callable, kwargs: Dict[str, Any]) -> Any:
+    """Call an executable (sync or async) to completion - module level so it can run in a process pool"""
+    result = executable(**kwargs)
+    if inspect.isawaitable(result):
+        # async executable called from synchronous code
+        result = asyncio.run(result)
+    return result
+
+
+# owner ids of the functions' entries in FUNCTION_CACHE
+_cache_owners = itertools.count()
+
+
 class Function(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     fn_name: str
     fn_description: str
     args: List[Argument]
@@ -32,45 +291,250 @@ class Function(BaseModel):
         default_factory=lambda: Function._default_executable
     )
 
+    # maximum time in seconds, counted from submission to the executor (waiting for a free thread
+    # included) - the function FAILS when exceeded
+    timeout: Optional[float] = None
+    # thread/process pool to run the executable on (use a ProcessPoolExecutor for CPU-heavy
+    # executables; they must then be picklable). Executables run inline by default, or on a
+    # shared pool of DEFAULT_FUNCTION_POOL_SIZE threads when they have a timeout (see set_function_pool_size)
+    executor: Optional[Executor] = None
+
+    # cache successful results for this many seconds, keyed by the arguments (read-only functions only)
+    cache_ttl: Optional[float] = None
+    # running a function with side effects invalidates the cached results of the other functions of
+    # its worker - set to False for read-only functions that are not cached
+    side_effects: bool = True
+
+    # compiled from args and executable on first use (see ArgumentBinder)
+    _binder: Optional[ArgumentBinder] = PrivateAttr(default=None)
+    _cache_owner: int = PrivateAttr(default_factory=lambda: next(_cache_owners))
+
     def get_function_def(self):
-        return self.model_dump(exclude={'executable'})
+        return self.model_dump(exclude={'executable', 'timeout', 'executor', 'cache_ttl', 'side_effects'})
+
+    def clear_cache(self) -> int:
+        """Drop the cached results of this function - returns the number of dropped results"""
+        return FUNCTION_CACHE.invalidate(self._cache_owner)
 
     @staticmethod
     def _default_executable(**kwargs) -> Tuple[FunctionResultStatus, str]:
         """Default executable that does nothing"""
         return FunctionResultStatus.DONE, "Default implementation - no action taken", {}
     
+    @staticmethod
+    def _process_args(args: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract values from the nested dictionary structure of GAME action arguments"""
+        processed_args = {}
+        for arg_name, arg_value in args.items():
+            if isinstance(arg_value, dict) and 'value' in arg_value:
+                processed_args[arg_name] = arg_value['value']
+            else:
+                processed_args[arg_name] = arg_value
+        return processed_args
+
+    @staticmethod
+    def _to_result(fn_id: str, result: Tuple[FunctionResultStatus, str, dict]) -> FunctionResult:
+        status, feedback, info = result
+        return FunctionResult(
+            action_id=fn_id,
+            action_status=status,
+            feedback_message=feedback,
+            info=info,
+        )
+
+    @staticmethod
+    def _failed_result(fn_id: str, feedback: str) -> FunctionResult:
+        return FunctionResult(
+            action_id=fn_id,
+            action_status=FunctionResultStatus.FAILED,
+            feedback_message=feedback,
+            info={},
+        )
+
+    def _bind_args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        binder = self._binder
+        if binder is None or binder.args is not self.args or binder.executable is not self.executable:
+            binder = self._binder = ArgumentBinder(self.args, self.executable)
+        return binder.bind(args)
+
+    def _cached_result(self, fn_id: str, key: str) -> Optional[FunctionResult]:
+        cached = FUNCTION_CACHE.get(self._cache_owner, key)
+        if cached is None:
+            return None
+        status, feedback, info = cached
+        return self._to_result(fn_id, (status, feedback, dict(info)))
+
+    def _cache_result(self, key: str, result: Tuple[FunctionResultStatus, str, dict]):
+        status, feedback, info = result
+        if status == FunctionResultStatus.DONE:
+            FUNCTION_CACHE.put(self._cache_owner, key, (status, feedback, dict(info or {})), self.cache_ttl)
+
+    def _invalid_args_feedback(self, error: ArgumentError) -> str:
+        return f"Invalid arguments for {self.fn_name}: {error}"
+
+    def _timeout_feedback(self) -> str:
+        return f"Function {self.fn_name} timed out after {self.timeout} seconds"
+
     def execute(self, **kwds: Any) -> FunctionResult:
         """Execute the function using arguments from GAME action."""
         fn_id = kwds.get('fn_id')
         args = kwds.get('args', {})
 
         try:
-            # Extract values from the nested dictionary structure
-            processed_args = {}
-            for arg_name, arg_value in args.items():
-                if isinstance(arg_value, dict) and 'value' in arg_value:
-                    processed_args[arg_name] = arg_value['value']
-                else:
-                    processed_args[arg_name] = arg_value
-                    
-            # print("Processed args: ", processed_args)
+            try:
+                processed_args = self._bind_args(args)
+            except ArgumentError as e:
+                # rejected before running the executable
+                return self._failed_result(fn_id, self._invalid_args_feedback(e))
+
+            cache_key = None
+            if self.cache_ttl is not None:
+                cache_key = normalize_args(processed_args)
+                cached = self._cached_result(fn_id, cache_key)
+                if cached is not None:
+                    return cached
+
             # execute the function provided
-            status, feedback, info = self.executable(**processed_args)
-
-            return FunctionResult(
-                action_id=fn_id,
-                action_status=status,
-                feedback_message=feedback,
-                info=info,
-            )
+            if self.executor is None and self.timeout is None:
+                result = _call_executable(self.executable, processed_args)
+            else:
+                future = (self.executor or _get_function_pool()).submit(
+                    _call_executable, self.executable, processed_args)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FuturesTimeoutError:
+                    # a running executable can't be interrupted - it is left to finish in the background
+                    future.cancel()
+                    return self._failed_result(fn_id, self._timeout_feedback())
+
+            if cache_key is not None:
+                self._cache_result(cache_key, result)
+            return self._to_result(fn_id, result)
+        except Exception as e:
+            return self._failed_result(fn_id, f"Error executing function: {str(e)}")
+
+    async def aexecute(self, **kwds: Any) -> FunctionResult:
+        """
+        Execute the function from async code - `async def` executables are awaited on the
+        running event loop, synchronous executables run on the function's executor (or the loop's default executor)
+        """
+        fn_id = kwds.get('fn_id')
+        args = kwds.get('args', {})
+
+        try:
+            try:
+                processed_args = self._bind_args(args)
+            except ArgumentError as e:
+                # rejected before running the executable
+                return self._failed_result(fn_id, self._invalid_args_feedback(e))
+
+            cache_key = None
+            if self.cache_ttl is not None:
+                cache_key = normalize_args(processed_args)
+                cached = self._cached_result(fn_id, cache_key)
+                if cached is not None:
+                    return cached
+
+            if inspect.iscoroutinefunction(self.executable) and self.executor is None:
+                pending = self.executable(**processed_args)
+            else:
+                pending = asyncio.get_running_loop().run_in_executor(
+                    self.executor, functools.partial(_call_executable, self.executable, processed_args))
+
+            try:
+                result = await asyncio.wait_for(pending, self.timeout)
+            except asyncio.TimeoutError:
+                return self._failed_result(fn_id, self._timeout_feedback())
+
+            if cache_key is not None:
+                self._cache_result(cache_key, result)
+            return self._to_result(fn_id, result)
         except Exception as e:
-            return FunctionResult(
-                action_id=fn_id,
-                action_status=FunctionResultStatus.FAILED,
-                feedback_message=f"Error executing function: {str(e)}",
-                info={},
-            )
+            return self._failed_result(fn_id, f"Error executing function: {str(e)}")
+
+class RawJSON:
+    """
+    Pre-encoded JSON fragment - spliced verbatim into request bodies instead of being re-encoded
+    """
+    __slots__ = ("value", "encoded")
+
+    def __init__(self, value: Any, encoded: Optional[str] = None):
+        self.value = value
+        self.encoded = encoded if encoded is not None else json.dumps(value)
+
+    def __repr__(self):
+        return f"RawJSON({self.encoded})"
+
+
+class ActionSpace(dict):
+    """
+    Functions available to a worker, keyed by fn_name.
+
+    The function definitions sent with every action request are serialized once and cached;
+    the cache is dropped whenever the action space is modified. Call invalidate() after
+    mutating a Function of the action space in place.
+    """
+
+    def __init__(self, functions: Optional[Union[Dict[str, Function], Sequence[Function]]] = None):
+        super().__init__()
+        self._function_defs: Optional[RawJSON] = None
+        if functions is None:
+            return
+        if isinstance(functions, dict):
+            super().update(functions)
+        else:
+            super().update((f.fn_name, f) for f in functions)
+
+    def function_defs(self) -> RawJSON:
+        """Serialized (and pre-encoded) definitions of all functions"""
+        function_defs = self._function_defs
+        if function_defs is None:
+            function_defs = self._function_defs = RawJSON(
+                [f.get_function_def() for f in self.values()])
+        return function_defs
+
+    def invalidate(self):
+        self._function_defs = None
+
+    def function_executed(self, function: Function):
+        """Invalidate the cached results of the functions when a function with side effects ran"""
+        if function.cache_ttl is None and function.side_effects:
+            for f in self.values():
+                if f.cache_ttl is not None:
+                    f.clear_cache()
+
+    def __setitem__(self, key, value):
+        self._function_defs = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._function_defs = None
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._function_defs = None
+        return super().__ior__(other)
+
+    def clear(self):
+        self._function_defs = None
+        super().clear()
+
+    def pop(self, *args):
+        self._function_defs = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._function_defs = None
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self._function_defs = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self._function_defs = None
+        super().update(*args, **kwargs)
+
 
 # Different ActionTypes returned by the GAME API
 class ActionType(Enum):
@@ -81,8 +545,85 @@ class ActionType(Enum):
 
 
 ## set of different data structures required by the ActionResponse returned from GAME ##
-@dataclass(frozen=True)
-class HLPResponse:
+# frozen records decoded from the response JSON without validation by pydantic - nested records
+# (hlp, current_task, llp) keep their JSON dict until they are first accessed
+
+# slotted dataclasses need Python 3.10 - older versions keep an instance dict
+_RECORD_OPTIONS = {"frozen": True, "slots": True} if sys.version_info >= (3, 10) else {"frozen": True}
+
+
+def _accepted_types(annotation: Any) -> Tuple[type, ...]:
+    """Types of the JSON values accepted for a record field (nested records also accept their dict)"""
+    options = typing.get_args(annotation) if typing.get_origin(annotation) is Union else (annotation,)
+    accepted: List[type] = []
+    for option in options:
+        origin = typing.get_origin(option) or option
+        if origin is collections.abc.Sequence:
+            accepted += [list, tuple]
+        elif dataclasses.is_dataclass(option):
+            accepted += [option, dict]
+        else:
+            accepted.append(origin)
+    return tuple(accepted)
+
+
+def _record(cls):
+    """Make a frozen (slotted) dataclass record with a type-checked from_dict"""
+    cls = dataclass(**_RECORD_OPTIONS)(cls)
+    hints = typing.get_type_hints(cls)
+    cls._schema = tuple(
+        (f.name, _accepted_types(hints[f.name]),
+         f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING)
+        for f in dataclasses.fields(cls)
+    )
+    # nested record fields, decoded on first access
+    cls._nested = {
+        f.name: record_type for f in dataclasses.fields(cls)
+        for record_type in _accepted_types(hints[f.name]) if dataclasses.is_dataclass(record_type)
+    }
+    return cls
+
+
+class _Record:
+    __slots__ = ()
+    # (name, accepted types, required) of the fields
+    _schema: ClassVar[Tuple[Tuple[str, Tuple[type, ...], bool], ...]] = ()
+    # name -> record type of the nested record fields
+    _nested: ClassVar[Dict[str, type]] = {}
+
+    @classmethod
+    def from_dict(cls, data: Any):
+        """Build the record from its JSON dict - extra keys are ignored, nested records are decoded on access"""
+        if data is None or isinstance(data, cls):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid {cls.__name__}: expected an object, got {type(data).__name__}")
+        values = {}
+        for name, accepted, required in cls._schema:
+            if name in data:
+                value = data[name]
+                if not isinstance(value, accepted):
+                    expected = " or ".join(t.__name__ for t in accepted)
+                    raise ValueError(
+                        f"Invalid {cls.__name__}: field '{name}' must be {expected}, got {type(value).__name__}")
+                values[name] = value
+            elif required:
+                raise ValueError(f"Invalid {cls.__name__}: missing field '{name}'")
+        return cls(**values)
+
+    def __getattribute__(self, name: str):
+        value = object.__getattribute__(self, name)
+        if type(value) is dict:
+            record_type = type(self)._nested.get(name)
+            if record_type is not None:
+                value = record_type.from_dict(value)
+                # keep the decoded record (frozen records are only written on decode)
+                object.__setattr__(self, name, value)
+        return value
+
+
+@_record
+class HLPResponse(_Record):
     plan_id: str
     observation_reflection: str
     plan: Sequence[str]
@@ -92,8 +633,8 @@ class HLPResponse:
     log: Sequence[dict] = field(default_factory=list)
 
 
-@dataclass(frozen=True)
-class LLPResponse:
+@_record
+class LLPResponse(_Record):
     plan_id: str
     plan_reasoning: str
     situation_analysis: str
@@ -102,25 +643,70 @@ class LLPResponse:
     reflection: Optional[str] = None
 
 
-@dataclass(frozen=True)
-class CurrentTaskResponse:
+@_record
+class CurrentTaskResponse(_Record):
     task: str
     task_reasoning: str
     location_id: str = field(default="*not provided*")
     llp: Optional[LLPResponse] = None
 
 
-@dataclass(frozen=True)
-class AgentStateResponse:
+@_record
+class AgentStateResponse(_Record):
     hlp: Optional[HLPResponse] = None
     current_task: Optional[CurrentTaskResponse] = None
 
+
 # ActionResponse format returned from GAME API call
 class ActionResponse(BaseModel):
     """
     Response format from the GAME API when selecting an Action
+
+    Only the top level is validated up front - the agent state (HLP/LLP) is decoded when accessed.
     """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     action_type: ActionType
     agent_state: AgentStateResponse
     action_args: Optional[Dict[str, Any]] = None
 
+    @field_validator("agent_state", mode="before")
+    @classmethod
+    def _decode_agent_state(cls, value: Any) -> Any:
+        return AgentStateResponse.from_dict(value)
+
+    @field_serializer("agent_state")
+    def _encode_agent_state(self, agent_state: AgentStateResponse) -> dict:
+        return dataclasses.asdict(agent_state)
+
+
+@dataclass(frozen=True)
+class StepEvent:
+    """
+    Structured outcome of one agent/worker step, as yielded by Agent.stream and Worker.stream
+    """
+    # number of the step (agent: steps taken by the agent, worker: steps in the current task)
+    step: int
+    action_type: ActionType
+    # worker the agent is located at after the step (None for standalone workers)
+    worker_id: Optional[str]
+    # selected function and its argument values (function calls only)
+    fn_name: Optional[str]
+    args: Optional[Dict[str, Any]]
+    result: Optional[FunctionResult]
+    # wall time of the step and of the function execution (seconds)
+    duration: float
+    function_duration: Optional[float]
+    action_response: ActionResponse = field(repr=False)
+
+    @property
+    def task(self) -> Optional[str]:
+        """Current task"""
+        current_task = self.action_response.agent_state.current_task
+        return current_task.task if current_task else None
+
+    @property
+    def task_changed(self) -> bool:
+        """Whether GAME generated a new task in this step"""
+        hlp = self.action_response.agent_state.hlp
+        return bool(hlp and hlp.change_indicator)
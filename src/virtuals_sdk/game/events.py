@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+# (pending value, new value) -> coalesced value
+Coalesce = Callable[[Any, Any], Any]
+
+
+def keep_latest(pending: Any, new: Any) -> Any:
+    return new
+
+
+class EventQueue:
+    """
+    Thread-safe, bounded queue of external events (webhooks, platform pollers, other agents...)
+    feeding the `events` of the next agent step.
+
+    Events are keyed: an event whose key is already pending is coalesced into the pending one
+    (by default the latest value wins) instead of taking another slot, so repeated signals collapse.
+    When `maxsize` distinct events are pending, put blocks (or gives up) until a step drains the queue.
+    """
+
+    def __init__(
+        self,
+        # maximum number of distinct pending events
+        maxsize: int = 1000,
+        # maximum number of events sent per step (None for all pending events)
+        batch_size: Optional[int] = None,
+        coalesce: Coalesce = keep_latest,
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.coalesce = coalesce
+
+        # key -> value, oldest first
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._cond = threading.Condition()
+
+    def put(self, key: str, value: Any, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Add an event - returns False if the queue stayed full (block=False, or timeout expired)
+        """
+        with self._cond:
+            if key in self._pending:
+                self._pending[key] = self.coalesce(self._pending[key], value)
+                return True
+
+            if len(self._pending) >= self.maxsize:
+                if not block:
+                    return False
+                if not self._cond.wait_for(lambda: len(self._pending) < self.maxsize or key in self._pending,
+                                           timeout=timeout):
+                    return False
+                if key in self._pending:
+                    self._pending[key] = self.coalesce(self._pending[key], value)
+                    return True
+
+            self._pending[key] = value
+            self._cond.notify_all()
+            return True
+
+    def drain(self) -> Dict[str, Any]:
+        """Take the next batch of pending events (oldest first)"""
+        with self._cond:
+            if self.batch_size is None or len(self._pending) <= self.batch_size:
+                batch = dict(self._pending)
+                self._pending.clear()
+            else:
+                batch = {}
+                for _ in range(self.batch_size):
+                    key, value = self._pending.popitem(last=False)
+                    batch[key] = value
+            if batch:
+                self._cond.notify_all()
+            return batch
+
+    def requeue(self, batch: Dict[str, Any]):
+        """
+        Put a drained batch back in front of the queue (e.g. the step failed) - events pushed in the
+        meantime are coalesced on top of the requeued ones. May briefly exceed maxsize.
+        """
+        if not batch:
+            return
+        with self._cond:
+            newer = self._pending
+            self._pending = OrderedDict(batch)
+            for key, value in newer.items():
+                if key in self._pending:
+                    self._pending[key] = self.coalesce(self._pending[key], value)
+                else:
+                    self._pending[key] = value
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until an event is pending - returns False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: bool(self._pending), timeout=timeout)
+
+    def clear(self):
+        with self._cond:
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._pending)
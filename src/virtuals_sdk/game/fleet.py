@@ -0,0 +1,250 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from virtuals_sdk.game.agent import Agent
+from virtuals_sdk.game.async_agent import AsyncAgent
+
+
+@dataclass
+class FleetAgentStats:
+    steps: int = 0
+    errors: int = 0
+    # total wall time spent in step (seconds)
+    step_time: float = 0.0
+    last_error: Optional[BaseException] = None
+
+
+@dataclass
+class FleetStats:
+    steps: int
+    errors: int
+    # seconds since the fleet started
+    elapsed: float
+    steps_per_second: float
+    agents: Dict[str, FleetAgentStats] = field(default_factory=dict)
+    # totals of the agents removed from the fleet (included in steps and errors)
+    removed: FleetAgentStats = field(default_factory=FleetAgentStats)
+
+
+class _FleetEntry:
+    def __init__(self, name: str, agent: Agent, priority: int, max_steps: Optional[int], stop_on_error: bool):
+        self.name = name
+        self.agent = agent
+        # higher priority agents get proportionally more steps (weight = priority + 1)
+        self.stride = 1.0 / (max(priority, 0) + 1)
+        self.max_steps = max_steps
+        self.stop_on_error = stop_on_error
+        self.stats = FleetAgentStats()
+        # virtual time - the ready agent with the lowest pass steps next (stride scheduling)
+        self.pass_value = 0.0
+        self.removed = False
+        # failed steps in a row - failing agents that keep going wait before their next step
+        self.consecutive_errors = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_steps is not None and self.stats.steps >= self.max_steps
+
+
+class Fleet:
+    """
+    Runs many agents in one process - their steps are scheduled over a bounded thread pool.
+
+    - each agent steps at most once at a time (its steps stay sequential)
+    - scheduling is fair: the ready agent that received the least (priority weighted) steps goes next
+    - per-agent step budgets (max_steps); agents without a budget run until removed or the fleet stops
+    - agents that were not compiled yet are compiled on the pool when first scheduled
+    - agents that keep going after a failed step (stop_on_error=False) back off exponentially, from
+      `error_backoff` up to `max_error_backoff` seconds, until a step succeeds again
+    """
+
+    def __init__(self, max_workers: int = 8, error_backoff: float = 0.5, max_error_backoff: float = 30.0):
+        self.max_workers = max_workers
+        self.error_backoff = error_backoff
+        self.max_error_backoff = max_error_backoff
+
+        self._entries: Dict[str, _FleetEntry] = {}
+        # (pass, sequence, entry) of the agents ready to step
+        self._ready: List[tuple] = []
+        # (ready at, sequence, entry) of the agents backing off after a failed step
+        self._delayed: List[tuple] = []
+        self._removed_stats = FleetAgentStats()
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._stopping = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+
+    def add(
+        self,
+        agent: Agent,
+        name: Optional[str] = None,
+        priority: int = 0,
+        max_steps: Optional[int] = None,
+        # stop stepping the agent after a failed step (otherwise keep going)
+        stop_on_error: bool = True,
+    ) -> str:
+        """Add an agent to the fleet - returns its name in the fleet"""
+        if isinstance(agent, AsyncAgent):
+            # its steps are coroutines - run async agents on an event loop (e.g. asyncio.gather) instead
+            raise ValueError("Fleet runs synchronous agents only - got an AsyncAgent")
+        name = name or agent.name
+        with self._cond:
+            if name in self._entries:
+                raise ValueError(f"Agent already in fleet: {name}")
+            entry = _FleetEntry(name, agent, priority, max_steps, stop_on_error)
+            # newcomers start level with the agents already running
+            entry.pass_value = min(
+                (e.pass_value for e in self._entries.values()), default=0.0)
+            self._entries[name] = entry
+            self._push(entry)
+            self._cond.notify_all()
+        return name
+
+    def remove(self, name: str):
+        """Remove an agent - a step already in progress is allowed to finish"""
+        with self._cond:
+            entry = self._entries.pop(name)
+            entry.removed = True
+            self._add_stats(self._removed_stats, entry.stats.steps, entry.stats.errors, entry.stats.step_time)
+            self._delayed = [delayed for delayed in self._delayed if delayed[2] is not entry]
+            heapq.heapify(self._delayed)
+            self._cond.notify_all()
+
+    def start(self):
+        """Start stepping the agents in the background"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._stopping = False
+            self._started_at = time.monotonic()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="game-fleet")
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="game-fleet-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def stop(self, wait: bool = True, timeout: Optional[float] = None):
+        """
+        Stop scheduling new steps (graceful drain) - with wait=True, blocks until the steps in progress finished
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+            if wait:
+                self._cond.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+        self._dispatcher.join(timeout)
+        self._executor.shutdown(wait=wait)
+        with self._cond:
+            self._running = False
+
+    def run(self, timeout: Optional[float] = None) -> FleetStats:
+        """
+        Step the agents until every agent used up its step budget (or the timeout expired), then drain
+        """
+        self.start()
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._in_flight == 0 and not self._ready and not self._delayed, timeout=timeout)
+        self.stop()
+        return self.stats()
+
+    def stats(self) -> FleetStats:
+        """Aggregate step counts and throughput"""
+        with self._cond:
+            agents = {name: FleetAgentStats(**vars(e.stats))
+                      for name, e in self._entries.items()}
+            removed = FleetAgentStats(**vars(self._removed_stats))
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        steps = sum(s.steps for s in agents.values()) + removed.steps
+        return FleetStats(
+            steps=steps,
+            errors=sum(s.errors for s in agents.values()) + removed.errors,
+            elapsed=elapsed,
+            steps_per_second=steps / elapsed if elapsed > 0 else 0.0,
+            agents=agents,
+            removed=removed,
+        )
+
+    def __enter__(self) -> "Fleet":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _push(self, entry: _FleetEntry):
+        if not entry.removed and not entry.exhausted:
+            heapq.heappush(
+                self._ready, (entry.pass_value, next(self._sequence), entry))
+
+    @staticmethod
+    def _add_stats(stats: FleetAgentStats, steps: int, errors: int, step_time: float):
+        stats.steps += steps
+        stats.errors += errors
+        stats.step_time += step_time
+
+    def _release_delayed(self) -> Optional[float]:
+        """Make the agents whose backoff is over ready - returns the seconds until the next one is"""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, entry = heapq.heappop(self._delayed)
+            self._push(entry)
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    wait = self._release_delayed()
+                    if self._ready and self._in_flight < self.max_workers:
+                        break
+                    self._cond.wait(wait)
+                if self._stopping:
+                    return
+                _, _, entry = heapq.heappop(self._ready)
+                if entry.removed:
+                    continue
+                self._in_flight += 1
+            self._executor.submit(self._step, entry)
+
+    def _step(self, entry: _FleetEntry):
+        start = time.monotonic()
+        error = None
+        try:
+            if getattr(entry.agent, "_map_id", None) is None:
+                entry.agent.compile()
+            entry.agent.step()
+        except Exception as e:
+            error = e
+
+        with self._cond:
+            step_time = time.monotonic() - start
+            steps, errors = (1, 0) if error is None else (0, 1)
+            self._add_stats(entry.stats, steps, errors, step_time)
+            if entry.removed:
+                # removed while stepping - the step still counts towards the fleet totals
+                self._add_stats(self._removed_stats, steps, errors, step_time)
+            entry.pass_value += entry.stride
+            if error is None:
+                entry.consecutive_errors = 0
+                self._push(entry)
+            else:
+                entry.stats.last_error = error
+                entry.consecutive_errors += 1
+                if not entry.stop_on_error and not entry.removed:
+                    backoff = min(self.error_backoff * 2 ** (entry.consecutive_errors - 1), self.max_error_backoff)
+                    heapq.heappush(self._delayed, (time.monotonic() + backoff, next(self._sequence), entry))
+            self._in_flight -= 1
+            self._cond.notify_all()
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+def normalize_args(args: Dict[str, Any]) -> str:
+    """Cache key of (bound) function arguments - independent of argument order"""
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+class FunctionCache:
+    """
+    Thread-safe LRU cache of function results with per-entry TTLs, shared by all cacheable
+    Functions of the process (FUNCTION_CACHE). Entries are grouped by owner (the function they
+    belong to) so the results of a function can be invalidated together.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+
+        # (owner, key) -> (expires at, value), least recently used first
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+        # owner -> keys of its entries
+        self._owners: Dict[Hashable, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, owner: Hashable, key: str) -> Optional[Any]:
+        """Cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end((owner, key))
+                    self.hits += 1
+                    return entry[1]
+                self._remove(owner, key)
+            self.misses += 1
+            return None
+
+    def put(self, owner: Hashable, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[(owner, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((owner, key))
+            self._owners.setdefault(owner, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                (oldest_owner, oldest_key), _ = self._entries.popitem(last=False)
+                self._discard_key(oldest_owner, oldest_key)
+
+    def invalidate(self, owner: Hashable) -> int:
+        """Drop all entries of an owner - returns the number of dropped entries"""
+        with self._lock:
+            keys = self._owners.pop(owner, ())
+            for key in keys:
+                del self._entries[(owner, key)]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, owner: Hashable, key: str):
+        del self._entries[(owner, key)]
+        self._discard_key(owner, key)
+
+    def _discard_key(self, owner: Hashable, key: str):
+        keys = self._owners.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._owners[owner]
+
+
+# shared by all cacheable functions of the process
+FUNCTION_CACHE = FunctionCache()
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# phases of a step recorded as spans
+STEP = "step"
+TOKEN_FETCH = "token_fetch"
+PAYLOAD_BUILD = "payload_build"
+API_CALL = "api_call"
+RESPONSE_VALIDATION = "response_validation"
+FUNCTION_EXECUTION = "function_execution"
+STATE_UPDATE = "state_update"
+
+# counters
+ACTIONS = "actions"  # labels: action_type
+FUNCTION_CALLS = "function_calls"  # labels: fn_name, status
+PAYLOAD_BYTES = "payload_bytes"  # encoded size of the action request payloads
+SPILLED_BYTES = "spilled_bytes"  # size of the function result info values moved to a spill store
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Hook surface for step-level timing spans and counters.
+
+    This base class is the no-op default - span() hands out a shared null context manager and
+    count() does nothing, so uninstrumented agents pay (almost) nothing.
+    """
+
+    def span(self, name: str):
+        """Context manager timing one phase of a step"""
+        return _NULL_SPAN
+
+    def count(self, name: str, value: int = 1, **labels: str):
+        """Increment a counter"""
+
+
+NOOP_INSTRUMENTATION = Instrumentation()
+
+
+class Exporter:
+    """
+    Receives the spans and counter increments recorded by RecordingInstrumentation
+    """
+
+    def export_span(self, name: str, duration: float):
+        pass
+
+    def export_count(self, name: str, value: int, labels: Dict[str, str]):
+        pass
+
+
+class _Span:
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation: "RecordingInstrumentation", name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self._start
+        for exporter in self._instrumentation.exporters:
+            exporter.export_span(self._name, duration)
+        return False
+
+
+class RecordingInstrumentation(Instrumentation):
+    """
+    Times spans with perf_counter and forwards spans and counters to the exporters
+    """
+
+    def __init__(self, exporters: Optional[List[Exporter]] = None):
+        self.exporters: List[Exporter] = exporters if exporters is not None else [
+            InMemoryExporter()]
+
+    def span(self, name: str):
+        return _Span(self, name)
+
+    def count(self, name: str, value: int = 1, **labels: str):
+        for exporter in self.exporters:
+            exporter.export_count(name, value, labels)
+
+
+class SpanStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return f"SpanStats(count={self.count}, total={self.total:.6f}, mean={self.mean:.6f}, max={self.max:.6f})"
+
+
+class InMemoryExporter(Exporter):
+    """
+    Aggregates span timings (count/total/mean/max per phase) and counters in memory
+    """
+
+    def __init__(self):
+        self.spans: Dict[str, SpanStats] = {}
+        # (name, sorted labels) -> value
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], int] = {}
+        self._lock = threading.Lock()
+
+    def export_span(self, name: str, duration: float):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = SpanStats()
+            stats.count += 1
+            stats.total += duration
+            if duration > stats.max:
+                stats.max = duration
+
+    def export_count(self, name: str, value: int, labels: Dict[str, str]):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels: str) -> int:
+        """Value of a counter - summed over all label sets matching the given labels"""
+        with self._lock:
+            return sum(
+                value for (counter_name, counter_labels), value in self.counters.items()
+                if counter_name == name and labels.items() <= dict(counter_labels).items()
+            )
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+class LoggingExporter(Exporter):
+    """
+    Logs every span and counter increment (at DEBUG level by default)
+    """
+
+    def __init__(self, level: int = logging.DEBUG, log: Optional[logging.Logger] = None):
+        self.level = level
+        self.log = log or logger
+
+    def export_span(self, name: str, duration: float):
+        self.log.log(self.level, "span %s %.3fms", name, duration * 1000)
+
+    def export_count(self, name: str, value: int, labels: Dict[str, str]):
+        self.log.log(self.level, "count %s +%d %s", name, value, labels)
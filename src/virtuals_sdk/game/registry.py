@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from virtuals_sdk.game.utils import atomic_write
+
+
+DEFAULT_REGISTRY_PATH = os.path.join("~", ".virtuals", "game_registry.json")
+
+
+class AgentRegistry:
+    """
+    Small on-disk store of remote GAME object ids (agents and worker maps) keyed by a hash of
+    their content, so that restarts reuse the existing remote objects instead of creating new ones.
+
+    Any change to the content (name, description, goal, worker descriptions...) gives a new key,
+    so changed objects are re-created while unchanged ones are reused. API keys are only stored hashed.
+    With path=None the registry is kept in memory only (ids are reused within the process).
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_REGISTRY_PATH):
+        self.path = os.path.expanduser(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+
+    @staticmethod
+    def agent_key(base_url: str, api_key: str, name: str, description: str, goal: str) -> str:
+        """Content key of an agent instance"""
+        return AgentRegistry._hash("agent", base_url, api_key, {
+            "name": name,
+            "description": description,
+            "goal": goal,
+        })
+
+    @staticmethod
+    def map_key(base_url: str, api_key: str, workers: List) -> str:
+        """Content key of a worker map (the locations of the task generator)"""
+        return AgentRegistry._hash("map", base_url, api_key, [
+            {"id": w.id, "description": w.worker_description} for w in workers
+        ])
+
+    @staticmethod
+    def _hash(kind: str, base_url: str, api_key: str, content) -> str:
+        encoded = json.dumps({
+            "kind": kind,
+            "base_url": base_url,
+            "api_key": hashlib.sha256(api_key.encode()).hexdigest(),
+            "content": content,
+        }, sort_keys=True)
+        return f"{kind}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the remote id stored for the key (None if unknown)"""
+        entry = self._entries.get(key)
+        return entry["id"] if entry else None
+
+    def put(self, key: str, remote_id: str):
+        """Store the remote id for the key"""
+        with self._lock:
+            # merge entries written by other processes since we loaded the registry
+            self._entries = {**self._load(), **self._entries}
+            self._entries[key] = {"id": remote_id, "created_at": time.time()}
+            self._save()
+
+    def remove(self, key: str):
+        """Forget the key (e.g. the remote object was deleted)"""
+        with self._lock:
+            self._entries = {**self._load(), **self._entries}
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def get_or_create(self, key: str, create: Callable[[], str]) -> str:
+        """Get the remote id stored for the key, creating (and storing) it if unknown"""
+        remote_id = self.get(key)
+        if remote_id is None:
+            remote_id = create()
+            self.put(key, remote_id)
+        return remote_id
+
+    def _load(self) -> Dict[str, dict]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        if self.path is not None:
+            atomic_write(self.path, json.dumps(self._entries).encode("utf-8"))
@@ -0,0 +1,198 @@
+import asyncio
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from virtuals_sdk.game.agent import Agent, Session
+from virtuals_sdk.game.events import EventQueue
+
+
+DEFAULT_SESSIONS_DIR = os.path.join("~", ".virtuals", "sessions")
+
+
+class _SessionRecord:
+    def __init__(self):
+        # agent view of the session - None until built or restored (outside the manager lock)
+        self.agent: Optional[Agent] = None
+        # held while the view is built or restored, so that it happens once
+        self.load_lock = threading.Lock()
+        self.lock = threading.Lock()
+        # serializes the steps of an async session without blocking the event loop - created by the
+        # first astep, as asyncio locks bind to the event loop of the thread creating them (Python < 3.10)
+        self.async_lock: Optional[asyncio.Lock] = None
+        self.last_used = time.monotonic()
+
+
+class SessionManager:
+    """
+    Serves many independent conversations with one compiled agent.
+
+    Every session is a lightweight view of the shared agent - it reuses the remote agent/map ids, the
+    worker configs and their cached function definitions, and only owns its session, agent state,
+    worker states and current worker. Sessions step independently of each other (each one at most
+    once at a time). Sessions idle for longer than `idle_timeout` seconds, or beyond `max_sessions`
+    in memory, are evicted to disk as checkpoints (see Agent.checkpoint) and restored on next use.
+    """
+
+    def __init__(
+        self,
+        # compiled agent shared by all sessions (Agent or AsyncAgent)
+        agent: Agent,
+        # directory of evicted sessions
+        sessions_dir: str = DEFAULT_SESSIONS_DIR,
+        # seconds without use after which a session is evicted
+        idle_timeout: Optional[float] = 600.0,
+        # maximum number of sessions kept in memory (least recently used are evicted first)
+        max_sessions: Optional[int] = None,
+    ):
+        if agent._map_id is None:
+            raise ValueError("Agent must be compiled before serving sessions")
+
+        self.agent = agent
+        self.sessions_dir = os.path.expanduser(sessions_dir)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+
+        # session id -> record, least recently used first
+        self._sessions: "OrderedDict[str, _SessionRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def session(self, session_id: str) -> Agent:
+        """
+        Get the agent view of a session - created on first use, restored from disk if it was evicted
+        """
+        record = self._get_record(session_id)
+        self._evict_due()
+        return record.agent
+
+    def step(self, session_id: str):
+        """Step a session (blocks while another step of the same session is in progress)"""
+        record = self._get_record(session_id)
+        with record.lock:
+            record.agent.step()
+            record.last_used = time.monotonic()
+        self._evict_due()
+
+    async def astep(self, session_id: str):
+        """Step a session of an AsyncAgent"""
+        record = self._get_record(session_id)
+        with self._lock:
+            if record.async_lock is None:
+                record.async_lock = asyncio.Lock()
+        async with record.async_lock:
+            # only contended by (short) evictions once the async lock is held
+            with record.lock:
+                await record.agent.step()
+                record.last_used = time.monotonic()
+        self._evict_due()
+
+    def evict(self, session_id: str) -> bool:
+        """Write a session to disk and drop it from memory - returns False if it is not in memory, busy or has pending events"""
+        with self._lock:
+            record = self._sessions.get(session_id)
+            # sessions still being loaded are in use
+            if record is None or record.agent is None:
+                return False
+            # pending events are not part of the checkpoint - keep sessions with events in memory
+            if len(record.agent.events) or not record.lock.acquire(blocking=False):
+                return False
+            try:
+                record.agent.checkpoint(self._path(session_id))
+                del self._sessions[session_id]
+            finally:
+                record.lock.release()
+        return True
+
+    def evict_idle(self) -> int:
+        """Evict the sessions idle for longer than idle_timeout - returns the number of evicted sessions"""
+        self._last_sweep = time.monotonic()
+        if self.idle_timeout is None:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [session_id for session_id, record in self._sessions.items()
+                    if record.last_used < deadline]
+        return sum(self.evict(session_id) for session_id in idle)
+
+    def close(self, session_id: str):
+        """End a session - drops it from memory and disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self.agent._release_spilled(session_id)
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def active_sessions(self) -> List[str]:
+        """Ids of the sessions in memory"""
+        with self._lock:
+            return list(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions or os.path.exists(self._path(session_id))
+
+    def _path(self, session_id: str) -> str:
+        # session ids are user supplied - hash them into safe file names
+        name = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.sessions_dir, f"{name}.json.gz")
+
+    def _get_record(self, session_id: str) -> _SessionRecord:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                # placeholder - the view is built or restored below, without holding up other sessions
+                record = self._sessions[session_id] = _SessionRecord()
+            self._sessions.move_to_end(session_id)
+            record.last_used = time.monotonic()
+
+        if record.agent is None:
+            with record.load_lock:
+                if record.agent is None:
+                    try:
+                        record.agent = self._load(session_id)
+                    except BaseException:
+                        with self._lock:
+                            if self._sessions.get(session_id) is record:
+                                del self._sessions[session_id]
+                        raise
+        return record
+
+    def _load(self, session_id: str) -> Agent:
+        view = copy.copy(self.agent)
+        # views never write the checkpoint of the shared agent
+        view._checkpoint_path = None
+        view.checkpoint_every = None
+        view._resumed_map_key = None
+        view._steps = 0
+        # encoded states belong to the states of this session
+        view._encoded_states = {}
+        # events are delivered to their own session
+        view.events = EventQueue(self.agent.events.maxsize, self.agent.events.batch_size, self.agent.events.coalesce)
+
+        path = self._path(session_id)
+        if os.path.exists(path):
+            view.restore(path)
+        else:
+            view.agent_state = view.get_agent_state_fn(None, None)
+            view._init_worker_states()
+            view._session = Session()
+        view._session.id = session_id
+        return view
+
+    def _evict_due(self):
+        if self.max_sessions is not None:
+            with self._lock:
+                excess = list(self._sessions)[:max(0, len(self._sessions) - self.max_sessions)]
+            for session_id in excess:
+                self.evict(session_id)
+
+        if self.idle_timeout is not None and time.monotonic() - self._last_sweep >= self.idle_timeout:
+            self.evict_idle()
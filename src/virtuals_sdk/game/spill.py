@@ -0,0 +1,148 @@
+"""
+Spill large FunctionResult.info values to disk, so they don't stay in memory for the lifetime of a session.
+
+    store = SpillStore(threshold=64 * 1024)
+    agent = Agent(..., spill_store=store)
+
+Info values larger than the threshold are replaced with SpilledValue handles - state functions
+load them on demand:
+
+    def get_state_fn(function_result, current_state):
+        document = function_result.info["document"]
+        if is_spilled(document):
+            document = store.load(document)
+
+store.load accepts handles as well as their plain dict form. Agents restored from a checkpoint
+(including evicted SessionManager sessions) turn the dict forms back into handles, so
+document.load() works too.
+"""
+import hashlib
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import uuid
+import weakref
+from typing import Any, Optional
+
+
+# key of the blob in a spilled value (stays in checkpoints and traces, where the handle becomes a plain dict)
+SPILLED_KEY = "$spilled"
+
+# <owner directory>/<blob name>
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}/[0-9a-f]{32}$")
+
+
+def is_spilled(value: Any) -> bool:
+    """Whether an info value was spilled (a SpilledValue, or its plain dict form from a checkpoint)"""
+    return isinstance(value, dict) and SPILLED_KEY in value
+
+
+class SpilledValue(dict):
+    """
+    Handle of a spilled info value - a small dict ({"$spilled": key, "size": bytes}) so that function
+    results holding it still serialize. load() reads the value back from the store.
+    """
+
+    def __init__(self, store: "SpillStore", key: str, size: int):
+        super().__init__({SPILLED_KEY: key, "size": size})
+        self._store = store
+
+    @property
+    def key(self) -> str:
+        return self[SPILLED_KEY]
+
+    def load(self) -> Any:
+        return self._store.load(self)
+
+    def __repr__(self):
+        return f"SpilledValue({self.key}, {self['size']} bytes)"
+
+
+class SpillStore:
+    """
+    On-disk blob store of large info values, grouped by owner (an agent session or a worker task).
+    The blobs of an owner are deleted when the owner ends (release). Without a directory, blobs are
+    written to a temporary directory removed when the store is garbage collected.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        # info values whose pickled size is at least this many bytes are spilled
+        threshold: int = 64 * 1024,
+    ):
+        if threshold <= 0:
+            raise ValueError("threshold must be positive")
+        self.threshold = threshold
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="game-spill-")
+            weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+        else:
+            directory = os.path.expanduser(directory)
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def spill(self, info: Optional[dict], owner: str) -> int:
+        """Replace the large values of an info dict (in place) - returns the number of spilled bytes"""
+        if not info:
+            return 0
+        spilled = 0
+        for name, value in info.items():
+            if value is None or isinstance(value, (bool, int, float, SpilledValue)):
+                continue
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(blob) < self.threshold:
+                continue
+            info[name] = self._put(blob, owner)
+            spilled += len(blob)
+        return spilled
+
+    def load(self, value: dict) -> Any:
+        """Read a spilled value back (from a SpilledValue or its plain dict form)"""
+        if not is_spilled(value):
+            raise ValueError("Not a spilled value")
+        try:
+            with open(self._blob_path(value[SPILLED_KEY]), "rb") as f:
+                return pickle.loads(f.read())
+        except FileNotFoundError:
+            raise ValueError(f"Spilled value {value[SPILLED_KEY]} was released") from None
+
+    def rehydrate(self, value: Any) -> Any:
+        """
+        Turn the plain dict forms of spilled values (e.g. in a restored checkpoint) back into
+        SpilledValue handles of this store - nested dicts and lists are converted in place
+        """
+        if isinstance(value, dict):
+            if is_spilled(value) and not isinstance(value, SpilledValue):
+                return SpilledValue(self, value[SPILLED_KEY], value.get("size", 0))
+            for k, v in value.items():
+                value[k] = self.rehydrate(v)
+        elif isinstance(value, list):
+            for i, v in enumerate(value):
+                value[i] = self.rehydrate(v)
+        return value
+
+    def release(self, owner: str):
+        """Delete the blobs of an owner"""
+        shutil.rmtree(os.path.join(self.directory, self._owner_dir(owner)), ignore_errors=True)
+
+    def _put(self, blob: bytes, owner: str) -> SpilledValue:
+        owner_dir = self._owner_dir(owner)
+        os.makedirs(os.path.join(self.directory, owner_dir), exist_ok=True)
+        key = f"{owner_dir}/{uuid.uuid4().hex}"
+        with open(self._blob_path(key), "wb") as f:
+            f.write(blob)
+        return SpilledValue(self, key, len(blob))
+
+    def _blob_path(self, key: str) -> str:
+        # keys come back from checkpoints - only accept the keys _put creates
+        if not isinstance(key, str) or not _KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid spilled value key: {key}")
+        owner_dir, name = key.split("/")
+        return os.path.join(self.directory, owner_dir, name)
+
+    @staticmethod
+    def _owner_dir(owner: str) -> str:
+        return hashlib.sha256(owner.encode("utf-8")).hexdigest()[:32]
@@ -0,0 +1,156 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# (state, budget) -> bounded state - policies must not modify the state they are given
+StatePolicy = Callable[[dict, "StateBudget"], dict]
+
+
+def state_size(state: Any) -> int:
+    """Size of the state in the request payload (bytes of compact JSON)"""
+    return len(json.dumps(state, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _map_values(value: Any, fn: Callable[[Optional[str], Any], Any], key: Optional[str] = None) -> Any:
+    # rebuilds the containers bottom-up, applying fn to every value (with the key it is stored under)
+    if isinstance(value, dict):
+        value = {k: _map_values(v, fn, k) for k, v in value.items()}
+    elif isinstance(value, list):
+        value = [_map_values(v, fn, key) for v in value]
+    return fn(key, value)
+
+
+def _collect_lists(value: Any, lists: List[list]):
+    if isinstance(value, dict):
+        for v in value.values():
+            _collect_lists(v, lists)
+    elif isinstance(value, list):
+        lists.append(value)
+        for v in value:
+            _collect_lists(v, lists)
+
+
+class TruncateLists:
+    """
+    Keeps only the newest `max_items` entries (the end) of every list in the state -
+    defaults to the budget's max_items
+    """
+
+    def __init__(self, max_items: Optional[int] = None):
+        self.max_items = max_items
+
+    def __call__(self, state: dict, budget: "StateBudget") -> dict:
+        max_items = self.max_items if self.max_items is not None else budget.max_items
+        if max_items is None:
+            return state
+        return _map_values(state, lambda key, value: (
+            value[len(value) - max_items:] if isinstance(value, list) and len(value) > max_items else value
+        ))
+
+
+class KeyCaps:
+    """
+    Per-key caps - lists stored under a capped key keep their newest entries, strings are truncated
+    """
+
+    def __init__(self, caps: Dict[str, int]):
+        self.caps = caps
+
+    def __call__(self, state: dict, budget: "StateBudget") -> dict:
+        def cap(key, value):
+            limit = self.caps.get(key)
+            if limit is None:
+                return value
+            if isinstance(value, list) and len(value) > limit:
+                return value[len(value) - limit:]
+            if isinstance(value, str) and len(value) > limit:
+                return value[:limit]
+            return value
+
+        return _map_values(state, cap)
+
+
+class TruncateStrings:
+    """Truncates every string longer than `max_chars`"""
+
+    def __init__(self, max_chars: int, suffix: str = "..."):
+        self.max_chars = max_chars
+        self.suffix = suffix
+
+    def __call__(self, state: dict, budget: "StateBudget") -> dict:
+        return _map_values(state, lambda key, value: (
+            value[:self.max_chars] + self.suffix if isinstance(value, str) and len(value) > self.max_chars else value
+        ))
+
+
+class OldestFirst:
+    """
+    While the state is over the budget's max_bytes, drops the oldest entry (the front) of the
+    largest list in the state
+    """
+
+    def __call__(self, state: dict, budget: "StateBudget") -> dict:
+        if budget.max_bytes is None:
+            return state
+        size = state_size(state)
+        if size <= budget.max_bytes:
+            return state
+
+        # copy the containers, then collect every list with the sizes of its entries
+        state = _map_values(state, lambda key, value: value)
+        lists: List[list] = []
+        _collect_lists(state, lists)
+        entry_sizes = [[state_size(entry) + 1 for entry in lst] for lst in lists]
+        list_sizes = [sum(sizes) for sizes in entry_sizes]
+        dropped = [0] * len(lists)
+
+        while size > budget.max_bytes:
+            largest = max(range(len(lists)), key=list_sizes.__getitem__, default=None)
+            if largest is None or dropped[largest] == len(lists[largest]):
+                break
+            entry = entry_sizes[largest][dropped[largest]]
+            dropped[largest] += 1
+            list_sizes[largest] -= entry
+            size -= entry
+
+        for lst, n in zip(lists, dropped):
+            del lst[:n]
+        return state
+
+
+class StateBudget:
+    """
+    Size budget for agent/worker states - applied every time a state function returns a new state,
+    so states kept in memory and sent in each request stay bounded.
+
+    `policies` run in order (default: TruncateLists, then OldestFirst). A state still over max_bytes
+    afterwards is kept as is, with a warning.
+    """
+
+    def __init__(
+        self,
+        # maximum size of a state as compact JSON (bytes)
+        max_bytes: Optional[int] = None,
+        # maximum number of entries of any list in a state
+        max_items: Optional[int] = None,
+        policies: Optional[List[StatePolicy]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.policies: List[StatePolicy] = policies if policies is not None else [
+            TruncateLists(), OldestFirst()]
+
+    def apply(self, state: dict) -> dict:
+        """Bound a state"""
+        if state is None:
+            return state
+        for policy in self.policies:
+            state = policy(state, self)
+        if self.max_bytes is not None:
+            size = state_size(state)
+            if size > self.max_bytes:
+                logger.warning("State exceeds its budget: %d > %d bytes", size, self.max_bytes)
+        return state
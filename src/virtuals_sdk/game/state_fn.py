@@ -0,0 +1,71 @@
+from typing import Any, Callable, Iterable, Optional, Tuple
+from virtuals_sdk.game.custom_types import FunctionResult
+
+
+class StateFn:
+    """
+    State function (get_agent_state_fn / get_state_fn) that declares when its state can change,
+    so the runtime can reuse the previous state object instead of calling it after every step:
+
+    - pure: called again only after steps that ran a function (it depends on nothing else)
+    - info_keys: called again only when the function result info has one of these keys
+    - fn_names: called again only after one of these functions ran
+
+    With both info_keys and fn_names, either one triggers an update. Initial states are always
+    computed. Reused states are not copied - state functions must return new objects rather than
+    modifying the previous state in place.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Optional[FunctionResult], Any], dict],
+        pure: bool = False,
+        info_keys: Optional[Iterable[str]] = None,
+        fn_names: Optional[Iterable[str]] = None,
+    ):
+        self.fn = fn
+        self.pure = pure
+        self.info_keys = frozenset(info_keys) if info_keys is not None else None
+        self.fn_names = frozenset(fn_names) if fn_names is not None else None
+
+    def __call__(self, function_result: Optional[FunctionResult], current_state: Any) -> dict:
+        return self.fn(function_result, current_state)
+
+    def needs_update(self, function_result: Optional[FunctionResult], fn_name: Optional[str]) -> bool:
+        """Whether the state can have changed - fn_name is the function that ran this step (if any)"""
+        if not self.pure and self.info_keys is None and self.fn_names is None:
+            return True
+        if fn_name is None:
+            return False
+        if self.info_keys is None and self.fn_names is None:
+            return True
+        if self.fn_names is not None and fn_name in self.fn_names:
+            return True
+        if self.info_keys is not None and function_result is not None and function_result.info:
+            return not self.info_keys.isdisjoint(function_result.info)
+        return False
+
+    def wrap(self, fn: Callable[[Optional[FunctionResult], Any], dict]) -> "StateFn":
+        """A state function with the same dependencies (e.g. wrapping this one)"""
+        return StateFn(fn, pure=self.pure, info_keys=self.info_keys, fn_names=self.fn_names)
+
+
+def state_fn(
+    pure: bool = False,
+    info_keys: Optional[Iterable[str]] = None,
+    fn_names: Optional[Iterable[str]] = None,
+) -> Callable[[Callable], StateFn]:
+    """Decorator declaring the dependencies of a state function (see StateFn)"""
+    return lambda fn: StateFn(fn, pure=pure, info_keys=info_keys, fn_names=fn_names)
+
+
+def call_state_fn(
+    fn: Callable,
+    function_result: Optional[FunctionResult],
+    current_state: Any,
+    fn_name: Optional[str],
+) -> Tuple[Any, bool]:
+    """Next state from a state function - returns (state, reused)"""
+    if isinstance(fn, StateFn) and not fn.needs_update(function_result, fn_name):
+        return current_state, True
+    return fn(function_result, current_state), False
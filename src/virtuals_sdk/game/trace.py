@@ -0,0 +1,202 @@
+"""
+Record GAME action traces and replay them against the local code, without calling the backend.
+
+    recorder = TraceRecorder("agent.trace.jsonl")
+    agent = Agent(..., recorder=recorder)
+    agent.run()
+
+    report = replay("agent.trace.jsonl", agent)
+    print(report.summary())
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from virtuals_sdk.game.custom_types import ActionResponse, FunctionResult
+from virtuals_sdk.game import instrumentation as spans
+from virtuals_sdk.game.instrumentation import Instrumentation, SpanStats
+from virtuals_sdk.game.utils import encode_json
+
+
+class TraceRecorder:
+    """
+    Appends one JSON line per step to a trace file: the request payload, the ActionResponse,
+    the FunctionResult (if a function was executed) and the step duration.
+    A recorder can be shared by several agents/workers (and threads).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        kind: str,  # "agent" or "worker"
+        request: dict,
+        action_response: ActionResponse,
+        function_result: Optional[FunctionResult],
+        duration: float,
+        **extra,
+    ):
+        line = encode_json({
+            "kind": kind,
+            "time": time.time(),
+            "duration": duration,
+            **extra,
+            "request": request,
+            "response": action_response.model_dump(mode="json", exclude_none=True),
+            "function_result": function_result.model_dump(mode="json") if function_result else None,
+        }, fallback=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path: str) -> Iterator[dict]:
+    """Iterate over the steps of a trace file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+@dataclass
+class ReplayReport:
+    steps: int = 0
+    # wall time of the whole replay (seconds)
+    elapsed: float = 0.0
+    step_times: List[float] = field(default_factory=list)
+    # timings per step phase (payload_build, function_execution, state_update...)
+    phases: Dict[str, SpanStats] = field(default_factory=dict)
+    # execution timings per function
+    functions: Dict[str, SpanStats] = field(default_factory=dict)
+    # steps whose function result status differs from the recorded one
+    divergences: int = 0
+
+    def summary(self) -> str:
+        lines = [f"{self.steps} steps in {self.elapsed * 1000:.3f}ms, {self.divergences} divergences"]
+        for title, stats in (("phase", self.phases), ("function", self.functions)):
+            for name, s in sorted(stats.items(), key=lambda item: -item[1].total):
+                lines.append(
+                    f"  {title} {name}: count={s.count} total={s.total * 1000:.3f}ms "
+                    f"mean={s.mean * 1000:.3f}ms max={s.max * 1000:.3f}ms")
+        return "\n".join(lines)
+
+
+def _add(stats: Dict[str, SpanStats], name: str, duration: float):
+    s = stats.get(name)
+    if s is None:
+        s = stats[name] = SpanStats()
+    s.count += 1
+    s.total += duration
+    if duration > s.max:
+        s.max = duration
+
+
+class _ReplaySpan:
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation: "_ReplayInstrumentation", name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._instrumentation.end_span(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _ReplayInstrumentation(Instrumentation):
+    def __init__(self, report: ReplayReport):
+        self.report = report
+        self._last_function_time = 0.0
+
+    def span(self, name: str):
+        return _ReplaySpan(self, name)
+
+    def end_span(self, name: str, duration: float):
+        if name == spans.STEP:
+            self.report.step_times.append(duration)
+        elif name == spans.FUNCTION_EXECUTION:
+            self._last_function_time = duration
+        _add(self.report.phases, name, duration)
+
+    def count(self, name: str, value: int = 1, **labels: str):
+        # function results are counted right after their execution span
+        if name == spans.FUNCTION_CALLS:
+            _add(self.report.functions, labels["fn_name"], self._last_function_time)
+
+
+def replay(path: str, target, session_id: Optional[str] = None) -> ReplayReport:
+    """
+    Re-run the steps of a trace against a (sync) Agent or Worker at full speed - the recorded
+    ActionResponses stand in for the GAME API while the local payload building, functions and state
+    functions run for real. Only the records of the target's kind (and session, if given) are replayed.
+    """
+    # imported here - agent.py/worker.py import this module
+    from virtuals_sdk.game.agent import Agent
+
+    kind = "agent" if isinstance(target, Agent) else "worker"
+    records = [
+        r for r in read_trace(path)
+        if r["kind"] == kind and (session_id is None or r.get("session_id") == session_id)
+    ]
+
+    report = ReplayReport()
+    instrumentation = _ReplayInstrumentation(report)
+    pending = iter(records)
+    current: Dict[str, dict] = {}
+
+    def get_action(function_result: Optional[FunctionResult] = None) -> ActionResponse:
+        with instrumentation.span(spans.PAYLOAD_BUILD):
+            # serialized like a real request, so that payload costs show up in the timings
+            encode_json(target._get_action_payload(function_result))
+        with instrumentation.span(spans.RESPONSE_VALIDATION):
+            return ActionResponse.model_validate(current["record"]["response"])
+
+    saved = (target._instrumentation, target._recorder)
+    target._instrumentation, target._recorder = instrumentation, None
+    # the backend is replaced by the trace for this instance only
+    target._get_action = get_action
+    if kind == "agent" and not hasattr(target, "worker_states"):
+        target._init_worker_states()
+
+    start = time.perf_counter()
+    try:
+        for record in pending:
+            current["record"] = record
+            if kind == "agent":
+                target.current_worker_id = record["request"]["location"]
+                target.step()
+                replayed = target._session.function_result
+            else:
+                target._submission_id = target._submission_id or "replay"
+                target.step()
+                replayed = target._function_result
+            recorded = record["function_result"]
+            if recorded is not None and (
+                replayed is None or replayed.action_status.value != recorded["action_status"]
+            ):
+                report.divergences += 1
+            report.steps += 1
+    finally:
+        report.elapsed = time.perf_counter() - start
+        del target._get_action
+        target._instrumentation, target._recorder = saved
+
+    return report
@@ -1,46 +1,158 @@
-import requests
-from typing import List
+import asyncio
+import functools
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple, Union
+from virtuals_sdk.game.auth import TokenCache, get_token_expiry
+from virtuals_sdk.game.custom_types import RawJSON
+from virtuals_sdk.transport import DEFAULT_POOL_MAXSIZE, HTTPTransport, get_default_transport
 
 
-def get_access_token(api_key) -> str:
+# GAME API endpoints - overridable through the environment (e.g. to point at a local stub server)
+GAME_BASE_URL = os.environ.get("GAME_BASE_URL", "https://game.virtuals.io")
+ACCESS_TOKEN_URL = os.environ.get(
+    "GAME_ACCESS_TOKEN_URL", "https://api.virtuals.io/api/accesses/tokens")
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Write a file atomically - readers see either the old or the new content, never a partial write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _fetch_access_token(api_key, transport: Optional[HTTPTransport] = None) -> Tuple[str, float]:
     """
-    API call to get access token
+    API call to mint a new access token - returns the token and its expiry (unix time)
     """
-    response = requests.post(
-        "https://api.virtuals.io/api/accesses/tokens",
+    transport = transport or get_default_transport()
+    response = transport.post(
+        ACCESS_TOKEN_URL,
         json={"data": {}},
-        headers={"x-api-key": api_key}
+        headers={"x-api-key": api_key},
+        # minting another token is harmless
+        idempotent=True,
     )
 
     response_json = response.json()
     if response.status_code != 200:
         raise ValueError(f"Failed to get token: {response_json}")
 
-    return response_json["data"]["accessToken"]
+    access_token = response_json["data"]["accessToken"]
+    return access_token, get_token_expiry(access_token)
+
+
+# access tokens shared by every agent/worker in the process
+token_cache = TokenCache(_fetch_access_token)
 
 
-def post(base_url: str, api_key: str, endpoint: str, data: dict) -> dict:
+def get_access_token(api_key, transport: Optional[HTTPTransport] = None) -> str:
     """
-    API call to post data
+    Get an access token for the API key - served from the process-wide token cache
     """
-    access_token = get_access_token(api_key)
+    return token_cache.get(api_key, transport)
 
-    response = requests.post(
-        f"{base_url}/prompts",
-        json={
-            "data":
-                {
-                    "method": "post",
-                    "headers": {
-                        "Content-Type": "application/json",
-                    },
-                    "route": endpoint,
-                    "data": data,
+
+# path segments of routes that are ids, e.g. /v2/agents/<id>/tasks/<id>/next
+_ROUTE_IDS = re.compile(r"(/agents|/tasks)/[^/]+")
+
+# placeholder prefix for RawJSON fragments while encoding a request body
+_RAW_JSON_MARKER = uuid.uuid4().hex
+
+
+def encode_json(obj: Any, fallback: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    JSON-encode a request body - RawJSON values are spliced in verbatim instead of being re-encoded.
+    Other values that are not JSON serializable are passed to `fallback` (if given).
+    """
+    fragments = []
+
+    def default(o):
+        if isinstance(o, RawJSON):
+            fragments.append(o.encoded)
+            return f"{_RAW_JSON_MARKER}:{len(fragments) - 1}"
+        if fallback is not None:
+            return fallback(o)
+        raise TypeError(
+            f"Object of type {type(o).__name__} is not JSON serializable")
+
+    encoded = json.dumps(obj, default=default, allow_nan=False)
+    for i, fragment in enumerate(fragments):
+        encoded = encoded.replace(f'"{_RAW_JSON_MARKER}:{i}"', fragment, 1)
+    return encoded
+
+
+def post(
+        base_url: str,
+        api_key: str,
+        endpoint: str,
+        data: Union[dict, RawJSON],
+        transport: Optional[HTTPTransport] = None,
+        idempotent: bool = False) -> dict:
+    """
+    API call to post data - `idempotent` requests are retried on server errors and read timeouts
+    """
+    transport = transport or get_default_transport()
+    body = encode_json({
+        "data":
+            {
+                "method": "post",
+                "headers": {
+                    "Content-Type": "application/json",
                 },
+                "route": endpoint,
+                "data": data,
+            },
+    }).encode("utf-8")
+    # one circuit per GAME route (ids are not part of the key)
+    route = _ROUTE_IDS.sub(r"\1/*", endpoint)
+    circuit_key = f"POST {base_url}{route}"
+
+    response = transport.post(
+        f"{base_url}/prompts",
+        data=body,
+        headers={
+            "Authorization": f"Bearer {get_access_token(api_key, transport)}",
+            "Content-Type": "application/json",
         },
-        headers={"Authorization": f"Bearer {access_token}"},
+        idempotent=idempotent,
+        circuit_key=circuit_key,
     )
 
+    if response.status_code == 401:
+        # cached token was revoked/expired early - mint a new one and retry once
+        token_cache.invalidate(api_key)
+        response = transport.post(
+            f"{base_url}/prompts",
+            data=body,
+            headers={
+                "Authorization": f"Bearer {get_access_token(api_key, transport)}",
+                "Content-Type": "application/json",
+            },
+            idempotent=idempotent,
+            circuit_key=circuit_key,
+        )
+
     response_json = response.json()
     if response.status_code != 200:
         raise ValueError(f"Failed to post data: {response_json}")
@@ -53,7 +165,8 @@ def create_agent(
         api_key: str,
         name: str,
         description: str,
-        goal: str) -> str:
+        goal: str,
+        transport: Optional[HTTPTransport] = None) -> str:
     """
     API call to create an agent instance (worker or agent with task generator)
     """
@@ -66,7 +179,8 @@ def create_agent(
             "name": name,
             "description": description,
             "goal": goal,
-        }
+        },
+        transport=transport,
     )
 
     return create_agent_response["id"]
@@ -74,7 +188,8 @@ def create_agent(
 
 def create_workers(base_url: str,
                    api_key: str,
-                   workers: List) -> str:
+                   workers: List,
+                   transport: Optional[HTTPTransport] = None) -> str:
     """
     API call to create workers and worker description for the task generator
     """
@@ -89,7 +204,106 @@ def create_workers(base_url: str,
                 for w in workers
             ]
         },
+        transport=transport,
     )
 
 
     return res["id"]
+
+
+# blocking HTTP calls made from async code run on this pool unless an executor is given - sized like
+# the per-host connection pool so that every in-flight request can hold a keep-alive connection. Its
+# size is the ceiling on in-flight requests (retry backoff included) of all agents/workers sharing it.
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_POOL_MAXSIZE, thread_name_prefix="game-io")
+    return _io_executor
+
+
+def own_io_executor(
+        owner: Any,
+        io_executor: Optional[Executor],
+        max_concurrent_requests: Optional[int]) -> Optional[Executor]:
+    """
+    I/O executor of an async agent/worker - the given one, or a dedicated pool of
+    max_concurrent_requests threads (shut down with the owner)
+    """
+    if max_concurrent_requests is None:
+        return io_executor
+    if io_executor is not None:
+        raise ValueError("Pass either io_executor or max_concurrent_requests, not both")
+    if max_concurrent_requests <= 0:
+        raise ValueError("max_concurrent_requests must be positive")
+    executor = ThreadPoolExecutor(max_workers=max_concurrent_requests, thread_name_prefix="game-io")
+    weakref.finalize(owner, executor.shutdown, wait=False)
+    return executor
+
+
+async def _run_io(executor: Optional[Executor], fn: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor or _get_io_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def async_get_access_token(
+        api_key,
+        transport: Optional[HTTPTransport] = None,
+        executor: Optional[Executor] = None) -> str:
+    """
+    Async version of get_access_token - only leaves the event loop when a token has to be fetched
+    """
+    access_token = token_cache.peek(api_key)
+    if access_token is None:
+        access_token = await _run_io(executor, get_access_token, api_key, transport)
+    return access_token
+
+
+async def async_post(
+        base_url: str,
+        api_key: str,
+        endpoint: str,
+        data: Union[dict, RawJSON],
+        transport: Optional[HTTPTransport] = None,
+        idempotent: bool = False,
+        executor: Optional[Executor] = None) -> dict:
+    """
+    Async version of post - does not block the event loop. The request runs on `executor`
+    (defaults to the shared I/O pool of DEFAULT_POOL_MAXSIZE threads).
+    """
+    return await _run_io(
+        executor, post, base_url, api_key, endpoint, data, transport=transport, idempotent=idempotent)
+
+
+async def async_create_agent(
+        base_url: str,
+        api_key: str,
+        name: str,
+        description: str,
+        goal: str,
+        transport: Optional[HTTPTransport] = None,
+        executor: Optional[Executor] = None) -> str:
+    """
+    Async version of create_agent
+    """
+    return await _run_io(
+        executor, create_agent, base_url, api_key, name, description, goal, transport=transport)
+
+
+async def async_create_workers(base_url: str,
+                               api_key: str,
+                               workers: List,
+                               transport: Optional[HTTPTransport] = None,
+                               executor: Optional[Executor] = None) -> str:
+    """
+    Async version of create_workers
+    """
+    return await _run_io(
+        executor, create_workers, base_url, api_key, workers, transport=transport)
@@ -1,6 +1,23 @@
-from typing import Any, Callable, Dict, Optional, List
-from virtuals_sdk.game.custom_types import Function, FunctionResult, FunctionResultStatus, ActionResponse, ActionType
-from virtuals_sdk.game.utils import create_agent, post
+import copy
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, List, Union
+from virtuals_sdk.game.custom_types import Function, FunctionResult, FunctionResultStatus, ActionResponse, ActionType, ActionSpace, RawJSON, StepEvent
+from virtuals_sdk.game.utils import GAME_BASE_URL, create_agent, encode_json, get_access_token, post
+from virtuals_sdk.game.state_budget import StateBudget
+from virtuals_sdk.game.state_fn import StateFn, call_state_fn
+from virtuals_sdk.game.spill import SpillStore, is_spilled
+from virtuals_sdk.game.registry import AgentRegistry
+from virtuals_sdk.game import instrumentation as spans
+from virtuals_sdk.game.instrumentation import Instrumentation, NOOP_INSTRUMENTATION
+from virtuals_sdk.game.trace import TraceRecorder
+from virtuals_sdk.transport import HTTPTransport
+
+
+logger = logging.getLogger(__name__)
 
 
 class Worker:
@@ -16,10 +33,40 @@ class Worker:
         action_space: List[Function],
         # specific additional instruction for the worker (PROMPT)
         instruction: Optional[str] = "",
+        # HTTP transport for GAME API calls (defaults to the shared pooled transport)
+        transport: Optional[HTTPTransport] = None,
+        # registry of remote ids - reuses the agent created by a previous run if nothing changed
+        registry: Optional[AgentRegistry] = None,
+        # GAME API base url (defaults to GAME_BASE_URL)
+        base_url: Optional[str] = None,
+        # timing spans and counters of each step (no-op by default)
+        instrumentation: Optional[Instrumentation] = None,
+        # records every step to a trace file (see virtuals_sdk.game.trace)
+        recorder: Optional[TraceRecorder] = None,
+        # size budget applied to the worker state
+        state_budget: Optional[StateBudget] = None,
+        # maximum number of tasks run concurrently by submit
+        max_concurrent_tasks: int = 4,
+        # moves large function result info values to disk until the worker is reset
+        spill_store: Optional[SpillStore] = None,
     ):
 
-        self._base_url: str = "https://game.virtuals.io"
+        self._base_url: str = base_url or GAME_BASE_URL
         self._api_key: str = api_key
+        self._transport: Optional[HTTPTransport] = transport
+        self._registry: Optional[AgentRegistry] = registry
+        self._instrumentation: Instrumentation = instrumentation or NOOP_INSTRUMENTATION
+        self._recorder: Optional[TraceRecorder] = recorder
+        self._state_budget: Optional[StateBudget] = state_budget
+        self.max_concurrent_tasks: int = max_concurrent_tasks
+        self._spill_store: Optional[SpillStore] = spill_store
+        # owner of the spilled info values of this worker (see _release_spilled)
+        self._spill_owner: Optional[str] = uuid.uuid4().hex
+        # runs the tasks given to submit (created on first use)
+        self._task_executor: Optional[ThreadPoolExecutor] = None
+        self._task_executor_lock = threading.Lock()
+        # encoded size of the last action request payload (bytes)
+        self.last_payload_size: Optional[int] = None
 
         # checks
         if not self._api_key:
@@ -34,6 +81,11 @@ class Worker:
             # places the rest of the output of the get_state_fn in the state
             **get_state_fn(function_result, current_state),
         }
+        if isinstance(get_state_fn, StateFn):
+            # keep the declared dependencies of the state function
+            self.get_state_fn = get_state_fn.wrap(self.get_state_fn)
+        # encoded state of a StateFn state function, reused while the state is
+        self._encoded_state: Optional[RawJSON] = None
         dummy_function_result = FunctionResult(
             action_id="",
             action_status=FunctionResultStatus.DONE,
@@ -41,26 +93,76 @@ class Worker:
             info={},
         )
         # get state
-        self.state = self.get_state_fn(dummy_function_result, None)
+        self.state = self._bounded(self.get_state_fn(dummy_function_result, None))
 
         # # setup action space (functions/tools available to the worker)
-        # check action space type - if not a dict
-        if not isinstance(action_space, dict):
-            self.action_space = {
-                f.get_function_def()["fn_name"]: f for f in action_space}
-        else:
-            self.action_space = action_space
-
-        # initialize an agent instance for the worker
-        self._agent_id: str = create_agent(
-            self._base_url, self._api_key, "StandaloneWorker", self.description, "N/A"
-        )
+        self.action_space = action_space
 
         # persistent variables that is maintained through the worker running
         # task ID for everytime you provide/update the task (i.e. ask the agent to do something)
         self._submission_id: Optional[str] = None
         # current response from the Agent
         self._function_result: Optional[FunctionResult] = None
+        # steps taken in the current task, and the last one
+        self._task_steps = 0
+        self._last_step_event: Optional[StepEvent] = None
+
+        # initialize an agent instance for the worker
+        self._agent_id: Optional[str] = None
+        self._init_agent()
+
+    def _init_agent(self):
+        """
+        Creates the remote agent instance backing the worker (or reuses the registered one)
+        """
+        def create():
+            return create_agent(
+                self._base_url, self._api_key, "StandaloneWorker", self.description, "N/A",
+                transport=self._transport,
+            )
+
+        if self._registry is None:
+            self._agent_id = create()
+        else:
+            self._agent_id = self._registry.get_or_create(self._agent_key(), create)
+
+    def _agent_key(self) -> str:
+        return AgentRegistry.agent_key(
+            self._base_url, self._api_key, "StandaloneWorker", self.description, "N/A")
+
+    @property
+    def action_space(self) -> ActionSpace:
+        return self._action_space
+
+    @action_space.setter
+    def action_space(self, action_space: Union[List[Function], Dict[str, Function]]):
+        # function definitions are serialized once per action space (see ActionSpace)
+        self._action_space = (
+            action_space if isinstance(action_space, ActionSpace) else ActionSpace(action_space)
+        )
+
+    def reset(self):
+        """
+        Clears the task and puts the state back to the initial state - the remote agent instance is kept
+        """
+        self._submission_id = None
+        self._function_result = None
+        dummy_function_result = FunctionResult(
+            action_id="",
+            action_status=FunctionResultStatus.DONE,
+            feedback_message="",
+            info={},
+        )
+        self.state = self._bounded(self.get_state_fn(dummy_function_result, None))
+        self._release_spilled()
+
+    def _release_spilled(self):
+        """
+        Deletes the spilled info values of the worker (its state starts over) and starts a new owner
+        """
+        if self._spill_store is not None and self._spill_owner is not None:
+            self._spill_store.release(self._spill_owner)
+        self._spill_owner = uuid.uuid4().hex
 
     def set_task(self, task: str):
         """
@@ -71,6 +173,7 @@ class Worker:
             api_key=self._api_key,
             endpoint=f"/v2/agents/{self._agent_id}/tasks",
             data={"task": task},
+            transport=self._transport,
         )
         # response_json = set_task_response.json()
 
@@ -79,16 +182,17 @@ class Worker:
 
         # task ID
         self._submission_id = set_task_response["submission_id"]
+        self._task_steps = 0
 
         return self._submission_id
 
-    def _get_action(
+    def _get_action_payload(
         self,
         # results of the previous action (if any)
         function_result: Optional[FunctionResult] = None
-    ) -> ActionResponse:
+    ) -> dict:
         """
-        Gets the agent action from the GAME API
+        Builds the data payload for the next action request
         """
         # dummy function result if None is provided - for get_state_fn to take the same input all the time
         if function_result is None:
@@ -99,70 +203,285 @@ class Worker:
                 info={},
             )
         # set up data payload
-        data = {
-            "environment": self.state,  # state (updated state)
-            "functions": [
-                f.get_function_def() for f in self.action_space.values()  # functions available
-            ],
+        return {
+            "environment": self._state_payload(),  # state (updated state)
+            "functions": self.action_space.function_defs(),  # functions available
             "action_result": (
                 function_result.model_dump(
                     exclude={'info'}) if function_result else None
             ),
         }
 
-        # make API call
-        response = post(
-            base_url=self._base_url,
-            api_key=self._api_key,
-            endpoint=f"/v2/agents/{self._agent_id}/tasks/{self._submission_id}/next",
-            data=data,
-        )
+    def _state_payload(self):
+        """
+        The state for the payload - the state of a StateFn state function is encoded once while reused
+        """
+        if not isinstance(self.get_state_fn, StateFn):
+            return self.state
+        encoded = self._encoded_state
+        if encoded is None or encoded.value is not self.state:
+            encoded = self._encoded_state = RawJSON(self.state, encode_json(self.state))
+        return encoded
 
-        return ActionResponse.model_validate(response)
+    def _encode_payload(self, data: dict) -> RawJSON:
+        """
+        Encodes the payload once - its size is reported and post sends it verbatim
+        """
+        encoded = encode_json(data)
+        self.last_payload_size = len(encoded.encode("utf-8"))
+        self._instrumentation.count(spans.PAYLOAD_BYTES, self.last_payload_size)
+        return RawJSON(data, encoded)
 
-    def step(self):
+    def _get_action(
+        self,
+        # results of the previous action (if any)
+        function_result: Optional[FunctionResult] = None
+    ) -> ActionResponse:
         """
-        Execute the next step in the task - requires a task ID (i.e. task ID)
+        Gets the agent action from the GAME API
         """
-        if not self._submission_id:
-            raise ValueError("No task set")
+        instrumentation = self._instrumentation
 
-        # get action from GAME API (Agent)
-        action_response = self._get_action(self._function_result)
+        with instrumentation.span(spans.PAYLOAD_BUILD):
+            data = self._get_action_payload(function_result)
+            body = self._encode_payload(data)
+        # kept for the trace recorder
+        self._last_payload = data
+
+        # make sure the access token is cached, so that the API call span only measures the call itself
+        with instrumentation.span(spans.TOKEN_FETCH):
+            get_access_token(self._api_key, self._transport)
+
+        # make API call
+        with instrumentation.span(spans.API_CALL):
+            response = post(
+                base_url=self._base_url,
+                api_key=self._api_key,
+                endpoint=f"/v2/agents/{self._agent_id}/tasks/{self._submission_id}/next",
+                data=body,
+                transport=self._transport,
+            )
+
+        with instrumentation.span(spans.RESPONSE_VALIDATION):
+            return ActionResponse.model_validate(response)
+
+    def _process_action(self, action_response: ActionResponse) -> Optional[Function]:
+        """
+        Applies the action returned by GAME - returns the function to execute (if any)
+        """
         action_type = action_response.action_type
+        self._instrumentation.count(spans.ACTIONS, action_type=action_type.value)
 
-        print(f"Action response: {action_response}")
-        print(f"Action type: {action_type}")
+        logger.info("Step - action type: %s", action_type)
+        logger.debug("Action response: %s", action_response)
 
-        # execute action
+        # select action
         if action_type == ActionType.CALL_FUNCTION:
             if not action_response.action_args:
                 raise ValueError("No function information provided by GAME")
 
-            self._function_result = self.action_space[
-                action_response.action_args["fn_name"]
-            ].execute(**action_response.action_args)
-
-            print(f"Function result: {self._function_result}")
-
-            # update state
-            self.state = self.get_state_fn(self._function_result, self.state)
+            return self.action_space[action_response.action_args["fn_name"]]
 
         elif action_response.action_type == ActionType.WAIT:
-            print("Task completed or ended (not possible)")
+            logger.info("Task completed or ended (not possible)")
             self._submission_id = None
 
         else:
             raise ValueError(
                 f"Unexpected action type: {action_response.action_type}")
 
-        return action_response, self._function_result.model_copy()
+        return None
+
+    def _record_function_result(self, function: Function):
+        """
+        Logs and counts the result of the executed function, and invalidates cached results it made stale
+        """
+        self.action_space.function_executed(function)
+        self._instrumentation.count(
+            spans.FUNCTION_CALLS, fn_name=function.fn_name, status=self._function_result.action_status.value)
+        logger.debug("Function result: %s", self._function_result)
+
+    def _spill_function_result(self):
+        """
+        Moves the large info values of the last function result to the spill store (if any)
+        """
+        if self._spill_store is not None:
+            spilled = self._spill_store.spill(self._function_result.info, self._spill_owner)
+            if spilled:
+                self._instrumentation.count(spans.SPILLED_BYTES, spilled)
+
+    def _record_trace(self, action_response: ActionResponse, function: Optional[Function], duration: float):
+        """
+        Writes the step to the trace recorder (if any)
+        """
+        if self._recorder is not None:
+            self._recorder.record(
+                "worker",
+                self._last_payload,
+                action_response,
+                self._function_result if function is not None else None,
+                duration,
+            )
+
+    def _bounded(self, state: dict) -> dict:
+        """
+        Applies the state budget (if any)
+        """
+        return self._state_budget.apply(state) if self._state_budget is not None else state
+
+    def _step_event(
+        self,
+        action_response: ActionResponse,
+        function: Optional[Function],
+        duration: float,
+        function_duration: Optional[float],
+    ) -> StepEvent:
+        """
+        Describes the step that just ended
+        """
+        return StepEvent(
+            step=self._task_steps,
+            action_type=action_response.action_type,
+            worker_id=None,
+            fn_name=function.fn_name if function is not None else None,
+            args=Function._process_args(action_response.action_args.get("args") or {}) if function is not None else None,
+            result=self._function_result if function is not None else None,
+            duration=duration,
+            function_duration=function_duration,
+            action_response=action_response,
+        )
+
+    def _update_state(self, function: Function):
+        """
+        Updates the worker state with the last function result
+        """
+        state, reused = call_state_fn(self.get_state_fn, self._function_result, self.state, function.fn_name)
+        if not reused:
+            self._encoded_state = None
+            self.state = self._bounded(state)
+
+    def step(self):
+        """
+        Execute the next step in the task - requires a task ID (i.e. task ID)
+        """
+        if not self._submission_id:
+            raise ValueError("No task set")
+
+        instrumentation = self._instrumentation
+        started = time.perf_counter()
+
+        with instrumentation.span(spans.STEP):
+            # get action from GAME API (Agent)
+            action_response = self._get_action(self._function_result)
+
+            # execute action
+            function = self._process_action(action_response)
+            function_duration = None
+            if function is not None:
+                with instrumentation.span(spans.FUNCTION_EXECUTION):
+                    function_started = time.perf_counter()
+                    self._function_result = function.execute(**action_response.action_args)
+                    function_duration = time.perf_counter() - function_started
+                self._record_function_result(function)
+                self._spill_function_result()
+
+                with instrumentation.span(spans.STATE_UPDATE):
+                    self._update_state(function)
+
+        duration = time.perf_counter() - started
+        self._record_trace(action_response, function, duration)
+        self._task_steps += 1
+        self._last_step_event = self._step_event(action_response, function, duration, function_duration)
+        # later steps replace the function result rather than modifying it, so it is not copied
+        # (None when the first action of the task is WAIT)
+        return action_response, self._function_result
 
     def run(self, task: str):
         """
         Gets the agent to complete the task on its own autonomously
         """
 
+        for _ in self.stream(task):
+            pass
+
+    def stream(self, task: str, max_steps: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[StepEvent]:
+        """
+        Works on the task, yielding a StepEvent after each step - stops when the task is done, after
+        max_steps steps or once `timeout` seconds passed (checked between steps), or when the consumer
+        stops iterating
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
         self.set_task(task)
-        while self._submission_id:
+        while self._submission_id and (max_steps is None or self._task_steps < max_steps) and (
+                deadline is None or time.monotonic() < deadline):
             self.step()
+            yield self._last_step_event
+
+    def _task_view(self) -> "Worker":
+        """
+        Copy of the worker for one submitted task - shares the remote agent, the functions and the
+        transport, with its own submission, state and function result chain
+        """
+        view = copy.copy(self)
+        view._task_executor = None
+        # the spilled values of the worker are not the view's to release
+        view._spill_owner = None
+        view.reset()
+        return view
+
+    def _task_result(self) -> Optional[FunctionResult]:
+        """
+        Last function result of a finished task view, with its spilled info values loaded back - the
+        view's spilled values are released once its task is done
+        """
+        result = self._function_result
+        if result is None or self._spill_store is None or not result.info:
+            return result
+        info = {
+            name: self._spill_store.load(value) if is_spilled(value) else value
+            for name, value in result.info.items()
+        }
+        return result.model_copy(update={"info": info})
+
+    def _run_task(self, task: str) -> Optional[FunctionResult]:
+        view = self._task_view()
+        try:
+            view.run(task)
+            return view._task_result()
+        finally:
+            view._release_spilled()
+
+    def submit(
+        self,
+        task: str,
+        # called with the future once the task is done
+        callback: Optional[Callable[[Future], Any]] = None,
+    ) -> Future:
+        """
+        Runs a task in the background, concurrently with other submitted tasks (up to max_concurrent_tasks)
+        on the same remote agent - the future resolves to the last function result of the task
+        """
+        with self._task_executor_lock:
+            if self._task_executor is None:
+                self._task_executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_tasks, thread_name_prefix="game-task")
+        future = self._task_executor.submit(self._run_task, task)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def run_many(self, tasks: List[str]) -> List[Optional[FunctionResult]]:
+        """
+        Runs the tasks concurrently and returns their last function results (in order)
+        """
+        futures = [self.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the background task runner (tasks in progress finish when wait=True)
+        """
+        with self._task_executor_lock:
+            executor, self._task_executor = self._task_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+from virtuals_sdk.game.worker import Worker
+
+
+class WorkerPool:
+    """
+    Bounded pool of ready standalone workers per worker id.
+
+    Building a worker runs its state function and creates its remote agent instance. Pooled workers
+    are reset when released (task cleared, state back to the initial state) and keep their remote
+    agent, so handing one out again is a dictionary lookup. At most `max_idle` released workers are
+    kept per worker id; workers idle for longer than `idle_timeout` seconds are dropped (checked on
+    every acquire and release). Workers handed out before their worker id was cleared (e.g. its
+    config was replaced) are dropped when released.
+    """
+
+    def __init__(
+        self,
+        # builds a new worker for a worker id (e.g. Agent.get_worker)
+        factory: Callable[[str], Worker],
+        max_idle: int = 4,
+        idle_timeout: Optional[float] = 300.0,
+    ):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+
+        # worker id -> (worker, released at) of the idle workers, most recently released last
+        self._idle: Dict[str, Deque[Tuple[Worker, float]]] = {}
+        self._lock = threading.Lock()
+        # bumped by clear - workers are tagged with the generation they were built in
+        self._generation = 0
+        # worker id -> generation of its last clear (_cleared_all: of the last clear of all ids)
+        self._cleared: Dict[str, int] = {}
+        self._cleared_all = 0
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, worker_id: str) -> Worker:
+        """Hand out a ready worker - a pooled one if available, otherwise a new one"""
+        # never hand out a worker that idled past its timeout
+        self.evict_idle()
+        with self._lock:
+            idle = self._idle.get(worker_id)
+            if idle:
+                worker, _ = idle.pop()
+                self.hits += 1
+                return worker
+            self.misses += 1
+            generation = self._generation
+        return self._build(worker_id, generation)
+
+    def release(self, worker_id: str, worker: Worker):
+        """Reset a worker and return it to the pool (dropped if the pool is full or the worker is stale)"""
+        worker.reset()
+        now = time.monotonic()
+        with self._lock:
+            if not self._is_stale(worker_id, worker):
+                idle = self._idle.setdefault(worker_id, deque())
+                if len(idle) < self.max_idle:
+                    idle.append((worker, now))
+        self.evict_idle()
+
+    @contextmanager
+    def worker(self, worker_id: str) -> Iterator[Worker]:
+        """Borrow a worker for the duration of the block"""
+        worker = self.acquire(worker_id)
+        try:
+            yield worker
+        finally:
+            self.release(worker_id, worker)
+
+    def prewarm(self, worker_id: str, count: Optional[int] = None):
+        """Build workers in parallel until `count` (default max_idle) are ready for the worker id"""
+        count = min(count if count is not None else self.max_idle, self.max_idle)
+        with self._lock:
+            missing = count - len(self._idle.get(worker_id, ()))
+            generation = self._generation
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing, thread_name_prefix="game-prewarm") as executor:
+            workers = list(executor.map(lambda _: self._build(worker_id, generation), range(missing)))
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(worker_id, deque())
+            # built from a config that was replaced meanwhile
+            workers = [worker for worker in workers if not self._is_stale(worker_id, worker)]
+            for worker in workers[:self.max_idle - len(idle)]:
+                idle.append((worker, now))
+
+    def evict_idle(self) -> int:
+        """Drop the workers idle for longer than idle_timeout - returns the number of dropped workers"""
+        if self.idle_timeout is None:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        evicted = 0
+        with self._lock:
+            for idle in self._idle.values():
+                # oldest first
+                while idle and idle[0][1] < deadline:
+                    idle.popleft()
+                    evicted += 1
+        return evicted
+
+    def clear(self, worker_id: Optional[str] = None):
+        """Drop the idle workers (of one worker id, or all) - workers handed out so far are dropped when released"""
+        with self._lock:
+            self._generation += 1
+            if worker_id is None:
+                self._idle.clear()
+                self._cleared.clear()
+                self._cleared_all = self._generation
+            else:
+                self._idle.pop(worker_id, None)
+                self._cleared[worker_id] = self._generation
+
+    def idle_count(self, worker_id: str) -> int:
+        with self._lock:
+            return len(self._idle.get(worker_id, ()))
+
+    def _build(self, worker_id: str, generation: int) -> Worker:
+        worker = self.factory(worker_id)
+        worker._pool_generation = generation
+        return worker
+
+    def _is_stale(self, worker_id: str, worker: Worker) -> bool:
+        # called with self._lock held - workers not built by the pool are never pooled
+        generation = getattr(worker, "_pool_generation", None)
+        return generation is None or generation < max(self._cleared.get(worker_id, 0), self._cleared_all)
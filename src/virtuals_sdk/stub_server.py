@@ -0,0 +1,338 @@
+"""
+Local stand-in for the GAME and platform APIs, for offline testing, benchmarking and profiling.
+
+    with StubGameServer(script=[...], latency=0.01) as stub:
+        agent = Agent(..., base_url=stub.base_url)
+        sdk = GameSDK(api_key, api_url=stub.api_url)
+
+Entering the context also points the access token requests (utils.ACCESS_TOKEN_URL) at the stub.
+The stub can also be run on its own: `python -m virtuals_sdk.stub_server --port 8080`.
+"""
+import argparse
+import base64
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from virtuals_sdk.game import utils
+
+
+# (route, data) -> ActionResponse dict
+Responder = Callable[[str, dict], dict]
+
+_AGENT_ACTIONS_ROUTE = re.compile(r"^/v2/agents/([^/]+)/actions$")
+_TASKS_ROUTE = re.compile(r"^/v2/agents/([^/]+)/tasks$")
+_TASK_NEXT_ROUTE = re.compile(r"^/v2/agents/([^/]+)/tasks/([^/]+)/next$")
+
+
+def action_response(
+    action_type: str,
+    fn_name: Optional[str] = None,
+    args: Optional[Dict[str, Any]] = None,
+    location_id: Optional[str] = None,
+    task: str = "stub task",
+    change_indicator: Optional[str] = None,
+) -> dict:
+    """
+    Build an ActionResponse payload as returned by the GAME API
+    """
+    response = {
+        "action_type": action_type,
+        "agent_state": {
+            "hlp": {
+                "plan_id": "stub-plan",
+                "observation_reflection": "",
+                "plan": [task],
+                "plan_reasoning": "",
+                "current_state_of_execution": "",
+                "change_indicator": change_indicator,
+                "log": [],
+            },
+            "current_task": {
+                "task": task,
+                "task_reasoning": "",
+                "location_id": location_id or "*not provided*",
+                "llp": None,
+            },
+        },
+    }
+    if fn_name is not None:
+        response["action_args"] = {
+            "fn_name": fn_name,
+            "fn_id": f"stub-{fn_name}",
+            "args": {name: {"value": value} for name, value in (args or {}).items()},
+        }
+    elif location_id is not None:
+        response["action_args"] = {"location_id": location_id}
+    return response
+
+
+def default_responder(route: str, data: dict) -> dict:
+    """
+    Deterministic default behaviour - agents call the first available function on every step,
+    standalone workers call their first function once and then end the task
+    """
+    functions = data.get("functions") or []
+    if _TASK_NEXT_ROUTE.match(route) and (data.get("action_result") or {}).get("action_id"):
+        return action_response("wait")
+    if not functions:
+        return action_response("wait")
+    fn = functions[0]
+    return action_response(
+        "call_function",
+        fn_name=fn["fn_name"],
+        # optional arguments are left out, required ones get an empty value of their type
+        args={arg["name"]: _empty_value(arg.get("type")) for arg in fn.get("args", []) if not arg.get("optional")},
+    )
+
+
+# empty values of the primitive argument types - other types get ""
+_EMPTY_VALUES = {
+    "integer": 0, "int": 0, "number": 0, "float": 0,
+    "boolean": False, "bool": False,
+    "array": [], "list": [],
+    "object": {}, "dict": {},
+}
+
+
+def _empty_value(arg_type) -> object:
+    if isinstance(arg_type, list):
+        arg_type = arg_type[0] if arg_type else None
+    value = _EMPTY_VALUES.get(arg_type.lower(), "") if isinstance(arg_type, str) else ""
+    # fresh containers for every response
+    return type(value)() if isinstance(value, (list, dict)) else value
+
+
+class StubGameServer:
+    """
+    Threaded HTTP server implementing the GAME endpoints used by the SDK:
+
+    - POST /api/accesses/tokens
+    - POST /prompts, routed to /v2/agents, /v2/maps, /v2/agents/{id}/actions,
+      /v2/agents/{id}/tasks and /v2/agents/{id}/tasks/{submission_id}/next
+    - GET /api/functions, POST /api/simulate, /api/react/{platform} and /api/deploy
+
+    `script` drives the action endpoints: a list of ActionResponse dicts served in order (and cycled),
+    or a callable (route, data) -> ActionResponse dict. `latency` (seconds) is added to every response,
+    or per endpoint with a dict keyed by "token", "prompts" and "platform". fail_next makes an
+    endpoint reply with error statuses, e.g. to exercise retries and circuit breaking.
+    """
+
+    def __init__(
+        self,
+        script: Optional[Union[Iterable[dict], Responder]] = None,
+        latency: Union[float, Dict[str, float]] = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token_ttl: float = 3600.0,
+        # default functions listed by GET /api/functions
+        platform_functions: Optional[List[dict]] = None,
+    ):
+        if script is None:
+            self._responder: Responder = default_responder
+        elif callable(script):
+            self._responder = script
+        else:
+            actions = itertools.cycle(list(script))
+            self._responder = lambda route, data: next(actions)
+
+        self.latency = latency
+        self.token_ttl = token_ttl
+        self.platform_functions = platform_functions or []
+
+        # (method, path, body) of every request received
+        self.requests: List[tuple] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # endpoint -> statuses of the next replies (see fail_next)
+        self._failures: Dict[str, List[int]] = {}
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self._previous_token_url: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """Base url for game Agent/Worker"""
+        return self.url
+
+    @property
+    def api_url(self) -> str:
+        """Api url for twitter_agent GameSDK"""
+        return f"{self.url}/api"
+
+    @property
+    def access_token_url(self) -> str:
+        return f"{self.url}/api/accesses/tokens"
+
+    def start(self) -> "StubGameServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="game-stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def install(self):
+        """Point the access token requests of the game runtime at the stub"""
+        self._previous_token_url = utils.ACCESS_TOKEN_URL
+        utils.ACCESS_TOKEN_URL = self.access_token_url
+        utils.token_cache.clear()
+
+    def uninstall(self):
+        if self._previous_token_url is not None:
+            utils.ACCESS_TOKEN_URL = self._previous_token_url
+            self._previous_token_url = None
+            utils.token_cache.clear()
+
+    def __enter__(self) -> "StubGameServer":
+        self.start()
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503, endpoint: str = "prompts"):
+        """Reply to the next `count` requests of an endpoint ("token", "prompts" or "platform") with `status`"""
+        with self._lock:
+            self._failures.setdefault(endpoint, []).extend([status] * count)
+
+    def _failure(self, endpoint: str) -> Optional[int]:
+        with self._lock:
+            failures = self._failures.get(endpoint)
+            return failures.pop(0) if failures else None
+
+    def _next_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}-{next(self._ids)}"
+
+    def _delay(self, endpoint: str):
+        latency = self.latency.get(endpoint, 0.0) if isinstance(
+            self.latency, dict) else self.latency
+        if latency:
+            time.sleep(latency)
+
+    def _access_token(self) -> str:
+        # unsigned JWT so that the token cache picks up the expiry
+        claims = json.dumps({"exp": time.time() + self.token_ttl}).encode()
+        payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+        return f"stub.{payload}.{self._next_id('token')}"
+
+    def _prompt(self, route: str, data: dict) -> dict:
+        if route == "/v2/agents":
+            return {"id": self._next_id("agent")}
+        if route == "/v2/maps":
+            return {"id": self._next_id("map")}
+        if _TASKS_ROUTE.match(route):
+            return {"submission_id": self._next_id("submission")}
+        if _AGENT_ACTIONS_ROUTE.match(route) or _TASK_NEXT_ROUTE.match(route):
+            with self._lock:
+                return self._responder(route, data)
+        raise KeyError(route)
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately - avoid Nagle/delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return None
+                return json.loads(self.rfile.read(length))
+
+            def _reply(self, status: int, body: Any):
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def _reply_failure(self, endpoint: str) -> bool:
+                # injected by fail_next
+                status = stub._failure(endpoint)
+                if status is None:
+                    return False
+                self._reply(status, {"error": "Injected failure"})
+                return True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(("GET", self.path, None))
+                if self.path == "/api/functions":
+                    stub._delay("platform")
+                    if self._reply_failure("platform"):
+                        return
+                    return self._reply(200, {"data": stub.platform_functions})
+                self._reply(404, {"error": f"Unknown path: {self.path}"})
+
+            def do_POST(self):
+                body = self._read_body()
+                with stub._lock:
+                    stub.requests.append(("POST", self.path, body))
+
+                if self.path == "/api/accesses/tokens":
+                    stub._delay("token")
+                    if self._reply_failure("token"):
+                        return
+                    return self._reply(200, {"data": {"accessToken": stub._access_token()}})
+
+                if self.path == "/prompts":
+                    stub._delay("prompts")
+                    if self._reply_failure("prompts"):
+                        return
+                    if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                        return self._reply(401, {"error": "Missing access token"})
+                    route = body["data"]["route"]
+                    try:
+                        return self._reply(200, {"data": stub._prompt(route, body["data"]["data"])})
+                    except KeyError:
+                        return self._reply(404, {"error": f"Unknown route: {route}"})
+
+                if self.path in ("/api/simulate", "/api/deploy") or self.path.startswith("/api/react/"):
+                    stub._delay("platform")
+                    if self._reply_failure("platform"):
+                        return
+                    return self._reply(200, {"data": {"path": self.path, **body["data"]}})
+
+                self._reply(404, {"error": f"Unknown path: {self.path}"})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the GAME API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    cli_args = parser.parse_args()
+
+    server = StubGameServer(latency=cli_args.latency, host=cli_args.host, port=cli_args.port)
+    print(f"GAME stub server listening on {server.url}")
+    print(f"  GAME_BASE_URL={server.base_url}")
+    print(f"  GAME_ACCESS_TOKEN_URL={server.access_token_url}")
+    print(f"  GAME_PLATFORM_API_URL={server.api_url}")
+    server._server.serve_forever()
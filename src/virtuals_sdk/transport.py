@@ -0,0 +1,293 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (connect timeout, read timeout) in seconds
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_TIMEOUT: Timeout = (5.0, 60.0)
+
+# marker for "use the default" arguments that also accept None
+_DEFAULT = object()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised without sending the request while the circuit of an endpoint is open
+    """
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    Requests that may not have been processed by the server (connect errors/timeouts, 429 and 503
+    responses) are always retried. Other failures (5xx responses, read timeouts, dropped connections)
+    are only retried for idempotent requests - by default those with an idempotent HTTP method.
+    Waits use exponential backoff with full jitter, or the server's Retry-After when present.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504}),
+        idempotent_methods: FrozenSet[str] = frozenset(
+            {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+        respect_retry_after: bool = True,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.idempotent_methods = idempotent_methods
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry_response(self, response: requests.Response, idempotent: bool) -> bool:
+        if response.status_code not in self.retry_statuses:
+            return False
+        return idempotent or response.status_code in (429, 503)
+
+    def should_retry_error(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        return idempotent and isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number `attempt + 1`"""
+        if response is not None and self.respect_retry_after:
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker - after `failure_threshold` consecutive failures (connection errors,
+    timeouts, 5xx responses) the endpoint fails fast with CircuitOpenError for `reset_timeout` seconds.
+    Then a single trial request is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return True
+            if time.monotonic() - circuit.opened_at < self.reset_timeout or circuit.trial_in_progress:
+                return False
+            # half-open
+            circuit.trial_in_progress = True
+            return True
+
+    def release_trial(self, key: str):
+        """End a half-open trial that neither succeeded nor failed (the request raised something else)"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None:
+                circuit.trial_in_progress = False
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._circuits.pop(key, None)
+
+    def record_failure(self, key: str):
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.failures += 1
+            circuit.trial_in_progress = False
+            if circuit.opened_at is not None or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
+
+    def is_open(self, key: str) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit is not None and circuit.opened_at is not None
+
+
+class HTTPTransport:
+    """
+    Keep-alive HTTP transport shared by the GAME runtime, the GameSDK and the platform clients.
+
+    Wraps a requests.Session whose adapters keep one connection pool per host, so consecutive
+    calls to the same host reuse the TCP/TLS connection instead of handshaking every time.
+    A single transport is safe to share between threads.
+
+    Failed requests are retried according to `retry` (see RetryPolicy) and each endpoint
+    (method + url, or an explicit circuit_key) is guarded by `circuit_breaker`. POST requests that are
+    not marked idempotent - such as the GAME action requests (/actions, /next), which advance the
+    agent - are still retried on connect errors and 429/503 responses, which the server rejected
+    before processing them, but never on other 5xx responses or read timeouts.
+    """
+
+    def __init__(
+        self,
+        # number of per-host connection pools kept alive
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        # maximum number of connections kept alive per host
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        # default timeout - a float or a (connect, read) tuple, None to wait forever
+        timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+        # block instead of opening extra (non-pooled) connections when a pool is exhausted
+        pool_block: bool = False,
+        # retry policy (defaults to RetryPolicy()) - None disables retries
+        retry: Optional[RetryPolicy] = _DEFAULT,
+        # circuit breaker (defaults to a new CircuitBreaker()) - None disables it
+        circuit_breaker: Optional[CircuitBreaker] = _DEFAULT,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retry = RetryPolicy() if retry is _DEFAULT else retry
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is _DEFAULT else circuit_breaker
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        # whether the request is safe to repeat (defaults to the retry policy's idempotent methods)
+        idempotent: Optional[bool] = None,
+        # circuit breaker key (defaults to method + url without query)
+        circuit_key: Optional[str] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request over the pooled session - same arguments as requests.request
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        method = method.upper()
+        retry = self.retry
+        breaker = self.circuit_breaker
+        if idempotent is None:
+            idempotent = retry is not None and method in retry.idempotent_methods
+        if circuit_key is None:
+            circuit_key = f"{method} {url.split('?', 1)[0]}"
+
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow(circuit_key):
+                raise CircuitOpenError(f"Circuit open for {circuit_key} - backend degraded")
+
+            # whether the circuit breaker heard back about this attempt
+            recorded = False
+            try:
+                response = self._session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                recorded = True
+                if breaker is not None:
+                    breaker.record_failure(circuit_key)
+                if retry is None or attempt >= retry.max_retries or not retry.should_retry_error(e, idempotent):
+                    raise
+                delay = retry.backoff(attempt)
+            else:
+                recorded = True
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure(circuit_key)
+                    else:
+                        breaker.record_success(circuit_key)
+                if retry is None or attempt >= retry.max_retries or not retry.should_retry_response(response, idempotent):
+                    return response
+                delay = retry.backoff(attempt, response)
+                response.close()
+            finally:
+                if not recorded and breaker is not None:
+                    # the request raised something else - don't leave a half-open trial pending forever
+                    breaker.release_trial(circuit_key)
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """
+        Close all pooled connections
+        """
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HTTPTransport:
+    """
+    Get the process-wide transport used when none is injected
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+def set_default_transport(transport: HTTPTransport):
+    """
+    Replace the process-wide transport (e.g. to change pool sizes or timeouts globally)
+    """
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -1,10 +1,11 @@
 from typing import List, Any, Dict, Optional, Union, Set
-from dataclasses import dataclass, asdict
-from string import Template
+from dataclasses import dataclass, asdict, field
 import json
 import uuid
 import requests
 from virtuals_sdk.twitter_agent import sdk
+from virtuals_sdk.twitter_agent.template import compile_structure, compile_template, render_structure
+from virtuals_sdk.transport import HTTPTransport, get_default_transport
 
 
 @dataclass
@@ -13,6 +14,8 @@ class FunctionArgument:
     description: str
     type: str
     id: str = None
+    # optional arguments can be left out when calling the function
+    required: bool = True
     
     def __post_init__(self):
         self.id = self.id or str(uuid.uuid4())
@@ -31,14 +34,24 @@ class FunctionConfig:
     headersString: str = "{}"  # Added field
     payloadString: str = "{}"  # Added field
     platform: str = None
+    # query string parameters (templates, like the payload)
+    query_params: Dict = None
 
     def __post_init__(self):
         self.headers = self.headers or {}
         self.payload = self.payload or {}
+        self.query_params = self.query_params or {}
 
         self.headersString = json.dumps(self.headers, indent=4)
         self.payloadString = json.dumps(self.payload, indent=4)
 
+        # parse the templates once - rendering reuses the compiled templates
+        for template in (self.url, self.success_feedback, self.error_feedback):
+            if template:
+                compile_template(template)
+        compile_structure(self.payload)
+        compile_structure(self.query_params)
+
 
 @dataclass
 class Function:
@@ -48,24 +61,32 @@ class Function:
     config: FunctionConfig
     hint: str = ""
     id: str = None
+    # HTTP transport used when the function is called (defaults to the shared pooled transport)
+    transport: Optional[HTTPTransport] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         self.id = self.id or str(uuid.uuid4())
 
     def toJson(self):
+        # required and query_params are only used by local calls - they are not part of the
+        # function config of the platform API (simulate/react/deploy)
         return {
             "id": self.id,
             "fn_name": self.fn_name,
             "fn_description": self.fn_description,
-            "args": [asdict(arg) for arg in self.args],
+            "args": [
+                {k: v for k, v in asdict(arg).items() if k != "required"} for arg in self.args
+            ],
             "hint": self.hint,
-            "config": asdict(self.config)
+            "config": {k: v for k, v in asdict(self.config).items() if k != "query_params"}
         }
 
     def _validate_args(self, *args) -> Dict[str, Any]:
         """Validate and convert positional arguments to named arguments"""
-        if len(args) != len(self.args):
-            raise ValueError(f"Expected {len(self.args)} arguments, got {len(args)}")
+        required = sum(1 for arg in self.args if arg.required)
+        if not required <= len(args) <= len(self.args):
+            expected = len(self.args) if required == len(self.args) else f"{required} to {len(self.args)}"
+            raise ValueError(f"Expected {expected} arguments, got {len(args)}")
 
         # Create dictionary of argument name to value
         arg_dict = {}
@@ -83,10 +104,8 @@ class Function:
         return arg_dict
 
     def _interpolate_template(self, template_str: str, values: Dict[str, Any]) -> str:
-        """Interpolate a template string with given values"""
-        # Convert Template-style placeholders ({{var}}) to Python style ($var)
-        python_style = template_str.replace('{{', '$').replace('}}', '')
-        return Template(python_style).safe_substitute(values)
+        """Interpolate a template string with given values (see virtuals_sdk.twitter_agent.template)"""
+        return compile_template(template_str).render(values)
 
     def _prepare_request(self, arg_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare the request configuration with interpolated values"""
@@ -95,27 +114,19 @@ class Function:
         # Interpolate URL
         url = self._interpolate_template(config.url, arg_dict)
 
-        # Interpolate payload
-        payload = {}
-        for key, value in config.payload.items():
-            if isinstance(value, str):
-                # Handle template values
-                template_key = self._interpolate_template(key, arg_dict)
-                if value.strip('{}') in arg_dict:
-                    # For array and other non-string types, use direct value
-                    payload[template_key] = arg_dict[value.strip('{}')]
-                else:
-                    # For string interpolation
-                    payload[template_key] = self._interpolate_template(value, arg_dict)
-            else:
-                payload[key] = value
+        # Interpolate payload - values that are a single placeholder keep the argument value as is
+        # (e.g. arrays), other strings are interpolated
+        payload = render_structure(config.payload, arg_dict)
 
-        return {
+        request_config = {
             "method": config.method,
             "url": url,
             "headers": config.headers,
             "data": json.dumps(payload)
         }
+        if config.query_params:
+            request_config["params"] = render_structure(config.query_params, arg_dict)
+        return request_config
 
     def __call__(self, *args):
         """Allow the function to be called directly with arguments"""
@@ -126,7 +137,8 @@ class Function:
         request_config = self._prepare_request(arg_dict)
 
         # Make the request
-        response = requests.request(**request_config)
+        transport = self.transport or get_default_transport()
+        response = transport.request(**request_config)
 
         # Handle response
         if response.ok:
@@ -162,9 +174,11 @@ class Agent:
         description: str = "",
         world_info: str = "",
         main_heartbeat: int = 15,
-        reaction_heartbeat: int = 5
+        reaction_heartbeat: int = 5,
+        transport: Optional[HTTPTransport] = None,
+        api_url: Optional[str] = None,
     ):
-        self.game_sdk = sdk.GameSDK(api_key)
+        self.game_sdk = sdk.GameSDK(api_key, transport=transport, api_url=api_url)
         self.goal = goal
         self.description = description
         self.world_info = world_info
@@ -278,17 +292,7 @@ class Agent:
             "description": self.description,
             "worldInfo": self.world_info,
             "functions": self.enabled_functions,
-            "customFunctions": [
-                {
-                    "id": func.id,
-                    "fn_name": func.fn_name,
-                    "fn_description": func.fn_description,
-                    "args": [asdict(arg) for arg in func.args],
-                    "hint": func.hint,
-                    "config": asdict(func.config)
-                }
-                for func in self.custom_functions
-            ]
+            "customFunctions": [func.toJson() for func in self.custom_functions]
         }
         agent_json = json.dumps(export_dict, indent=4)
 
@@ -1,5 +1,6 @@
-from typing import Dict, List
-from virtuals_sdk.twitter_agent.game import Function, FunctionConfig, FunctionArgument
+from typing import Dict, List, Optional
+from virtuals_sdk.twitter_agent.agent import Function, FunctionConfig, FunctionArgument
+from virtuals_sdk.transport import HTTPTransport
 
 
 class DiscordClient:
@@ -13,14 +14,17 @@ class DiscordClient:
         send_message = client.get_function("send_message")
     """
 
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, transport: Optional[HTTPTransport] = None):
         """
         Initialize the Discord client with a bot token.
 
         Args:
             bot_token (str): Your Discord bot token
+            transport (HTTPTransport, optional): Pooled HTTP transport used by the functions
         """
         self.bot_token = bot_token
+        # HTTP transport shared by all functions of this client
+        self.transport = transport
 
         self._functions: Dict[str, Function] = {
             "send_message": self._create_send_message(),
@@ -28,6 +32,8 @@ class DiscordClient:
             "pin_message": self._create_pin_message(),
             "delete_message": self._create_delete_message(),
         }
+        for function in self._functions.values():
+            function.transport = transport
 
     @property
     def available_functions(self) -> List[str]:
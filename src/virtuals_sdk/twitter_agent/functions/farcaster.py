@@ -1,5 +1,6 @@
-from typing import Dict, List
-from virtuals_sdk.twitter_agent.game import Function, FunctionConfig, FunctionArgument
+from typing import Dict, List, Optional
+from virtuals_sdk.twitter_agent.agent import Function, FunctionConfig, FunctionArgument
+from virtuals_sdk.transport import HTTPTransport
 
 class FarcasterClient:
     """
@@ -7,16 +8,19 @@ class FarcasterClient:
     Each function is designed with simple, intuitive arguments for LLM agents.
     """
     
-    def __init__(self, api_key: str, signer_uuid: str):
+    def __init__(self, api_key: str, signer_uuid: str, transport: Optional[HTTPTransport] = None):
         """
         Initialize the Farcaster client.
         
         Args:
             api_key (str): Your Neynar API key
             signer_uuid (str): Default signer UUID for all operations
+            transport (HTTPTransport, optional): Pooled HTTP transport used by the functions
         """
         self.api_key = api_key
         self.signer_uuid = signer_uuid
+        # HTTP transport shared by all functions of this client
+        self.transport = transport
         self.base_url = "https://api.neynar.com/v2"
         self.base_headers = {
             "accept": "application/json",
@@ -47,6 +51,8 @@ class FarcasterClient:
             "search_casts": self._create_search_casts(),
             "search_users": self._create_search_users(),
         }
+        for function in self._functions.values():
+            function.transport = transport
 
     @property
     def available_functions(self) -> List[str]:
@@ -84,7 +90,8 @@ class FarcasterClient:
                 payload={
                     "signer_uuid": self.signer_uuid,
                     "text": "{{text}}",
-                    "embeds": [{"url": "{{embed_url}}"}] if "{{embed_url}}" else []
+                    # left out when no embed_url is given
+                    "embeds": [{"url": "{{embed_url}}"}]
                 },
                 success_feedback="Cast posted successfully. Preview: '{{response.cast.text}}' {{#response.cast.embeds.[0]}}with embedded content from {{response.cast.embeds.[0].url}}{{/response.cast.embeds.[0]}}"
             )
@@ -290,7 +297,7 @@ class FarcasterClient:
             ],
             config=FunctionConfig(
                 method="get",
-                url=f"{self.base_url}/farcaster/cast/{{cast_hash}}/reactions",
+                url=f"{self.base_url}/farcaster/cast/{{{{cast_hash}}}}/reactions",
                 platform="farcaster",
                 headers=self.base_headers,
                 success_feedback="Cast has {{response.reactions.likes}} likes and {{response.reactions.recasts}} recasts. Top engaging users: {{response.reactions.top_likers.[0].username}}, {{response.reactions.top_likers.[1].username}}, {{response.reactions.top_likers.[2].username}}"
@@ -411,7 +418,7 @@ class FarcasterClient:
             ],
             config=FunctionConfig(
                 method="get",
-                url=f"{self.base_url}/farcaster/cast/{{cast_hash}}/reactions",
+                url=f"{self.base_url}/farcaster/cast/{{{{cast_hash}}}}/reactions",
                 platform="farcaster",
                 headers=self.base_headers,
                 success_feedback="Cast has {{response.reactions.likes}} likes and {{response.reactions.recasts}} recasts. Most engaged users: {{response.reactions.top_likers.[0].username}}, {{response.reactions.top_likers.[1].username}}",
@@ -0,0 +1,209 @@
+"""
+Templates of the function configs (url, payload, success/error feedback), compiled once and rendered
+on every call:
+
+- `{{name}}`, dotted paths `{{response.cast.text}}` and indexes `{{response.casts.[0].text}}`
+  (`.length` gives the size of a list)
+- sections `{{#path}}...{{/path}}`, rendered if the value is truthy (once per item for lists, with the
+  item as the innermost context), and inverted sections `{{^path}}...{{/path}}`
+
+Missing values render as empty strings - in payloads, entries that are a single placeholder of a
+missing value are left out (see render_structure).
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Union
+
+
+_TAG = re.compile(r"\{\{\s*([#^/]?)\s*(.*?)\s*\}\}")
+
+_MISSING = object()
+
+# path segments are keys, or indexes of lists
+Path = Tuple[Union[str, int], ...]
+
+
+def _parse_path(name: str) -> Path:
+    if name == ".":
+        return ()
+    segments = []
+    for segment in name.split("."):
+        if segment.startswith("[") and segment.endswith("]"):
+            segment = segment[1:-1]
+            segments.append(int(segment) if segment.lstrip("-").isdigit() else segment)
+        else:
+            segments.append(segment)
+    return tuple(segments)
+
+
+def _get(value: Any, segment: Union[str, int]) -> Any:
+    if isinstance(value, dict):
+        return value.get(segment, _MISSING)
+    if isinstance(value, (list, tuple)):
+        if segment == "length":
+            return len(value)
+        if isinstance(segment, str):
+            if not segment.isdigit():
+                return _MISSING
+            segment = int(segment)
+        return value[segment] if -len(value) <= segment < len(value) else _MISSING
+    if segment == "length" and isinstance(value, str):
+        return len(value)
+    return _MISSING
+
+
+def _resolve(path: Path, contexts: List[Any]) -> Any:
+    if not path:
+        return contexts[-1]
+    # the first segment is looked up from the innermost context outwards
+    for context in reversed(contexts):
+        value = _get(context, path[0])
+        if value is not _MISSING:
+            break
+    else:
+        return _MISSING
+    for segment in path[1:]:
+        value = _get(value, segment)
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _to_text(value: Any) -> str:
+    if value is _MISSING or value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+class _Section:
+    __slots__ = ("path", "inverted", "nodes")
+
+    def __init__(self, path: Path, inverted: bool):
+        self.path = path
+        self.inverted = inverted
+        self.nodes: list = []
+
+
+def _render(nodes: list, contexts: List[Any], out: List[str]):
+    for node in nodes:
+        if node.__class__ is str:
+            out.append(node)
+        elif node.__class__ is tuple:
+            out.append(_to_text(_resolve(node, contexts)))
+        else:
+            value = _resolve(node.path, contexts)
+            truthy = value is not _MISSING and bool(value)
+            if node.inverted:
+                if not truthy:
+                    _render(node.nodes, contexts, out)
+            elif truthy:
+                for item in (value if isinstance(value, (list, tuple)) else (value,)):
+                    contexts.append(item)
+                    _render(node.nodes, contexts, out)
+                    contexts.pop()
+
+
+class Template:
+    """A compiled template - see compile_template"""
+
+    __slots__ = ("source", "_nodes", "_path")
+
+    def __init__(self, source: str):
+        self.source = source
+        root: list = []
+        stack = [(None, root)]
+        position = 0
+        for match in _TAG.finditer(source):
+            if match.start() > position:
+                stack[-1][1].append(source[position:match.start()])
+            position = match.end()
+            kind, name = match.groups()
+            if kind == "/":
+                section = stack[-1][0]
+                if section is None or section.path != _parse_path(name):
+                    raise ValueError(f"Unexpected {match.group(0)} in template: {source}")
+                stack.pop()
+            elif kind:
+                section = _Section(_parse_path(name), inverted=kind == "^")
+                stack[-1][1].append(section)
+                stack.append((section, section.nodes))
+            else:
+                stack[-1][1].append(_parse_path(name))
+        if len(stack) > 1:
+            unclosed = ".".join(map(str, stack[-1][0].path))
+            raise ValueError(f"Unclosed section {unclosed} in template: {source}")
+        if position < len(source):
+            root.append(source[position:])
+
+        self._nodes = root
+        # templates that are a single placeholder render to the raw value (see render_value)
+        self._path = root[0] if len(root) == 1 and root[0].__class__ is tuple else None
+
+    def render(self, values: Dict[str, Any]) -> str:
+        if self._path is not None:
+            return _to_text(_resolve(self._path, [values]))
+        out: List[str] = []
+        _render(self._nodes, [values], out)
+        return "".join(out)
+
+    def render_value(self, values: Dict[str, Any]) -> Any:
+        """Like render, but a template that is a single placeholder gives the value itself (e.g. a list)"""
+        if self._path is not None:
+            value = _resolve(self._path, [values])
+            return "" if value is _MISSING else value
+        return self.render(values)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+@lru_cache(maxsize=4096)
+def compile_template(source: str) -> Template:
+    """Compile a template (cached - each template string is parsed once)"""
+    return Template(source)
+
+
+def _render_structure(value: Any, values: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        template = compile_template(value)
+        if template._path is not None:
+            return _resolve(template._path, [values])
+        return template.render(values)
+    if isinstance(value, dict):
+        rendered = {}
+        for k, v in value.items():
+            v = _render_structure(v, values)
+            if v is not _MISSING:
+                rendered[compile_template(k).render(values) if isinstance(k, str) else k] = v
+        # a container whose templates all resolved to missing values is missing as well
+        return _MISSING if value and not rendered else rendered
+    if isinstance(value, list):
+        rendered = [v for v in (_render_structure(v, values) for v in value) if v is not _MISSING]
+        return _MISSING if value and not rendered else rendered
+    return value
+
+
+def render_structure(value: Any, values: Dict[str, Any]) -> Any:
+    """
+    Render the string keys and values of a (nested) payload. Entries that are a single placeholder
+    of a missing value (e.g. an omitted optional argument) are left out, as are the lists and
+    dicts left empty by that.
+    """
+    rendered = _render_structure(value, values)
+    if rendered is _MISSING:
+        return type(value)()
+    return rendered
+
+
+def compile_structure(value: Any):
+    """Compile the templates of a (nested) payload ahead of rendering"""
+    if isinstance(value, str):
+        compile_template(value)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            if isinstance(k, str):
+                compile_template(k)
+            compile_structure(v)
+    elif isinstance(value, list):
+        for v in value:
+            compile_structure(v)
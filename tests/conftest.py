@@ -0,0 +1,51 @@
+import pytest
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import Function, FunctionResultStatus
+from virtuals_sdk.stub_server import StubGameServer
+from virtuals_sdk.transport import CircuitBreaker, HTTPTransport, RetryPolicy
+
+
+@pytest.fixture
+def stub():
+    with StubGameServer() as server:
+        yield server
+
+
+@pytest.fixture
+def transport():
+    # short backoff so that retries don't slow the tests down
+    transport = HTTPTransport(
+        retry=RetryPolicy(max_retries=3, backoff_factor=0.001, jitter=False),
+        circuit_breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2),
+    )
+    yield transport
+    transport.close()
+
+
+def _requests_to(stub: StubGameServer, path: str, route: str = None) -> list:
+    return [
+        (method, request_path, body) for method, request_path, body in stub.requests
+        if request_path == path and (route is None or body["data"]["route"] == route)
+    ]
+
+
+@pytest.fixture
+def requests_to():
+    """Requests a stub received for a path (and GAME route, for /prompts)"""
+    return _requests_to
+
+
+def noop_function(name: str = "noop") -> Function:
+    return Function(fn_name=name, fn_description="does nothing", args=[],
+                    executable=lambda: (FunctionResultStatus.DONE, "ok", {}))
+
+
+@pytest.fixture
+def make_agent(stub):
+    """Builds agents with one worker against the stub (which calls the first function on every step)"""
+    def make(name: str = "agent", functions=None, worker_state_fn=None, **kwargs) -> Agent:
+        worker = WorkerConfig("worker", "worker", worker_state_fn or (lambda result, state: {}),
+                              functions or [noop_function()])
+        return Agent("key", name, "goal", "description", lambda result, state: {}, [worker],
+                     base_url=stub.base_url, **kwargs)
+    return make
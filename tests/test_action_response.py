@@ -0,0 +1,79 @@
+import dataclasses
+import pickle
+import pytest
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import (
+    ActionResponse, ActionType, AgentStateResponse, CurrentTaskResponse, HLPResponse,
+)
+from virtuals_sdk.stub_server import StubGameServer, action_response
+
+from conftest import noop_function
+
+
+def test_agent_state_is_decoded_on_access():
+    response = ActionResponse.model_validate(
+        action_response("call_function", fn_name="take", args={"object": "apple"}, task="fruits"))
+
+    assert response.action_type == ActionType.CALL_FUNCTION
+    assert isinstance(response.agent_state.hlp, HLPResponse)
+    assert response.agent_state.hlp.plan == ["fruits"]
+    assert response.agent_state.current_task == CurrentTaskResponse(task="fruits", task_reasoning="")
+    assert response.agent_state.current_task.llp is None
+
+
+def test_invalid_agent_state_fails_on_access():
+    data = action_response("wait")
+    del data["agent_state"]["hlp"]["plan_id"]
+
+    # only the top level is validated up front
+    response = ActionResponse.model_validate(data)
+    with pytest.raises(ValueError):
+        response.agent_state.hlp
+
+    with pytest.raises(ValueError):
+        ActionResponse.model_validate({"action_type": "wait", "agent_state": "not a state"})
+
+
+def test_scalar_fields_are_type_checked():
+    data = action_response("wait")
+    data["agent_state"]["current_task"]["task"] = 42
+    response = ActionResponse.model_validate(data)
+
+    with pytest.raises(ValueError, match="'task' must be str"):
+        response.agent_state.current_task
+    with pytest.raises(ValueError, match="'plan' must be"):
+        HLPResponse.from_dict({**action_response("wait")["agent_state"]["hlp"], "plan": "not a list"})
+
+
+def test_records_are_frozen_dataclasses():
+    state = AgentStateResponse.from_dict(action_response("wait")["agent_state"])
+
+    assert dataclasses.is_dataclass(state) and dataclasses.is_dataclass(state.hlp)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        state.hlp = None
+    assert dataclasses.replace(state.current_task, task="other").task == "other"
+
+
+def test_records_are_immutable_and_round_trip():
+    data = action_response("wait", change_indicator="next_step")
+    response = ActionResponse.model_validate(data)
+
+    with pytest.raises(AttributeError):
+        response.agent_state.hlp.plan_id = "other"
+    assert response.model_dump(mode="json") == {**data, "action_args": None}
+    assert pickle.loads(pickle.dumps(response.agent_state)) == response.agent_state
+    assert AgentStateResponse() == AgentStateResponse(hlp=None, current_task=None)
+
+
+def test_agent_steps_on_new_tasks():
+    script = [action_response("call_function", fn_name="noop", change_indicator="next_step"),
+              action_response("wait")]
+    with StubGameServer(script=script) as stub:
+        worker = WorkerConfig("worker", "worker", lambda result, state: {}, [noop_function()])
+        agent = Agent("key", "agent", "goal", "description", lambda result, state: {}, [worker],
+                      base_url=stub.base_url)
+        agent.compile()
+        agent.step()
+        agent.step()
+
+    assert agent._session.function_result.feedback_message == "ok"
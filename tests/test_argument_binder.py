@@ -0,0 +1,111 @@
+import pytest
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import Argument, ArgumentBinder, ArgumentError, Function, FunctionResultStatus
+
+
+def echo(**kwargs):
+    return FunctionResultStatus.DONE, "ok", kwargs
+
+
+def make_function(args, executable=echo):
+    return Function(fn_name="fn", fn_description="test function", args=args, executable=executable)
+
+
+def test_primitive_types_are_coerced():
+    function = make_function([
+        Argument(name="count", description="", type="integer"),
+        Argument(name="ratio", description="", type="number"),
+        Argument(name="enabled", description="", type="boolean"),
+        Argument(name="tags", description="", type="array"),
+        Argument(name="options", description="", type="object"),
+    ])
+
+    result = function.execute(fn_id="1", args={
+        "count": {"value": "3"},
+        "ratio": {"value": "0.5"},
+        "enabled": {"value": "true"},
+        "tags": {"value": '["a", "b"]'},
+        "options": {"value": '{"x": 1}'},
+    })
+
+    assert result.action_status == FunctionResultStatus.DONE
+    assert result.info == {"count": 3, "ratio": 0.5, "enabled": True, "tags": ["a", "b"], "options": {"x": 1}}
+
+
+def test_type_lists_accept_any_of_their_types():
+    binder = ArgumentBinder([Argument(name="limit", description="", type=["integer", "string"])], echo)
+
+    assert binder.bind({"limit": "10"}) == {"limit": 10}
+    assert binder.bind({"limit": "all"}) == {"limit": "all"}
+
+
+def test_descriptive_types_accept_any_value():
+    binder = ArgumentBinder([Argument(name="tweet_id", description="", type="tweet id")], echo)
+
+    assert binder.bind({"tweet_id": {"value": 42}}) == {"tweet_id": 42}
+
+
+@pytest.mark.parametrize("args, message", [
+    ({}, "Missing required argument 'count'"),
+    ({"count": None}, "Missing required argument 'count'"),
+    ({"count": ""}, "must be of type integer"),
+    ({"count": "many"}, "must be of type integer"),
+    ({"count": "1", "other": "x"}, "Unexpected argument 'other'"),
+])
+def test_invalid_arguments_are_rejected(args, message):
+    binder = ArgumentBinder([Argument(name="count", description="", type="integer")], lambda count: None)
+
+    with pytest.raises(ArgumentError, match=message):
+        binder.bind(args)
+
+
+def test_invalid_arguments_fail_without_running_the_executable():
+    calls = []
+    function = make_function(
+        [Argument(name="count", description="", type="integer")],
+        lambda count: calls.append(count) or (FunctionResultStatus.DONE, "ok", {}),
+    )
+
+    result = function.execute(fn_id="1", args={"count": {"value": "many"}})
+
+    assert result.action_status == FunctionResultStatus.FAILED
+    assert "Invalid arguments for fn" in result.feedback_message
+    assert calls == []
+
+
+def test_empty_optional_arguments_are_left_out():
+    def search(query, limit=10):
+        return FunctionResultStatus.DONE, "ok", {"query": query, "limit": limit}
+
+    function = make_function([
+        Argument(name="query", description="", type="string"),
+        Argument(name="limit", description="", type="integer", optional=True),
+    ], search)
+
+    result = function.execute(fn_id="1", args={"query": {"value": "game"}, "limit": {"value": ""}})
+
+    assert result.info == {"query": "game", "limit": 10}
+
+
+def test_executable_defaults_make_arguments_optional():
+    binder = ArgumentBinder([Argument(name="limit", description="", type="integer")], lambda limit=5: None)
+
+    assert binder.bind({}) == {}
+
+
+def test_stub_actions_bind_to_typed_arguments(stub):
+    noop = make_function([
+        Argument(name="text", description="", type="string"),
+        Argument(name="count", description="", type="integer"),
+        Argument(name="tags", description="", type="array"),
+        Argument(name="reply_to", description="", type="string", optional=True),
+    ])
+    agent = Agent("key", "agent", "goal", "description", lambda result, state: {},
+                  [WorkerConfig("worker", "worker", lambda result, state: {}, [noop])],
+                  base_url=stub.base_url)
+    agent.compile()
+
+    event = agent.step()
+
+    assert event.result.action_status == FunctionResultStatus.DONE
+    assert event.result.info == {"text": "", "count": 0, "tags": []}
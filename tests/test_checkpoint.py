@@ -0,0 +1,78 @@
+import pytest
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+
+from conftest import noop_function
+
+
+def counting_state(result, state):
+    return {"count": state.get("count", 0) + 1 if state else 0}
+
+
+def test_checkpoint_round_trip(make_agent, tmp_path):
+    path = str(tmp_path / "agent.json.gz")
+    agent = make_agent(worker_state_fn=counting_state)
+    agent.compile()
+    for _ in range(3):
+        agent.step()
+    agent.checkpoint(path)
+
+    restored = make_agent(worker_state_fn=counting_state, checkpoint_path=path)
+
+    assert restored.agent_id == agent.agent_id
+    assert restored.worker_states == agent.worker_states
+    assert restored.worker_states["worker"]["count"] == 3
+    assert restored._session.id == agent._session.id
+    assert restored._session.function_result == agent._session.function_result
+    assert restored._steps == 3
+
+
+def test_restored_agent_resumes_without_creating_remote_instances(make_agent, stub, requests_to, tmp_path):
+    path = str(tmp_path / "agent.json")
+    agent = make_agent(checkpoint_path=path, checkpoint_every=2)
+    agent.compile()
+    agent.step()
+    agent.step()
+
+    restored = make_agent(checkpoint_path=path)
+    assert restored.compile() == agent._map_id
+    restored.step()
+
+    assert len(requests_to(stub, "/prompts", route="/v2/agents")) == 1
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 1
+    assert restored._steps == 3
+
+
+def test_changed_workers_get_a_new_map(make_agent, stub, requests_to, tmp_path):
+    path = str(tmp_path / "agent.json")
+    agent = make_agent()
+    agent.compile()
+    agent.checkpoint(path)
+
+    worker = WorkerConfig("worker", "a different worker", lambda result, state: {}, [noop_function()])
+    restored = Agent("key", "agent", "goal", "description", lambda result, state: {}, [worker],
+                     base_url=stub.base_url, checkpoint_path=path)
+
+    assert restored.agent_id == agent.agent_id
+    assert restored.compile() != agent._map_id
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 2
+
+
+def test_checkpoint_requires_a_path(make_agent):
+    with pytest.raises(ValueError):
+        make_agent().checkpoint()
+    with pytest.raises(ValueError):
+        make_agent(checkpoint_every=5)
+
+
+def test_values_that_cannot_be_restored_fail_loudly(make_agent, tmp_path):
+    path = tmp_path / "agent.json"
+    agent = make_agent(worker_state_fn=lambda result, state: {"seen": {"a"}})
+    agent.compile()
+
+    with pytest.raises(TypeError, match=r"\['worker'\]\['seen'\]: set"):
+        agent.checkpoint(str(path))
+    assert not path.exists()
+
+    agent.worker_states = {"worker": {1: "one"}}
+    with pytest.raises(TypeError, match="key 1"):
+        agent.checkpoint(str(path))
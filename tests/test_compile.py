@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.async_agent import AsyncAgent
+
+from conftest import noop_function
+
+
+class StateFunctions:
+    """Initial state functions recording which workers they were called for"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, worker_id: str):
+        def get_state(result, state):
+            with self._lock:
+                self.calls.append(worker_id)
+            time.sleep(self.delay)
+            return {"worker": worker_id}
+        return get_state
+
+
+def worker_config(states: StateFunctions, worker_id: str, description: str = None) -> WorkerConfig:
+    return WorkerConfig(worker_id, description or f"{worker_id} worker", states(worker_id), [noop_function()])
+
+
+def make_agent(stub, states, worker_ids, agent_class=Agent) -> Agent:
+    return agent_class("key", "agent", "goal", "description", lambda result, state: {},
+                       [worker_config(states, worker_id) for worker_id in worker_ids], base_url=stub.base_url)
+
+
+def test_worker_states_are_computed_concurrently(stub):
+    states = StateFunctions(delay=0.2)
+    agent = make_agent(stub, states, [f"worker-{i}" for i in range(4)])
+
+    started = time.monotonic()
+    agent.compile()
+
+    assert time.monotonic() - started < 0.6
+    assert sorted(states.calls) == sorted(agent.workers)
+    assert agent.worker_states["worker-2"]["worker"] == "worker-2"
+
+
+def test_compiling_again_without_changes_is_free(stub, requests_to):
+    states = StateFunctions()
+    agent = make_agent(stub, states, ["a", "b"])
+    map_id = agent.compile()
+
+    assert agent.compile() == map_id
+    assert states.calls.count("a") == 1
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 1
+
+
+def test_recompile_only_updates_changed_workers(stub, requests_to):
+    states = StateFunctions()
+    agent = make_agent(stub, states, ["a", "b", "c"])
+    first_map_id = agent.compile()
+    states.calls.clear()
+
+    agent.add_worker(worker_config(states, "d"))
+    agent.add_worker(worker_config(states, "b", description="new b worker"))
+    agent.remove_worker("c")
+    map_id = agent.compile()
+
+    assert map_id != first_map_id
+    assert sorted(states.calls) == ["b", "d"]
+    assert sorted(agent.worker_states) == ["a", "b", "d"]
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 2
+
+
+def test_async_agent_compiles_incrementally(stub, requests_to):
+    states = StateFunctions()
+    agent = make_agent(stub, states, ["a", "b"], agent_class=AsyncAgent)
+
+    async def compile_twice():
+        await agent.compile()
+        agent.add_worker(worker_config(states, "c"))
+        return await agent.compile()
+
+    asyncio.run(compile_twice())
+
+    assert sorted(states.calls) == ["a", "b", "c"]
+    assert sorted(agent.worker_states) == ["a", "b", "c"]
+    assert len(requests_to(stub, "/prompts", route="/v2/agents")) == 1
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 2
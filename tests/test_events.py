@@ -0,0 +1,53 @@
+import pytest
+from virtuals_sdk.game.events import EventQueue
+
+
+def sent_events(stub, requests_to, agent) -> list:
+    requests = requests_to(stub, "/prompts", route=f"/v2/agents/{agent.agent_id}/actions")
+    return [body["data"]["data"]["events"] for _, _, body in requests]
+
+
+def test_events_with_the_same_key_are_coalesced(make_agent, stub, requests_to):
+    agent = make_agent()
+    agent.compile()
+    agent.push_event("price", 1)
+    agent.push_event("mention", "hi")
+    agent.push_event("price", 2)
+    agent.step()
+    agent.step()
+
+    assert sent_events(stub, requests_to, agent) == [{"price": 2, "mention": "hi"}, {}]
+
+
+def test_custom_coalesce():
+    events = EventQueue(coalesce=lambda pending, new: pending + new)
+    events.put("mentions", ["a"])
+    events.put("mentions", ["b"])
+
+    assert events.drain() == {"mentions": ["a", "b"]}
+
+
+def test_events_are_requeued_when_the_step_fails(make_agent, stub, requests_to):
+    agent = make_agent()
+    agent.compile()
+    agent.push_event("price", 1)
+    stub.fail_next(1, status=500)
+
+    with pytest.raises(Exception):
+        agent.step()
+    agent.push_event("price", 2)
+    agent.step()
+
+    assert sent_events(stub, requests_to, agent) == [{"price": 1}, {"price": 2}]
+
+
+def test_full_queue_rejects_new_keys():
+    events = EventQueue(maxsize=1, batch_size=1)
+    assert events.put("a", 1)
+    assert not events.put("b", 1, block=False)
+    assert not events.put("b", 1, timeout=0.01)
+    # pending keys are still coalesced
+    assert events.put("a", 2, block=False)
+
+    assert events.drain() == {"a": 2}
+    assert events.put("b", 1, block=False)
@@ -0,0 +1,102 @@
+import time
+import pytest
+from virtuals_sdk.game.async_agent import AsyncAgent
+from virtuals_sdk.game.fleet import Fleet
+
+
+def record_steps(agent, order: list):
+    step = agent.step
+
+    def recording_step():
+        order.append(agent.name)
+        return step()
+
+    agent.step = recording_step
+    return agent
+
+
+def test_agents_step_until_their_budget_is_used(make_agent, stub, requests_to):
+    fleet = Fleet(max_workers=4)
+    for i in range(3):
+        fleet.add(make_agent(f"agent-{i}"), max_steps=4)
+
+    stats = fleet.run(timeout=30)
+
+    assert stats.steps == 12
+    assert {name: s.steps for name, s in stats.agents.items()} == {"agent-0": 4, "agent-1": 4, "agent-2": 4}
+    # agents are compiled when first scheduled
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 3
+
+
+def test_higher_priority_agents_get_more_steps(make_agent):
+    order = []
+    fleet = Fleet(max_workers=1)
+    fleet.add(record_steps(make_agent("urgent"), order), priority=3, max_steps=10)
+    fleet.add(record_steps(make_agent("background"), order), priority=0, max_steps=10)
+
+    fleet.run(timeout=30)
+
+    assert len(order) == 20
+    assert order[:10].count("urgent") >= 7
+
+
+def failing_step():
+    raise RuntimeError("step failed")
+
+
+def test_failing_agent_stops_after_its_first_error(make_agent):
+    fleet = Fleet(max_workers=2)
+    fleet.add(make_agent("healthy"), max_steps=3)
+    failing = make_agent("failing")
+    failing.step = failing_step
+    fleet.add(failing, max_steps=3)
+
+    stats = fleet.run(timeout=30)
+
+    assert stats.agents["healthy"].steps == 3
+    assert (stats.agents["failing"].steps, stats.agents["failing"].errors) == (0, 1)
+    assert isinstance(stats.agents["failing"].last_error, RuntimeError)
+
+
+def test_failing_agent_that_keeps_going_backs_off(make_agent):
+    fleet = Fleet(max_workers=2, error_backoff=0.05, max_error_backoff=0.2)
+    failing = make_agent("failing")
+    failing.step = failing_step
+    fleet.add(failing, stop_on_error=False)
+    fleet.start()
+
+    time.sleep(0.5)
+    fleet.remove("failing")
+    fleet.stop()
+    stats = fleet.stats()
+
+    # 0.05 + 0.1 + 0.2 + 0.2 ... between the attempts instead of a busy loop
+    assert 2 <= stats.errors <= 5
+
+
+def test_removed_agents_keep_counting_towards_the_totals(make_agent):
+    fleet = Fleet(max_workers=2)
+    fleet.add(make_agent("kept"), max_steps=2)
+    fleet.add(make_agent("removed"), max_steps=3)
+    fleet.run(timeout=30)
+
+    fleet.remove("removed")
+    stats = fleet.stats()
+
+    assert list(stats.agents) == ["kept"]
+    assert (stats.steps, stats.removed.steps) == (5, 3)
+
+
+def test_async_agents_are_rejected(stub):
+    agent = AsyncAgent("key", "agent", "goal", "description", lambda result, state: {}, base_url=stub.base_url)
+
+    with pytest.raises(ValueError, match="AsyncAgent"):
+        Fleet().add(agent)
+
+
+def test_agent_names_are_unique(make_agent):
+    fleet = Fleet()
+    fleet.add(make_agent("agent"))
+
+    with pytest.raises(ValueError, match="already in fleet"):
+        fleet.add(make_agent("agent"))
@@ -0,0 +1,105 @@
+import time
+import pytest
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import Argument, Function, FunctionResultStatus
+from virtuals_sdk.game.function_cache import FUNCTION_CACHE, FunctionCache
+from virtuals_sdk.stub_server import StubGameServer, action_response
+
+
+class Counter:
+    def __init__(self, status=FunctionResultStatus.DONE):
+        self.calls = 0
+        self.status = status
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        return self.status, f"call {self.calls}", dict(kwargs)
+
+
+def lookup_function(executable, **kwargs) -> Function:
+    return Function(fn_name="lookup", fn_description="read-only lookup",
+                    args=[Argument(name="key", type="string", description="key to look up")],
+                    executable=executable, **kwargs)
+
+
+def call(function, **args):
+    return function.execute(fn_id="fn", args={name: {"value": value} for name, value in args.items()})
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    FUNCTION_CACHE.clear()
+    yield
+    FUNCTION_CACHE.clear()
+
+
+def test_repeat_calls_are_served_from_the_cache():
+    counter = Counter()
+    function = lookup_function(counter, cache_ttl=60)
+
+    first = call(function, key="a")
+    second = call(function, key="a")
+    other = call(function, key="b")
+
+    assert counter.calls == 2
+    assert second.feedback_message == first.feedback_message == "call 1"
+    assert second.info == {"key": "a"}
+    assert other.feedback_message == "call 2"
+
+
+def test_expired_and_failed_results_are_not_reused():
+    counter = Counter()
+    function = lookup_function(counter, cache_ttl=0.05)
+    call(function, key="a")
+    time.sleep(0.1)
+    call(function, key="a")
+    assert counter.calls == 2
+
+    failing = Counter(FunctionResultStatus.FAILED)
+    function = lookup_function(failing, cache_ttl=60)
+    call(function, key="a")
+    call(function, key="a")
+    assert failing.calls == 2
+
+
+def test_functions_without_ttl_are_not_cached():
+    counter = Counter()
+    function = lookup_function(counter)
+    call(function, key="a")
+    call(function, key="a")
+
+    assert counter.calls == 2
+    assert len(FUNCTION_CACHE) == 0
+
+
+def test_functions_with_side_effects_invalidate_the_cache():
+    lookups = Counter()
+    functions = [
+        lookup_function(lookups, cache_ttl=60),
+        Function(fn_name="write", fn_description="changes the data", args=[],
+                 executable=lambda: (FunctionResultStatus.DONE, "written", {})),
+    ]
+    lookup = action_response("call_function", fn_name="lookup", args={"key": "a"})
+    script = [lookup, lookup, action_response("call_function", fn_name="write"), lookup]
+
+    with StubGameServer(script=script) as stub:
+        worker = WorkerConfig("worker", "worker", lambda result, state: {}, functions)
+        agent = Agent("key", "agent", "goal", "description", lambda result, state: {}, [worker],
+                      base_url=stub.base_url)
+        agent.compile()
+        for _ in range(4):
+            agent.step()
+
+    assert lookups.calls == 2
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = FunctionCache(maxsize=2)
+    cache.put("f", "a", 1, ttl=60)
+    cache.put("f", "b", 2, ttl=60)
+    cache.get("f", "a")
+    cache.put("f", "c", 3, ttl=60)
+
+    assert (cache.get("f", "a"), cache.get("f", "b"), cache.get("f", "c")) == (1, None, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.invalidate("f") == 2
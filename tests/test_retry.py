@@ -0,0 +1,117 @@
+import time
+import pytest
+from virtuals_sdk.game import utils
+from virtuals_sdk.transport import CircuitOpenError, HTTPTransport, RetryPolicy
+
+
+def post(stub, transport, idempotent=False):
+    return utils.post(stub.base_url, "key", "/v2/agents", {"name": "a"}, transport=transport, idempotent=idempotent)
+
+
+def test_unprocessed_requests_are_retried(stub, transport, requests_to):
+    stub.fail_next(2, status=503)
+
+    assert post(stub, transport)["id"]
+    assert len(requests_to(stub, "/prompts")) == 3
+
+
+def test_server_errors_are_not_retried_for_non_idempotent_requests(stub, transport, requests_to):
+    stub.fail_next(status=500)
+
+    with pytest.raises(ValueError, match="Failed to post data"):
+        post(stub, transport)
+    assert len(requests_to(stub, "/prompts")) == 1
+
+
+def test_server_errors_are_retried_for_idempotent_requests(stub, transport, requests_to):
+    stub.fail_next(status=500)
+
+    assert post(stub, transport, idempotent=True)["id"]
+    assert len(requests_to(stub, "/prompts")) == 2
+
+
+def test_retries_give_up_after_max_retries(stub, requests_to):
+    transport = HTTPTransport(retry=RetryPolicy(max_retries=3, backoff_factor=0.001), circuit_breaker=None)
+    stub.fail_next(10, status=503)
+
+    with pytest.raises(ValueError):
+        post(stub, transport)
+    # first attempt and 3 retries
+    assert len(requests_to(stub, "/prompts")) == 4
+
+
+def test_open_circuit_stops_retries(stub, transport, requests_to):
+    stub.fail_next(10, status=503)
+
+    with pytest.raises(CircuitOpenError):
+        post(stub, transport)
+    assert len(requests_to(stub, "/prompts")) == 3
+
+
+def test_action_requests_are_not_retried(make_agent, stub, transport, requests_to):
+    agent = make_agent(transport=transport)
+    agent.compile()
+    stub.fail_next(status=500)
+
+    with pytest.raises(ValueError):
+        agent.step()
+    assert len(requests_to(stub, "/prompts", route=f"/v2/agents/{agent.agent_id}/actions")) == 1
+    # the next step goes through
+    agent.step()
+    assert len(requests_to(stub, "/prompts", route=f"/v2/agents/{agent.agent_id}/actions")) == 2
+
+
+def test_circuit_opens_after_consecutive_failures(stub, transport, requests_to):
+    stub.fail_next(3, status=500)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            post(stub, transport)
+
+    # fails fast without reaching the server
+    with pytest.raises(CircuitOpenError):
+        post(stub, transport)
+    assert len(requests_to(stub, "/prompts")) == 3
+
+
+def test_successful_trial_closes_the_circuit(stub, transport):
+    stub.fail_next(3, status=500)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            post(stub, transport)
+
+    time.sleep(0.25)
+    assert post(stub, transport)["id"]
+    assert not transport.circuit_breaker.is_open(f"POST {stub.base_url}/v2/agents")
+    assert post(stub, transport)["id"]
+
+
+def test_failed_trial_opens_the_circuit_again(stub, transport):
+    stub.fail_next(4, status=500)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            post(stub, transport)
+
+    time.sleep(0.25)
+    with pytest.raises(ValueError):
+        post(stub, transport)
+    with pytest.raises(CircuitOpenError):
+        post(stub, transport)
+
+
+def test_trial_that_raises_unexpectedly_is_released(stub, transport, monkeypatch):
+    stub.fail_next(3, status=500)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            post(stub, transport)
+    time.sleep(0.25)
+
+    def broken_request(*args, **kwargs):
+        raise RuntimeError("broken")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(transport._session, "request", broken_request)
+        with pytest.raises(RuntimeError):
+            post(stub, transport)
+
+    # the next request is let through as the trial
+    assert post(stub, transport)["id"]
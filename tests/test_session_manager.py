@@ -0,0 +1,110 @@
+import threading
+import time
+import pytest
+from virtuals_sdk.game.session_manager import SessionManager
+
+
+def counting_state(result, state):
+    return {"count": state.get("count", 0) + 1 if state else 0}
+
+
+@pytest.fixture
+def agent(make_agent):
+    agent = make_agent(worker_state_fn=counting_state)
+    agent.compile()
+    return agent
+
+
+def test_sessions_are_independent(agent, tmp_path):
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path))
+    sessions.step("a")
+    sessions.step("a")
+    sessions.step("b")
+
+    assert sessions.session("a").worker_states["worker"]["count"] == 2
+    assert sessions.session("b").worker_states["worker"]["count"] == 1
+    assert sessions.session("a")._session.id == "a"
+    # views share the remote instances of the agent
+    assert sessions.session("b")._map_id == agent._map_id
+
+
+def test_sessions_beyond_max_sessions_are_evicted_and_restored(agent, stub, requests_to, tmp_path):
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path), max_sessions=2)
+    for session_id in ["a", "b", "c"]:
+        sessions.step(session_id)
+    sessions.step("a")
+
+    assert sessions.active_sessions() == ["c", "a"]
+    assert "b" in sessions
+
+    sessions.step("b")
+
+    assert sessions.session("b").worker_states["worker"]["count"] == 2
+    assert sessions.session("a").worker_states["worker"]["count"] == 2
+    # restoring a session doesn't create remote instances
+    assert len(requests_to(stub, "/prompts", route="/v2/agents")) == 1
+    assert len(requests_to(stub, "/prompts", route="/v2/maps")) == 1
+
+
+def test_idle_sessions_are_evicted(agent, tmp_path):
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path), idle_timeout=0.05)
+    sessions.session("a")
+    time.sleep(0.1)
+
+    assert sessions.evict_idle() == 1
+    assert sessions.active_sessions() == []
+    assert "a" in sessions
+
+
+def test_closed_sessions_start_over(agent, tmp_path):
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path), idle_timeout=None)
+    sessions.step("a")
+    sessions.evict("a")
+    sessions.close("a")
+
+    assert "a" not in sessions
+    assert sessions.session("a").worker_states["worker"]["count"] == 0
+
+
+def test_loading_a_session_does_not_block_other_sessions(make_agent, tmp_path):
+    entered = threading.Event()
+    release = threading.Event()
+    loads = []
+    armed = threading.Event()
+
+    def slow_state(result, state):
+        # the initial worker state of the first session is slow to compute
+        if armed.is_set():
+            loads.append(threading.current_thread().name)
+            if len(loads) == 1:
+                entered.set()
+                release.wait(5)
+        return {}
+
+    agent = make_agent(worker_state_fn=slow_state)
+    agent.compile()
+    armed.set()
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path))
+
+    slow = [threading.Thread(target=sessions.session, args=("slow",), name=f"slow-{i}") for i in range(2)]
+    slow[0].start()
+    assert entered.wait(5)
+    slow[1].start()
+    other = threading.Thread(target=sessions.step, args=("other",))
+    other.start()
+    other.join(5)
+
+    assert not other.is_alive()
+    assert not sessions.evict("slow")
+    release.set()
+    for thread in slow:
+        thread.join(5)
+
+    # the slow session was loaded once, for both of its callers
+    assert len([name for name in loads if name.startswith("slow")]) == 1
+    assert sorted(sessions.active_sessions()) == ["other", "slow"]
+
+
+def test_agent_must_be_compiled(make_agent, tmp_path):
+    with pytest.raises(ValueError):
+        SessionManager(make_agent(), sessions_dir=str(tmp_path))
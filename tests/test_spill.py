@@ -0,0 +1,122 @@
+import asyncio
+import os
+import pytest
+from virtuals_sdk.game.async_worker import AsyncWorker
+from virtuals_sdk.game.custom_types import Function, FunctionResultStatus
+from virtuals_sdk.game.session_manager import SessionManager
+from virtuals_sdk.game.spill import SpillStore, is_spilled
+from virtuals_sdk.game.worker import Worker
+
+DOCUMENT = "x" * 1000
+
+
+def fetch_function() -> Function:
+    return Function(fn_name="fetch", fn_description="fetches a document", args=[],
+                    executable=lambda: (FunctionResultStatus.DONE, "ok", {"document": DOCUMENT, "length": 1000}))
+
+
+class LoadingState:
+    """State function loading the spilled document"""
+
+    def __init__(self):
+        self.documents = []
+
+    def __call__(self, result, state):
+        document = (result.info or {}).get("document") if result else None
+        if is_spilled(document):
+            self.documents.append(document.load())
+        return {}
+
+
+def blob_count(store: SpillStore) -> int:
+    return sum(len(files) for _, _, files in os.walk(store.directory))
+
+
+def test_large_info_values_are_spilled_and_loaded_on_demand(make_agent, tmp_path):
+    store = SpillStore(str(tmp_path), threshold=100)
+    states = LoadingState()
+    agent = make_agent(functions=[fetch_function()], worker_state_fn=states, spill_store=store)
+    agent.compile()
+    agent.step()
+
+    info = agent._session.function_result.info
+    assert is_spilled(info["document"]) and info["length"] == 1000
+    assert states.documents == [DOCUMENT]
+    assert store.load(info["document"]) == DOCUMENT
+    assert blob_count(store) == 1
+
+
+def test_spilled_values_are_released_with_the_session(make_agent, tmp_path):
+    store = SpillStore(str(tmp_path), threshold=100)
+    agent = make_agent(functions=[fetch_function()], spill_store=store)
+    agent.compile()
+    agent.step()
+    document = agent._session.function_result.info["document"]
+
+    agent.reset()
+
+    assert blob_count(store) == 0
+    with pytest.raises(ValueError):
+        document.load()
+
+
+def test_closed_sessions_release_their_spilled_values(make_agent, tmp_path):
+    store = SpillStore(str(tmp_path / "spill"), threshold=100)
+    agent = make_agent(functions=[fetch_function()], spill_store=store)
+    agent.compile()
+    sessions = SessionManager(agent, sessions_dir=str(tmp_path / "sessions"))
+    sessions.step("a")
+    sessions.step("b")
+    assert blob_count(store) == 2
+
+    sessions.close("a")
+
+    assert blob_count(store) == 1
+
+
+def test_worker_releases_spilled_values_on_reset(stub, tmp_path):
+    store = SpillStore(str(tmp_path), threshold=100)
+    worker = Worker("key", "worker", lambda result, state: {}, [fetch_function()],
+                    base_url=stub.base_url, spill_store=store)
+    worker.run("task")
+    assert blob_count(store) == 1
+
+    worker.reset()
+
+    assert blob_count(store) == 0
+
+
+def test_small_values_and_invalid_keys():
+    store = SpillStore(threshold=100)
+    info = {"small": "x", "number": 10 ** 100}
+    assert store.spill(info, "owner") == 0
+    assert info == {"small": "x", "number": 10 ** 100}
+
+    with pytest.raises(ValueError):
+        store.load({"$spilled": "../../etc/passwd"})
+
+
+def test_submitted_tasks_release_their_spilled_values(stub, tmp_path):
+    store = SpillStore(str(tmp_path), threshold=100)
+    worker = Worker("key", "worker", lambda result, state: {}, [fetch_function()],
+                    base_url=stub.base_url, spill_store=store)
+
+    results = worker.run_many(["first task", "second task"])
+    worker.shutdown()
+
+    assert blob_count(store) == 0
+    assert [result.info["document"] for result in results] == [DOCUMENT, DOCUMENT]
+
+
+def test_async_submitted_tasks_release_their_spilled_values(stub, tmp_path):
+    store = SpillStore(str(tmp_path), threshold=100)
+    worker = AsyncWorker("key", "worker", lambda result, state: {}, [fetch_function()],
+                         base_url=stub.base_url, spill_store=store)
+
+    async def run():
+        return await (await worker.submit("task"))
+
+    result = asyncio.run(run())
+
+    assert blob_count(store) == 0
+    assert result.info["document"] == DOCUMENT
@@ -0,0 +1,52 @@
+from virtuals_sdk.game.state_budget import (
+    KeyCaps, OldestFirst, StateBudget, TruncateLists, TruncateStrings, state_size,
+)
+
+
+def growing_state(result, state):
+    history = list(state.get("history", [])) if state else []
+    history.append("x" * 20)
+    return {"history": history}
+
+
+def test_lists_keep_their_newest_entries():
+    budget = StateBudget(max_items=2)
+    state = {"history": [1, 2, 3], "nested": {"items": [4, 5, 6]}}
+
+    assert budget.apply(state) == {"history": [2, 3], "nested": {"items": [5, 6]}}
+    # policies don't modify the state they are given
+    assert state["history"] == [1, 2, 3]
+
+
+def test_oldest_entries_are_dropped_until_the_state_fits():
+    state = {"small": [1, 2], "large": ["a" * 10] * 10}
+    budget = StateBudget(max_bytes=80, policies=[OldestFirst()])
+
+    bounded = budget.apply(state)
+
+    assert state_size(bounded) <= 80
+    assert bounded["small"] == [1, 2]
+    assert len(bounded["large"]) < 10
+
+
+def test_key_caps_and_string_truncation():
+    budget = StateBudget(policies=[KeyCaps({"log": 1, "name": 3}), TruncateStrings(5)])
+    state = {"log": ["a", "b"], "name": "abcdef", "text": "0123456789"}
+
+    assert budget.apply(state) == {"log": ["b"], "name": "abc", "text": "01234..."}
+
+
+def test_worker_states_stay_within_budget(make_agent):
+    agent = make_agent(worker_state_fn=growing_state, state_budget=StateBudget(max_items=3))
+    agent.compile()
+    for _ in range(5):
+        agent.step()
+
+    assert len(agent.worker_states["worker"]["history"]) == 3
+    assert agent.last_payload_size > 0
+
+
+def test_state_over_budget_is_kept():
+    budget = StateBudget(max_bytes=1, policies=[TruncateLists(1)])
+
+    assert budget.apply({"value": "too large"}) == {"value": "too large"}
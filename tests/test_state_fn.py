@@ -0,0 +1,81 @@
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import Function, FunctionResult, FunctionResultStatus
+from virtuals_sdk.game.state_fn import StateFn, state_fn
+from virtuals_sdk.game.worker import Worker
+from virtuals_sdk.stub_server import StubGameServer, action_response
+
+
+class CountingState:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, result, state):
+        self.calls += 1
+        return {"calls": self.calls}
+
+
+def function(name: str, info: dict = None) -> Function:
+    return Function(fn_name=name, fn_description=name, args=[],
+                    executable=lambda: (FunctionResultStatus.DONE, "ok", dict(info or {})))
+
+
+def result(info: dict) -> FunctionResult:
+    return FunctionResult(action_id="", action_status=FunctionResultStatus.DONE, feedback_message="", info=info)
+
+
+def test_needs_update():
+    assert StateFn(lambda result, state: {}).needs_update(None, None)
+    assert not StateFn(lambda result, state: {}, pure=True).needs_update(None, None)
+    assert StateFn(lambda result, state: {}, pure=True).needs_update(result({}), "read")
+
+    by_name = StateFn(lambda result, state: {}, fn_names=["write"])
+    assert by_name.needs_update(result({}), "write")
+    assert not by_name.needs_update(result({}), "read")
+
+    by_key = StateFn(lambda result, state: {}, info_keys=["balance"])
+    assert by_key.needs_update(result({"balance": 1}), "read")
+    assert not by_key.needs_update(result({"price": 1}), "read")
+
+
+def test_agent_reuses_states_that_cannot_have_changed():
+    agent_states = CountingState()
+    worker_states = CountingState()
+    script = [
+        action_response("call_function", fn_name="read"),
+        action_response("wait"),
+        action_response("call_function", fn_name="write"),
+    ]
+
+    with StubGameServer(script=script) as stub:
+        worker = WorkerConfig("worker", "worker", state_fn(fn_names=["write"])(worker_states),
+                              [function("read"), function("write")])
+        agent = Agent("key", "agent", "goal", "description", StateFn(agent_states, pure=True), [worker],
+                      base_url=stub.base_url)
+        agent.compile()
+
+        agent.step()
+        assert (agent_states.calls, worker_states.calls) == (2, 1)
+        state = agent.worker_states["worker"]
+        agent.step()
+        assert (agent_states.calls, worker_states.calls) == (2, 1)
+        # reused, not recomputed
+        assert agent.worker_states["worker"] is state
+        agent.step()
+        assert (agent_states.calls, worker_states.calls) == (3, 2)
+
+
+def test_worker_reuses_states_that_cannot_have_changed():
+    states = CountingState()
+    script = [
+        action_response("call_function", fn_name="read"),
+        action_response("call_function", fn_name="write"),
+        action_response("wait"),
+    ]
+
+    with StubGameServer(script=script) as stub:
+        worker = Worker("key", "worker", StateFn(states, info_keys=["balance"]),
+                        [function("read"), function("write", info={"balance": 1})], base_url=stub.base_url)
+        worker.run("task")
+
+    # initial state, then only after the function that reported a balance
+    assert states.calls == 2
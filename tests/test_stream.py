@@ -0,0 +1,78 @@
+import asyncio
+from virtuals_sdk.game.async_agent import AsyncAgent
+from virtuals_sdk.game.agent import Agent, WorkerConfig
+from virtuals_sdk.game.custom_types import ActionType, Argument, Function, FunctionResultStatus
+from virtuals_sdk.game.worker import Worker
+from virtuals_sdk.stub_server import StubGameServer, action_response
+
+from conftest import noop_function
+
+
+def take_function() -> Function:
+    return Function(fn_name="take", fn_description="take an object",
+                    args=[Argument(name="object", type="string", description="object to take")],
+                    executable=lambda object: (FunctionResultStatus.DONE, f"took {object}", {}))
+
+
+def test_agent_stream_yields_one_event_per_step():
+    script = [action_response("call_function", fn_name="take", args={"object": "apple"},
+                              task="fruits", change_indicator="next_step"),
+              action_response("wait", task="fruits")]
+    with StubGameServer(script=script) as stub:
+        worker = WorkerConfig("worker", "worker", lambda result, state: {}, [take_function()])
+        agent = Agent("key", "agent", "goal", "description", lambda result, state: {}, [worker],
+                      base_url=stub.base_url)
+        agent.compile()
+        events = list(agent.stream(max_steps=3))
+
+    assert [event.step for event in events] == [1, 2, 3]
+    assert [event.action_type for event in events] == [ActionType.CALL_FUNCTION, ActionType.WAIT,
+                                                        ActionType.CALL_FUNCTION]
+    first, second = events[0], events[1]
+    assert (first.fn_name, first.args, first.worker_id) == ("take", {"object": "apple"}, "worker")
+    assert first.result.feedback_message == "took apple"
+    assert first.function_duration is not None and first.duration >= first.function_duration
+    assert (first.task, first.task_changed) == ("fruits", True)
+    assert (second.fn_name, second.result, second.task_changed) == (None, None, False)
+
+
+def test_agent_stream_stops_when_the_consumer_stops(make_agent, stub, requests_to):
+    agent = make_agent()
+    agent.compile()
+    for event in agent.stream():
+        if event.step == 2:
+            break
+
+    assert len(requests_to(stub, "/prompts", route=f"/v2/agents/{agent.agent_id}/actions")) == 2
+
+
+def test_agent_stream_timeout(make_agent):
+    agent = make_agent()
+    agent.compile()
+
+    assert list(agent.stream(timeout=0)) == []
+
+
+def test_worker_stream_ends_with_the_task(stub):
+    worker = Worker("key", "worker", lambda result, state: {}, [noop_function()], base_url=stub.base_url)
+
+    events = list(worker.stream("task"))
+
+    # the stub calls the function once, then ends the task
+    assert [(event.step, event.action_type, event.fn_name) for event in events] == [
+        (1, ActionType.CALL_FUNCTION, "noop"), (2, ActionType.WAIT, None)]
+    assert events[0].worker_id is None
+
+
+def test_async_agent_stream(stub):
+    worker = WorkerConfig("worker", "worker", lambda result, state: {}, [noop_function()])
+    agent = AsyncAgent("key", "agent", "goal", "description", lambda result, state: {}, [worker],
+                       base_url=stub.base_url)
+
+    async def run():
+        await agent.compile()
+        return [event async for event in agent.stream(max_steps=2)]
+
+    events = asyncio.run(run())
+
+    assert [(event.step, event.fn_name) for event in events] == [(1, "noop"), (2, "noop")]
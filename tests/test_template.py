@@ -0,0 +1,117 @@
+import json
+import pytest
+from virtuals_sdk.twitter_agent.agent import Function, FunctionArgument, FunctionConfig
+from virtuals_sdk.twitter_agent.functions.farcaster import FarcasterClient
+from virtuals_sdk.twitter_agent.template import compile_template, render_structure
+
+
+RESPONSE = {
+    "cast": {"text": "gm", "embeds": [{"url": "https://a.example"}, {"url": "https://b.example"}]},
+    "casts": [],
+}
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("{{text}}!", "gm!"),
+    ("{{response.cast.text}}", "gm"),
+    ("{{response.cast.embeds.[1].url}}", "https://b.example"),
+    ("{{response.cast.embeds.length}} embeds", "2 embeds"),
+    ("[{{missing}}] [{{response.cast.missing.text}}]", "[] []"),
+    ("{{#response.cast.embeds}}<{{url}}>{{/response.cast.embeds}}", "<https://a.example><https://b.example>"),
+    ("{{^response.casts}}no casts{{/response.casts}}", "no casts"),
+    ("{{#response.casts}}never{{/response.casts}}", ""),
+    ("{{#response.cast}}{{text}} and {{response.cast.embeds.[0].url}}{{/response.cast}}", "gm and https://a.example"),
+])
+def test_render(source, expected):
+    assert compile_template(source).render({"text": "gm", "response": RESPONSE}) == expected
+
+
+@pytest.mark.parametrize("source", ["{{#a}}no end", "{{#a}}{{/b}}", "{{/a}}"])
+def test_malformed_sections_are_rejected(source):
+    with pytest.raises(ValueError):
+        compile_template(source)
+
+
+def test_templates_are_compiled_once():
+    assert compile_template("{{a}} and {{b}}") is compile_template("{{a}} and {{b}}")
+
+
+def test_single_placeholders_keep_their_value():
+    template = compile_template("{{tags}}")
+
+    assert template.render_value({"tags": ["a", "b"]}) == ["a", "b"]
+    assert template.render({"tags": 3}) == "3"
+
+
+def test_render_structure_leaves_out_missing_values():
+    payload = {
+        "text": "{{text}} from {{author}}",
+        "reply_to": "{{parent}}",
+        "embeds": [{"url": "{{embed_url}}"}],
+        "fixed": 1,
+    }
+
+    assert render_structure(payload, {"text": "gm"}) == {"text": "gm from ", "fixed": 1}
+    assert render_structure(payload, {"text": "gm", "embed_url": "https://a.example", "parent": None}) == {
+        "text": "gm from ",
+        "reply_to": None,
+        "embeds": [{"url": "https://a.example"}],
+        "fixed": 1,
+    }
+
+
+def echo_function(stub, payload, query_params=None):
+    # /api/react echoes the "data" of the payload back
+    return Function(
+        fn_name="post",
+        fn_description="post a message",
+        args=[
+            FunctionArgument(name="text", description="", type="string"),
+            FunctionArgument(name="embed_url", description="", type="string", required=False),
+        ],
+        config=FunctionConfig(
+            method="post",
+            url=f"{stub.api_url}/react/farcaster",
+            headers={"content-type": "application/json"},
+            payload={"data": payload},
+            query_params=query_params,
+            success_feedback="Posted {{response.data.text}}",
+        ),
+    )
+
+
+def test_function_payload_through_stub(stub, requests_to):
+    function = echo_function(stub, {"text": "{{text}}", "embeds": [{"url": "{{embed_url}}"}]})
+
+    without_embed = function("gm")["data"]
+    with_embed = function("gm", "https://a.example")["data"]
+
+    assert without_embed == {"path": "/api/react/farcaster", "text": "gm"}
+    assert with_embed["embeds"] == [{"url": "https://a.example"}]
+    assert len(requests_to(stub, "/api/react/farcaster")) == 2
+
+
+def test_function_query_params_through_stub(stub):
+    function = echo_function(stub, {"text": "{{text}}"}, query_params={"q": "{{text}}", "embed": "{{embed_url}}"})
+
+    request = function._prepare_request({"text": "gm"})
+
+    assert request["params"] == {"q": "gm"}
+    assert function("gm")["data"]["text"] == "gm"
+
+
+def test_farcaster_cast_leaves_out_embeds_without_url():
+    post_cast = FarcasterClient("key", "signer").get_function("post_cast")
+
+    without_embed = json.loads(post_cast._prepare_request({"text": "gm"})["data"])
+    with_embed = json.loads(post_cast._prepare_request({"text": "gm", "embed_url": "https://a.example"})["data"])
+
+    assert without_embed == {"signer_uuid": "signer", "text": "gm"}
+    assert with_embed["embeds"] == [{"url": "https://a.example"}]
+
+
+def test_required_and_query_params_are_not_exported(stub):
+    exported = echo_function(stub, {"text": "{{text}}"}, query_params={"q": "{{text}}"}).toJson()
+
+    assert all("required" not in arg for arg in exported["args"])
+    assert "query_params" not in exported["config"]
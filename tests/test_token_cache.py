@@ -0,0 +1,127 @@
+import base64
+import json
+import threading
+import time
+import pytest
+from virtuals_sdk.game.auth import TokenCache, get_token_expiry
+
+
+class FakeTokenEndpoint:
+    """Mints numbered tokens valid for `ttl` seconds"""
+
+    def __init__(self, ttl: float = 3600.0, delay: float = 0.0):
+        self.ttl = ttl
+        self.delay = delay
+        self.calls = []
+        self.transports = []
+        self._lock = threading.Lock()
+
+    def __call__(self, api_key, transport=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(api_key)
+            self.transports.append(transport)
+            return f"{api_key}-token-{len(self.calls)}", time.time() + self.ttl
+
+
+def jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_token_is_fetched_once_and_reused():
+    endpoint = FakeTokenEndpoint()
+    cache = TokenCache(endpoint)
+
+    tokens = {cache.get("key") for _ in range(3)}
+
+    assert tokens == {"key-token-1"}
+    assert endpoint.calls == ["key"]
+
+
+def test_api_keys_have_their_own_tokens():
+    endpoint = FakeTokenEndpoint()
+    cache = TokenCache(endpoint)
+
+    assert cache.get("key-1") != cache.get("key-2")
+    assert endpoint.calls == ["key-1", "key-2"]
+
+
+def test_concurrent_callers_share_one_fetch():
+    endpoint = FakeTokenEndpoint(delay=0.2)
+    cache = TokenCache(endpoint)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(cache.get("key"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(tokens) == {"key-token-1"}
+    assert len(endpoint.calls) == 1
+
+
+def test_token_close_to_expiry_is_refreshed_in_background():
+    endpoint = FakeTokenEndpoint(ttl=30)
+    cache = TokenCache(endpoint, refresh_margin=60, expiry_skew=0)
+    first = cache.get("key")
+
+    # still valid - served right away while its replacement is fetched
+    assert cache.get("key") == first
+    deadline = time.monotonic() + 5
+    while len(endpoint.calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    assert cache.get("key") == "key-token-2"
+
+
+def test_expired_token_is_fetched_again():
+    # tokens within expiry_skew of their expiry are never served
+    endpoint = FakeTokenEndpoint(ttl=1)
+    cache = TokenCache(endpoint, expiry_skew=5)
+
+    assert cache.get("key") != cache.get("key")
+    assert len(endpoint.calls) == 2
+
+
+def test_fetch_uses_the_callers_transport():
+    endpoint = FakeTokenEndpoint()
+    transport = object()
+
+    TokenCache(endpoint).get("key", transport)
+
+    assert endpoint.transports == [transport]
+
+
+def test_invalidated_token_is_replaced():
+    endpoint = FakeTokenEndpoint()
+    cache = TokenCache(endpoint)
+    first = cache.get("key")
+
+    cache.invalidate("key")
+
+    assert cache.get("key") != first
+    assert len(endpoint.calls) == 2
+
+
+def test_failed_fetch_is_not_cached():
+    endpoint = FakeTokenEndpoint()
+    failures = [ValueError("Failed to get token")]
+
+    def fetch(api_key, transport):
+        if failures:
+            raise failures.pop()
+        return endpoint(api_key, transport)
+
+    cache = TokenCache(fetch)
+
+    with pytest.raises(ValueError):
+        cache.get("key")
+    assert cache.get("key") == "key-token-1"
+
+
+def test_token_expiry_is_read_from_jwt_claims():
+    assert get_token_expiry(jwt({"exp": 1700000000})) == 1700000000.0
+    # opaque tokens fall back to the default lifetime
+    assert abs(get_token_expiry("opaque", default_ttl=60) - (time.time() + 60)) < 5
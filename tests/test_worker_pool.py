@@ -0,0 +1,55 @@
+import time
+from virtuals_sdk.game.agent import WorkerConfig
+
+from conftest import noop_function
+
+
+def test_released_workers_are_reused(make_agent, stub, requests_to):
+    agent = make_agent()
+    pool = agent.enable_worker_pool(max_idle=2)
+
+    worker = agent.get_worker("worker")
+    worker.set_task("first task")
+    agent.release_worker("worker", worker)
+    reused = agent.get_worker("worker")
+
+    assert reused is worker
+    assert (pool.hits, pool.misses) == (1, 1)
+    # one remote agent for the agent, one for the worker
+    assert len(requests_to(stub, "/prompts", route="/v2/agents")) == 2
+
+
+def test_pool_keeps_at_most_max_idle_workers(make_agent):
+    agent = make_agent()
+    pool = agent.enable_worker_pool(max_idle=1)
+
+    workers = [agent.get_worker("worker") for _ in range(3)]
+    for worker in workers:
+        agent.release_worker("worker", worker)
+
+    assert pool.idle_count("worker") == 1
+
+
+def test_workers_of_a_replaced_config_are_dropped(make_agent):
+    agent = make_agent()
+    pool = agent.enable_worker_pool(prewarm=True, max_idle=2)
+    assert pool.idle_count("worker") == 2
+
+    worker = agent.get_worker("worker")
+    agent.add_worker(WorkerConfig("worker", "new description", lambda result, state: {}, [noop_function()]))
+    assert pool.idle_count("worker") == 0
+
+    agent.release_worker("worker", worker)
+    assert pool.idle_count("worker") == 0
+    assert agent.get_worker("worker") is not worker
+
+
+def test_idle_workers_expire_on_acquire(make_agent):
+    agent = make_agent()
+    pool = agent.enable_worker_pool(idle_timeout=0.05)
+    worker = agent.get_worker("worker")
+    agent.release_worker("worker", worker)
+    time.sleep(0.1)
+
+    assert agent.get_worker("worker") is not worker
+    assert pool.hits == 0
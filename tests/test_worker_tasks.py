@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from virtuals_sdk.game.async_worker import AsyncWorker
+from virtuals_sdk.game.custom_types import Function, FunctionResultStatus
+from virtuals_sdk.game.worker import Worker
+from virtuals_sdk.stub_server import StubGameServer, action_response
+
+from conftest import noop_function
+
+
+class ConcurrencyProbe:
+    """Executable recording how many calls run at the same time"""
+
+    def __init__(self, duration: float = 0.05):
+        self.duration = duration
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.duration)
+        with self._lock:
+            self.active -= 1
+        return FunctionResultStatus.DONE, "ok", {}
+
+
+def make_worker(stub, functions, worker_class=Worker, **kwargs):
+    return worker_class("key", "worker", lambda result, state: {}, functions, base_url=stub.base_url, **kwargs)
+
+
+def test_submitted_tasks_run_concurrently(stub, requests_to):
+    probe = ConcurrencyProbe()
+    worker = make_worker(stub, [Function(fn_name="probe", fn_description="probe", args=[], executable=probe)],
+                         max_concurrent_tasks=2)
+
+    results = worker.run_many([f"task {i}" for i in range(4)])
+    worker.shutdown()
+
+    assert [result.feedback_message for result in results] == ["ok"] * 4
+    assert probe.max_active == 2
+    # the tasks share the remote agent of the worker
+    assert len(requests_to(stub, "/prompts", route="/v2/agents")) == 1
+    # each with its own submission
+    next_routes = {body["data"]["route"] for _, path, body in stub.requests
+                   if path == "/prompts" and body["data"]["route"].endswith("/next")}
+    assert len(next_routes) == 4
+
+
+def test_submit_calls_back_with_the_future(stub):
+    worker = make_worker(stub, [noop_function()])
+    done = threading.Event()
+
+    future = worker.submit("task", callback=lambda f: done.set())
+
+    assert future.result().feedback_message == "ok"
+    assert done.wait(5)
+    worker.shutdown()
+
+
+def test_task_ending_on_its_first_action():
+    with StubGameServer(script=[action_response("wait")]) as stub:
+        worker = make_worker(stub, [noop_function()])
+
+        worker.set_task("task")
+        assert worker.step()[1] is None
+        assert worker.submit("task").result() is None
+        worker.shutdown()
+
+
+def test_async_task_ending_on_its_first_action():
+    with StubGameServer(script=[action_response("wait")]) as stub:
+        worker = make_worker(stub, [noop_function()], worker_class=AsyncWorker)
+
+        async def run():
+            return await (await worker.submit("task"))
+
+        assert asyncio.run(run()) is None
+
+
+def test_async_submitted_tasks_are_bounded(stub):
+    active = 0
+    max_active = 0
+
+    async def probe():
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return FunctionResultStatus.DONE, "ok", {}
+
+    worker = make_worker(stub, [Function(fn_name="probe", fn_description="probe", args=[], executable=probe)],
+                         worker_class=AsyncWorker, max_concurrent_tasks=2)
+
+    async def run():
+        tasks = [await worker.submit(f"task {i}") for i in range(4)]
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+
+    assert [result.feedback_message for result in results] == ["ok"] * 4
+    assert max_active == 2